@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from src.bench.revision import git_revision
+from src.gemini import intents
+
+
+# Load generator for the bridge's request paths: /ask, /ask/stream, /execute_cypher_query
+# and /ui. Without --url the app runs in-process on the fake LLM and the in-memory graph
+# (LLM_BACKEND=fake, GRAPH_BACKEND=memory), so it needs neither Gemini nor Neo4j.
+
+# the first ones go through the intent router, the rest through the (fake) model and,
+# when repeated, the plan cache
+QUESTIONS = [
+    "pkg_0/mod_3.py dosyasını kim yazdı?",
+    "mod_17.py hangi kütüphaneleri kullanıyor?",
+    "Kaç modül var?",
+    "En çok kullanılan 5 kütüphane hangileri?",
+    "pkg_1/mod_60.py üzerinde çalışan geliştiricilerin e-postaları neler?",
+    "Projede en popüler kütüphane hangisi?",
+    "Hangi fonksiyon en çok çağrılıyor?",
+    "Bu projenin modül sayısını söyler misin?",
+    "Adında mod geçen modüller hangileri?",
+    "Grafın genel yapısını anlat.",
+]
+
+QUERIES: List[Tuple[str, Optional[Dict[str, Any]]]] = [
+    ("MATCH (o:GrafOzet {ad: 'graf'}) RETURN o.fonksiyon_sayisi", None),
+    (
+        "MATCH (k:Kutuphane) RETURN k.isim, k.kullanan_modul_sayisi "
+        "ORDER BY k.kullanan_modul_sayisi DESC LIMIT 10",
+        None,
+    ),
+    (
+        "MATCH (f:Fonksiyon) WHERE f.fan_in IS NOT NULL RETURN f.isim, f.dosya_yolu, f.fan_in "
+        "ORDER BY f.fan_in DESC LIMIT 10",
+        None,
+    ),
+    ("MATCH (m:Modul) RETURN m.dosya_yolu, m.fonksiyon_sayisi LIMIT 100", None),
+    (intents.TOP_FUNCTIONS, {"limit": 20}),
+    (intents.WHO_WROTE, intents.file_params("mod_5.py")),
+    (
+        "CALL db.index.fulltext.queryNodes('modul_arama', 'pkg*') YIELD node AS m, score "
+        "RETURN m.goreli_yol, score ORDER BY score DESC LIMIT 10",
+        None,
+    ),
+]
+
+SCENARIOS = ("ask", "stream", "query", "ui")
+DEFAULT_MIX = "ask=3,stream=1,query=4,ui=1"
+
+
+@dataclass
+class ScenarioStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+    sources: Counter = field(default_factory=Counter)
+
+    def as_dict(self, seconds: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "requests": len(ordered),
+            "errors": sum(self.errors.values()),
+            "error_kinds": dict(self.errors),
+            "answer_sources": dict(self.sources),
+            "rps": round(len(ordered) / seconds, 2) if seconds > 0 else None,
+            "p50_ms": _percentile(ordered, 50),
+            "p95_ms": _percentile(ordered, 95),
+            "p99_ms": _percentile(ordered, 99),
+            "max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+        }
+
+
+def _percentile(ordered: List[float], pct: float) -> Optional[float]:
+    # nearest-rank
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return round(ordered[rank] * 1000, 3)
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    mix: Dict[str, int] = {}
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"unknown scenario {name!r} (expected one of {', '.join(SCENARIOS)})")
+        mix[name] = int(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def build_schedule(requests: int, mix: Dict[str, int], seed: int) -> List[Tuple[str, int]]:
+    # (scenario, payload index), the same for a given seed so runs are comparable
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    schedule = []
+    for _ in range(requests):
+        scenario = rng.choices(names, weights)[0]
+        pool = QUESTIONS if scenario in ("ask", "stream") else QUERIES
+        schedule.append((scenario, rng.randrange(len(pool))))
+    return schedule
+
+
+async def _ask_stream(http: httpx.AsyncClient, question: str) -> Optional[str]:
+    # the source of the answer event, or raises on an error event
+    event = None
+    async with http.stream("GET", "/ask/stream", params={"question": question}) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: ") :]
+            elif line.startswith("data: ") and event in ("answer", "error"):
+                data = json.loads(line[len("data: ") :])
+                if event == "error":
+                    raise RuntimeError(data.get("type") or "error")
+                return data.get("source")
+    raise RuntimeError("no answer event")
+
+
+async def _one(http: httpx.AsyncClient, scenario: str, index: int) -> Optional[str]:
+    if scenario == "ask":
+        resp = await http.post("/ask", json={"question": QUESTIONS[index]})
+    elif scenario == "stream":
+        return await _ask_stream(http, QUESTIONS[index])
+    elif scenario == "query":
+        query, params = QUERIES[index]
+        resp = await http.post("/execute_cypher_query", json={"query": query, "params": params})
+    else:
+        resp = await http.get("/ui")
+    resp.raise_for_status()
+    return None
+
+
+async def run_load(
+    http: httpx.AsyncClient, schedule: List[Tuple[str, int]], concurrency: int
+) -> Tuple[Dict[str, ScenarioStats], float]:
+    stats = {scenario: ScenarioStats() for scenario, _ in schedule}
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in schedule:
+        queue.put_nowait(item)
+
+    async def _worker() -> None:
+        while not queue.empty():
+            scenario, index = queue.get_nowait()
+            entry = stats[scenario]
+            started = time.perf_counter()
+            try:
+                source = await _one(http, scenario, index)
+                if source:
+                    entry.sources[source] += 1
+            except httpx.HTTPStatusError as e:
+                entry.errors[str(e.response.status_code)] += 1
+            except (httpx.HTTPError, RuntimeError) as e:
+                entry.errors[str(e) if isinstance(e, RuntimeError) else e.__class__.__name__] += 1
+            entry.latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+    return stats, time.perf_counter() - started
+
+
+@contextlib.asynccontextmanager
+async def _http_client(url: Optional[str], timeout: float) -> AsyncIterator[httpx.AsyncClient]:
+    if url:
+        async with httpx.AsyncClient(base_url=url.rstrip("/"), timeout=timeout) as http:
+            yield http
+        return
+
+    # in-process, offline: fake model, in-memory graph, throwaway plan cache
+    from src.config import settings
+
+    with tempfile.TemporaryDirectory(prefix="ask-load-") as tmp:
+        settings.LLM_BACKEND = "fake"
+        settings.GRAPH_BACKEND = "memory"
+        settings.PLAN_CACHE_PATH = str(Path(tmp) / "plan_cache.sqlite3")
+        from src.server import main as server
+
+        async with server.lifespan(server.app):
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as http:
+                yield http
+
+
+async def _run(args: argparse.Namespace, schedule: List[Tuple[str, int]]) -> Tuple[Dict[str, ScenarioStats], float]:
+    async with _http_client(args.url, args.timeout) as http:
+        if args.warmup:
+            await run_load(http, build_schedule(args.warmup, parse_mix(args.mix), args.seed + 1), args.concurrency)
+        return await run_load(http, schedule, args.concurrency)
+
+
+def build_report(args: argparse.Namespace, stats: Dict[str, ScenarioStats], seconds: float) -> Dict[str, Any]:
+    from src.config import settings
+
+    total = sum(len(entry.latencies) for entry in stats.values())
+    return {
+        "revision": git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": args.url or "in-process",
+        "backends": None
+        if args.url
+        else {
+            "llm": settings.LLM_BACKEND,
+            "llm_latency": settings.FAKE_LLM_LATENCY,
+            "graph": settings.GRAPH_BACKEND,
+            "graph_latency": settings.FAKE_GRAPH_LATENCY,
+            "graph_modules": settings.FAKE_GRAPH_MODULES,
+        },
+        "requests": total,
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "seed": args.seed,
+        "seconds": round(seconds, 6),
+        "rps": round(total / seconds, 2) if seconds > 0 else None,
+        "scenarios": {name: entry.as_dict(seconds) for name, entry in sorted(stats.items())},
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> Tuple[List[str], float]:
+    # returns the table and the worst p95 change in percent
+    lines = [f"{'scenario':10} {'baseline p95':>13} {'current p95':>12} {'change':>9}"]
+    worst = 0.0
+    for name, entry in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old or not old.get("p95_ms") or entry["p95_ms"] is None:
+            lines.append(f"{name:10} {'-':>13} {entry['p95_ms'] or 0:>12.3f} {'new':>9}")
+            continue
+        change = (entry["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        worst = max(worst, change)
+        lines.append(f"{name:10} {old['p95_ms']:>13.3f} {entry['p95_ms']:>12.3f} {change:>+8.1f}%")
+    return lines, worst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test /ask, /ask/stream, /execute_cypher_query and /ui")
+    parser.add_argument(
+        "--url", type=str, default=None, help="Running bridge to test; default: in-process with the offline fakes"
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=0, help="Requests sent (and not measured) before the run")
+    parser.add_argument("--mix", type=str, default=DEFAULT_MIX, help="Scenario weights, e.g. ask=3,stream=1,query=4,ui=1")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--output", type=str, default="bench_ask.json", help="JSON report path")
+    parser.add_argument("--compare", type=str, default=None, help="Earlier JSON report to compare against")
+    parser.add_argument(
+        "--fail-on-regression",
+        type=float,
+        default=None,
+        metavar="PCT",
+        help="With --compare: exit 1 when a scenario's p95 grew by more than PCT percent",
+    )
+    args = parser.parse_args()
+
+    schedule = build_schedule(args.requests, parse_mix(args.mix), args.seed)
+    stats, seconds = asyncio.run(_run(args, schedule))
+    report = build_report(args, stats, seconds)
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(f"{'scenario':10} {'requests':>8} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    for name, entry in report["scenarios"].items():
+        print(
+            f"{name:10} {entry['requests']:>8} {entry['errors']:>6} {entry['p50_ms'] or 0:>9.2f} "
+            f"{entry['p95_ms'] or 0:>9.2f} {entry['p99_ms'] or 0:>9.2f} {entry['rps'] or 0:>8.1f}"
+        )
+    print(f"total: {report['requests']} requests in {report['seconds']:.2f} s, {report['rps']} req/s")
+    exit_code = 0
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        lines, worst = compare_reports(baseline, report)
+        print()
+        print("\n".join(lines))
+        if args.fail_on_regression is not None and worst > args.fail_on_regression:
+            print(f"p95 regression of {worst:.1f}% exceeds {args.fail_on_regression:.1f}%")
+            exit_code = 1
+    print(f"report written to {args.output}")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
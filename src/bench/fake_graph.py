@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.gemini import intents
+from src.graph import schema
+from src.graph.cache import GENERATION_QUERY, normalize_query
+from src.graph.neo4j_client import MODUL_FULLTEXT_INDEX, BatchOutcome, PoolUsage, check_readonly
+from src.ingest.writer import module_lookup
+
+
+# In-memory stand-in for AsyncNeo4jClient (GRAPH_BACKEND=memory). There is no Cypher engine:
+# the queries the bridge itself issues (intent templates, cache generation, schema) and
+# the example queries of the system prompt are recognized and answered from a seeded
+# synthetic graph; anything else is a ValueError, i.e. a 400 / tool error.
+
+Rows = List[Dict[str, Any]]
+
+
+@dataclass
+class MemoryGraphConfig:
+    modules: int = 200
+    functions_per_module: int = 20
+    # average outgoing CAGIRIR per function
+    call_density: float = 3.0
+    libraries: int = 30
+    libraries_per_module: int = 3
+    developers: int = 10
+    developers_per_module: int = 2
+    modules_per_package: int = 50
+    seed: int = 1234
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class MemoryGraph:
+    # the ontology's nodes as dicts (with the analytics aggregates already computed) plus
+    # lookup tables for the recognized queries
+
+    def __init__(self, config: MemoryGraphConfig) -> None:
+        self.config = config
+        rng = random.Random(config.seed)
+        self.modules: List[Dict[str, Any]] = []
+        self.functions: List[Dict[str, Any]] = []
+        self.libraries = [
+            {"isim": f"lib_{i}", "versiyon": f"{1 + i % 3}.{i % 10}.0", "kullanan_modul_sayisi": 0}
+            for i in range(config.libraries)
+        ]
+        self.developers = [
+            {"isim": f"Dev {i}", "email": f"dev{i}@example.com", "team": f"team_{i % 3}", "modul_sayisi": 0}
+            for i in range(config.developers)
+        ]
+        self.authors: Dict[str, List[Dict[str, Any]]] = {}
+        self.uses: Dict[str, List[Dict[str, Any]]] = {}
+        self.callers: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+        for m in range(config.modules):
+            path = f"pkg_{m // config.modules_per_package}/mod_{m}.py"
+            self.modules.append(
+                {"dosya_yolu": path, "dil": "python", "fonksiyon_sayisi": config.functions_per_module, **module_lookup(path)}
+            )
+            for f in range(config.functions_per_module):
+                function = {
+                    "id": f"{path}::func_{m}_{f}",
+                    "isim": f"func_{m}_{f}",
+                    "parametreler": "a, b=None",
+                    "geri_donus_tipi": "int",
+                    "satir": 1 + f * 4,
+                    "dosya_yolu": path,
+                    "fan_in": 0,
+                    "fan_out": 0,
+                }
+                self.functions.append(function)
+            used = rng.sample(self.libraries, min(config.libraries_per_module, len(self.libraries)))
+            wrote = rng.sample(self.developers, min(config.developers_per_module, len(self.developers)))
+            self.uses[path] = used
+            self.authors[path] = wrote
+            self.modules[-1].update(kutuphane_sayisi=len(used), gelistirici_sayisi=len(wrote))
+            for library in used:
+                library["kullanan_modul_sayisi"] += 1
+            for developer in wrote:
+                developer["modul_sayisi"] += 1
+
+        calls = 0
+        for caller in self.functions:
+            count = int(config.call_density) + (1 if rng.random() < config.call_density % 1 else 0)
+            for callee in rng.sample(self.functions, min(count, len(self.functions))):
+                caller["fan_out"] += 1
+                callee["fan_in"] += 1
+                self.callers[callee["isim"]].append(caller)
+                calls += 1
+        self.summary = {
+            "ad": "graf",
+            "modul_sayisi": len(self.modules),
+            "fonksiyon_sayisi": len(self.functions),
+            "kutuphane_sayisi": len(self.libraries),
+            "gelistirici_sayisi": len(self.developers),
+            "cagri_sayisi": calls,
+        }
+        # the dosya_adi index
+        self.by_file_name: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for module in self.modules:
+            self.by_file_name[module["dosya_adi"]].append(module)
+
+    def find_modules(self, file_name: str, path: str = "", suffix: str = "", full_path: str = "") -> List[str]:
+        # intents._MATCH_MODUL; without path/suffix every module of that file name
+        return [
+            m["dosya_yolu"]
+            for m in self.by_file_name.get(file_name, [])
+            if not (path or suffix or full_path)
+            or m["goreli_yol"] == path
+            or m["goreli_yol"].endswith(suffix)
+            or m["dosya_yolu"] == full_path
+        ]
+
+    def search_modules(self, text: str, limit: int) -> List[Dict[str, Any]]:
+        # rough stand-in for the modul_arama full-text index: prefix matches of path parts
+        terms = [t for t in re.split(r"[^a-z]+", text.lower()) if t]
+        scored = []
+        for module in self.modules:
+            parts = re.split(r"[^a-z]+", module["goreli_yol"] + " " + module["modul_adi"])
+            score = sum(1 for term in terms for part in parts if part.startswith(term))
+            if score:
+                scored.append({"m.goreli_yol": module["goreli_yol"], "score": float(score)})
+        return sorted(scored, key=lambda r: (-r["score"], r["m.goreli_yol"]))[:limit]
+
+    def top(self, items: List[Dict[str, Any]], key: str, limit: int) -> List[Dict[str, Any]]:
+        return sorted(items, key=lambda item: item[key], reverse=True)[:limit]
+
+
+def _pick(row: Dict[str, Any], prefix: str, keys: Sequence[str]) -> Dict[str, Any]:
+    # the Cypher result shape: RETURN f.isim -> {"f.isim": ...}
+    return {f"{prefix}.{key}": row.get(key) for key in keys}
+
+
+class MemoryGraphClient:
+    # implements the part of AsyncNeo4jClient the bridge server uses
+
+    def __init__(self, graph: MemoryGraph, latency: float = 0.0, max_pool_size: Optional[int] = None) -> None:
+        self.graph = graph
+        self.latency = latency
+        self.admission = None
+        self._pool = PoolUsage(max_pool_size)
+        self._exact: Dict[str, Callable[[Dict[str, Any]], Rows]] = {}
+        self._patterns: List[Tuple[re.Pattern, Callable[[re.Match, Dict[str, Any]], Rows]]] = []
+        self._register()
+
+    def _register(self) -> None:
+        g = self.graph
+        exact = {
+            GENERATION_QUERY: lambda p: [{"nesil": 1}],
+            intents.WHO_WROTE: lambda p: sorted(
+                (
+                    {"isim": d["isim"], "email": d["email"]}
+                    for path in g.find_modules(p["dosya_adi"], p["yol"], p["sonek"], p["dosya"])
+                    for d in g.authors[path]
+                ),
+                key=lambda r: r["isim"],
+            ),
+            intents.LIBRARIES_OF: lambda p: sorted(
+                (
+                    {"isim": k["isim"], "versiyon": k["versiyon"]}
+                    for path in g.find_modules(p["dosya_adi"], p["yol"], p["sonek"], p["dosya"])
+                    for k in g.uses[path]
+                ),
+                key=lambda r: r["isim"],
+            ),
+            intents.CALLERS_OF: lambda p: [
+                {"isim": c["isim"], "dosya_yolu": c["dosya_yolu"]} for c in g.callers.get(p["fonksiyon"], [])[:100]
+            ],
+            intents.TOP_FUNCTIONS: lambda p: [
+                {"isim": f["isim"], "dosya_yolu": f["dosya_yolu"], "fan_in": f["fan_in"]}
+                for f in g.top(g.functions, "fan_in", p["limit"])
+            ],
+            intents.TOP_LIBRARIES: lambda p: [
+                {"isim": k["isim"], "sayi": k["kullanan_modul_sayisi"]}
+                for k in g.top(g.libraries, "kullanan_modul_sayisi", p["limit"])
+            ],
+            schema.NODE_PROPERTIES_QUERY: lambda p: [
+                {"etiket": label, "ozellikler": sorted(sample)}
+                for label, sample in (
+                    ("Modul", g.modules[0]),
+                    ("Fonksiyon", g.functions[0]),
+                    ("Kutuphane", g.libraries[0]),
+                    ("Gelistirici", g.developers[0]),
+                    ("GrafOzet", g.summary),
+                )
+            ],
+            schema.RELATIONSHIPS_QUERY: lambda p: [
+                {"tip": tip, "kaynak": [start], "hedef": [end]}
+                for tip, start, end in (
+                    ("YAZDI", "Gelistirici", "Modul"),
+                    ("ICERIR", "Modul", "Fonksiyon"),
+                    ("CAGIRIR", "Fonksiyon", "Fonksiyon"),
+                    ("KULLANIR", "Modul", "Kutuphane"),
+                )
+            ],
+        }
+        for kind, query in intents.COUNT_QUERIES.items():
+            exact[query] = lambda p, prop=f"{kind}_sayisi": [{"sayi": g.summary[prop]}]
+        self._exact = {normalize_query(q): fn for q, fn in exact.items()}
+
+        # the system prompt's examples, literal or with plan-cache parameters
+        value = r"(?:'(?P<lit>[^']*)'|\$(?P<param>\w+))"
+
+        def _literal(m: re.Match, params: Dict[str, Any]) -> str:
+            return m.group("lit") if m.group("lit") is not None else str(params.get(m.group("param"), ""))
+
+        nodes = {"Modul": g.modules, "Fonksiyon": g.functions, "Kutuphane": g.libraries, "Gelistirici": g.developers}
+        self._patterns = [
+            (
+                re.compile(
+                    r"MATCH \(m:Modul \{dosya_adi: " + value
+                    + r"\}\) MATCH \(g:Gelistirici\)-\[:YAZDI\]->\(m\) RETURN g\.isim, g\.email"
+                ),
+                lambda m, p: [
+                    _pick(d, "g", ("isim", "email"))
+                    for path in g.find_modules(_literal(m, p))
+                    for d in g.authors[path]
+                ],
+            ),
+            (
+                re.compile(
+                    rf"CALL db\.index\.fulltext\.queryNodes\('{MODUL_FULLTEXT_INDEX}', " + value
+                    + r"\) YIELD node AS m, score RETURN m\.goreli_yol, score ORDER BY score DESC LIMIT (?P<n>\d+)"
+                ),
+                lambda m, p: g.search_modules(_literal(m, p), int(m.group("n"))),
+            ),
+            (
+                re.compile(r"MATCH \(o:GrafOzet \{ad: 'graf'\}\) RETURN o\.(?P<prop>\w+)"),
+                lambda m, p: [{f"o.{m.group('prop')}": g.summary.get(m.group("prop"))}],
+            ),
+            (
+                re.compile(
+                    r"MATCH \(k:Kutuphane\) RETURN k\.isim, k\.kullanan_modul_sayisi "
+                    r"ORDER BY k\.kullanan_modul_sayisi DESC LIMIT (?P<n>\d+)"
+                ),
+                lambda m, p: [
+                    _pick(k, "k", ("isim", "kullanan_modul_sayisi"))
+                    for k in g.top(g.libraries, "kullanan_modul_sayisi", int(m.group("n")))
+                ],
+            ),
+            (
+                re.compile(
+                    r"MATCH \(f:Fonksiyon\) WHERE f\.fan_in IS NOT NULL RETURN f\.isim, f\.dosya_yolu, f\.fan_in "
+                    r"ORDER BY f\.fan_in DESC LIMIT (?P<n>\d+)"
+                ),
+                lambda m, p: [
+                    _pick(f, "f", ("isim", "dosya_yolu", "fan_in")) for f in g.top(g.functions, "fan_in", int(m.group("n")))
+                ],
+            ),
+            # MATCH (n:Label) RETURN n.a, n.b [LIMIT k]: listing queries for load tests
+            (
+                re.compile(
+                    r"MATCH \((?P<var>\w+):(?P<label>Modul|Fonksiyon|Kutuphane|Gelistirici)\) "
+                    r"RETURN (?P<props>\w+\.\w+(?:, \w+\.\w+)*)(?: LIMIT (?P<n>\d+))?"
+                ),
+                lambda m, p: [
+                    {prop: node.get(prop.split(".", 1)[1]) for prop in m.group("props").split(", ")}
+                    for node in nodes[m.group("label")][: int(m.group("n")) if m.group("n") else None]
+                ],
+            ),
+        ]
+
+    def answer(self, query: str, params: Optional[Dict[str, Any]] = None) -> Rows:
+        key = normalize_query(query)
+        params = params or {}
+        handler = self._exact.get(key)
+        if handler is not None:
+            return handler(params)
+        for pattern, fn in self._patterns:
+            m = pattern.fullmatch(key)
+            if m is not None:
+                return fn(m, params)
+        raise ValueError("The in-memory graph does not support this query (GRAPH_BACKEND=memory).")
+
+    async def _run(self, query: str, params: Optional[Dict[str, Any]], readonly: bool) -> Rows:
+        check_readonly(query, readonly)
+        self._pool.acquire()
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self.answer(query, params)
+        finally:
+            self._pool.release()
+
+    async def close(self) -> None:
+        return None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self._pool.stats()
+
+    @asynccontextmanager
+    async def session(self, **config: Any) -> AsyncIterator["_MemorySession"]:
+        yield _MemorySession(self)
+
+    async def run_query(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        readonly: bool = False,
+        timeout: Optional[float] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> Rows:
+        rows = await self._run(query, params, readonly)
+        return rows[skip : None if limit is None else skip + limit]
+
+    async def stream_query(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        readonly: bool = False,
+        timeout: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        for row in (await self._run(query, params, readonly))[:limit]:
+            yield row
+
+    async def graph_generation(self, timeout: Optional[float] = None) -> Optional[int]:
+        return 1
+
+    async def run_batch(
+        self,
+        items: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+        *,
+        readonly: bool = False,
+        timeout: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[BatchOutcome]:
+        outcomes = []
+        for query, params in items:
+            try:
+                outcomes.append(BatchOutcome(rows=(await self._run(query, params, readonly))[:limit]))
+            except ValueError as e:
+                outcomes.append(BatchOutcome(error=e))
+        return outcomes
+
+
+class _MemoryResult:
+    def __init__(self, rows: Rows) -> None:
+        self._rows = rows
+
+    async def data(self) -> Rows:
+        return self._rows
+
+
+class _MemorySession:
+    # enough of an AsyncSession for load_schema()
+    def __init__(self, client: MemoryGraphClient) -> None:
+        self._client = client
+
+    async def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> _MemoryResult:
+        return _MemoryResult(self._client.answer(query, {**(parameters or {}), **kwargs}))
+
+
+def create_memory_client(
+    modules: int = 200,
+    latency: float = 0.0,
+    max_pool_size: Optional[int] = None,
+    seed: int = 1234,
+) -> MemoryGraphClient:
+    return MemoryGraphClient(MemoryGraph(MemoryGraphConfig(modules=modules, seed=seed)), latency, max_pool_size)
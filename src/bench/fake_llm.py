@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+
+# Scripted stand-in for genai.GenerativeModel (LLM_BACKEND=fake). A script is a list of
+# rules; the first rule whose "match" regex finds the question replays its "calls" as
+# execute_cypher_query function calls, one per model turn, then returns "answer".
+# Named groups of the match and {rows} (row count of the last tool result) / {first}
+# (first value of its first row) are filled into the queries and the answer. Responses
+# mimic the SDK objects the tool loops read: candidates[].content.parts[] with .text or
+# .function_call, and async chunk iteration when streamed.
+
+DEFAULT_SCRIPT: List[Dict[str, Any]] = [
+    {
+        "match": r"(?P<file>(?:[\w.-]+/)*(?P<name>[\w.-]+\.py))",
+        "calls": [
+            "MATCH (m:Modul {{dosya_adi: '{name}'}}) MATCH (g:Gelistirici)-[:YAZDI]->(m) RETURN g.isim, g.email"
+        ],
+        "answer": "{file} üzerinde {rows} geliştirici çalışmış.",
+    },
+    {
+        "match": r"(?i)k[uü]t[uü]phane|librar",
+        "calls": [
+            "MATCH (k:Kutuphane) RETURN k.isim, k.kullanan_modul_sayisi "
+            "ORDER BY k.kullanan_modul_sayisi DESC LIMIT 10"
+        ],
+        "answer": "En çok kullanılan {rows} kütüphane listelendi; ilki {first}.",
+    },
+    {
+        "match": r"(?i)[cç]a[gğ]r|call",
+        "calls": [
+            "MATCH (f:Fonksiyon) WHERE f.fan_in IS NOT NULL RETURN f.isim, f.dosya_yolu, f.fan_in "
+            "ORDER BY f.fan_in DESC LIMIT 10"
+        ],
+        "answer": "En çok çağrılan fonksiyon {first}.",
+    },
+    {
+        "match": r"(?i)(?P<term>\w+) ge[cç]en|(?:named|called) (?P<en_term>\w+)",
+        "calls": [
+            "CALL db.index.fulltext.queryNodes('modul_arama', '{term}{en_term}*') YIELD node AS m, score "
+            "RETURN m.goreli_yol, score ORDER BY score DESC LIMIT 10"
+        ],
+        "answer": "{rows} modül bulundu; en yakını {first}.",
+    },
+    {
+        "match": r"(?i)mod[uü]l|module",
+        "calls": ["MATCH (o:GrafOzet {{ad: 'graf'}}) RETURN o.modul_sayisi"],
+        "answer": "Grafta {first} modül var.",
+    },
+    {"match": r".", "calls": [], "answer": "Bu soruyu graf üzerinden cevaplayamıyorum."},
+]
+
+
+def load_script(path: Optional[str]) -> List[Dict[str, Any]]:
+    if not path:
+        return DEFAULT_SCRIPT
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+@dataclass
+class _FunctionCall:
+    name: str
+    args: Dict[str, Any]
+
+
+@dataclass
+class _Part:
+    text: str = ""
+    function_call: Optional[_FunctionCall] = None
+
+
+@dataclass
+class _Content:
+    parts: List[_Part]
+
+
+@dataclass
+class _Candidate:
+    content: _Content
+
+
+@dataclass
+class FakeResponse:
+    candidates: List[_Candidate]
+
+    @classmethod
+    def of(cls, parts: List[_Part]) -> "FakeResponse":
+        return cls([_Candidate(_Content(parts))])
+
+    @property
+    def text(self) -> str:
+        return "".join(part.text for c in self.candidates for part in c.content.parts)
+
+
+@dataclass
+class FakeStream:
+    # iterate for the chunks; afterwards candidates hold the whole response, as in the SDK
+    chunks: List[FakeResponse]
+    candidates: List[_Candidate] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        parts = [part for chunk in self.chunks for c in chunk.candidates for part in c.content.parts]
+        self.candidates = [_Candidate(_Content(parts))]
+
+    async def __aiter__(self) -> AsyncIterator[FakeResponse]:
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+    @property
+    def text(self) -> str:
+        return "".join(chunk.text for chunk in self.chunks)
+
+
+def _chunks(text: str) -> List[FakeResponse]:
+    # one chunk per word, like a token stream
+    words = re.findall(r"\S+\s*", text) or [text]
+    return [FakeResponse.of([_Part(text=word)]) for word in words]
+
+
+def _tool_payload(content: Any) -> Dict[str, Any]:
+    # genai.protos.FunctionResponse -> its response dict
+    try:
+        return type(content).to_dict(content).get("response") or {}
+    except (AttributeError, TypeError):
+        return getattr(content, "response", None) or {}
+
+
+class _Format(dict):
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+class FakeChat:
+    def __init__(self, model: "FakeGenerativeModel") -> None:
+        self._model = model
+        self._calls: Sequence[str] = ()
+        self._answer = ""
+        self._values: Dict[str, Any] = {}
+        self._step = 0
+
+    def _start(self, question: str) -> None:
+        for rule in self._model.script:
+            m = re.search(rule["match"], question)
+            if m is not None:
+                self._calls = rule.get("calls", ())
+                self._answer = rule.get("answer", "")
+                # groups of an alternative that did not take part are empty
+                self._values = {k: v or "" for k, v in m.groupdict().items()}
+                self._step = 0
+                return
+        self._calls, self._answer, self._values, self._step = (), "", {}, 0
+
+    def _observe(self, content: Any) -> None:
+        payload = _tool_payload(content)
+        rows = payload.get("results") or []
+        first = next(iter(rows[0].values()), None) if rows and rows[0] else None
+        if isinstance(first, float) and first.is_integer():
+            first = int(first)
+        self._values.update(rows=len(rows), first=first, error=payload.get("error"))
+        self._step += 1
+
+    def _next(self) -> FakeResponse:
+        values = _Format(self._values)
+        if self._step < len(self._calls):
+            query = self._calls[self._step].format_map(values)
+            return FakeResponse.of([_Part(function_call=_FunctionCall("execute_cypher_query", {"query": query}))])
+        return FakeResponse.of([_Part(text=self._answer.format_map(values))])
+
+    def _turn(self, content: Any) -> FakeResponse:
+        if isinstance(content, str):
+            self._start(content)
+        else:
+            self._observe(content)
+        return self._next()
+
+    def send_message(self, content: Any, stream: bool = False) -> FakeResponse:
+        time.sleep(self._model.latency)
+        return self._turn(content)
+
+    async def send_message_async(self, content: Any, stream: bool = False):
+        await asyncio.sleep(self._model.latency)
+        response = self._turn(content)
+        if not stream:
+            return response
+        if response.candidates[0].content.parts[0].function_call is not None:
+            return FakeStream([response])
+        return FakeStream(_chunks(response.text))
+
+
+class FakeGenerativeModel:
+    def __init__(self, script: Optional[List[Dict[str, Any]]] = None, latency: float = 0.0) -> None:
+        self.script = script or DEFAULT_SCRIPT
+        # seconds per model turn
+        self.latency = latency
+
+    def start_chat(self, **kwargs: Any) -> FakeChat:
+        return FakeChat(self)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        # answer-only model (plan-cache hits): echoes the size of the result it was given
+        await asyncio.sleep(self.latency)
+        text = f"Sorgu sonucu hazır ({len(prompt)} karakter)."
+        return FakeStream(_chunks(text)) if stream else FakeResponse.of([_Part(text=text)])
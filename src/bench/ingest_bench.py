@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import platform
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.bench.revision import git_revision
+from src.bench.synthetic import SyntheticRepoConfig, generate_repository
+from src.ingest.authorship import LogAuthorIndex, discover_developers_for_file
+from src.ingest.parser import collect_graph_data, iter_source_files, parse_files, parse_python_file
+from src.ingest.pipeline import IngestPipeline
+from src.ingest.writer import DEFAULT_BATCH_SIZE, BulkWriter
+
+
+class _RecordedResult:
+    def consume(self) -> None:
+        return None
+
+    def data(self) -> List[Dict[str, Any]]:
+        return []
+
+
+class _RecordingTx:
+    def __init__(self, session: "RecordingSession") -> None:
+        self._session = session
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> _RecordedResult:
+        params = {**(parameters or {}), **kwargs}
+        self._session.statements += 1
+        self._session.rows += len(params.get("rows", ())) or 1
+        return _RecordedResult()
+
+
+class RecordingSession:
+    # local stand-in for a neo4j Session: counts transactions, statements and rows
+
+    def __init__(self) -> None:
+        self.transactions = 0
+        self.statements = 0
+        self.rows = 0
+
+    def execute_write(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self.transactions += 1
+        return fn(_RecordingTx(self), *args, **kwargs)
+
+    execute_read = execute_write
+
+
+@dataclass
+class StageResult:
+    seconds: float
+    files: int = 0
+    functions: int = 0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["files_per_s"] = round(self.files / self.seconds, 2) if self.seconds > 0 and self.files else None
+        data["functions_per_s"] = round(self.functions / self.seconds, 2) if self.seconds > 0 and self.functions else None
+        data["seconds"] = round(self.seconds, 6)
+        return data
+
+
+def _timed(fn: Callable[[], Any]) -> tuple[Any, float]:
+    started = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - started
+
+
+def _open_session_factory(use_neo4j: bool):
+    if not use_neo4j:
+        return None, lambda: contextlib.nullcontext(RecordingSession())
+    from src.config import settings
+    from src.ingest.ingest import open_client
+
+    client = open_client()
+    client.ensure_constraints()
+    return client, lambda: client._driver.session(database=settings.NEO4J_DATABASE)
+
+
+def run_benchmark(
+    root: Path,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    blame_limit: int = 200,
+    use_neo4j: bool = False,
+) -> Dict[str, StageResult]:
+    stages: Dict[str, StageResult] = {}
+
+    paths, seconds = _timed(lambda: sorted(iter_source_files(root)))
+    stages["iter_source_files"] = StageResult(seconds, files=len(paths))
+
+    def _parse_serial() -> int:
+        functions = 0
+        for path in paths:
+            try:
+                functions += len(parse_python_file(path)[1])
+            except SyntaxError:
+                continue
+        return functions
+
+    function_count, seconds = _timed(_parse_serial)
+    stages["parse_python_file"] = StageResult(seconds, files=len(paths), functions=function_count)
+
+    if workers > 1:
+        _, seconds = _timed(lambda: sum(1 for _ in parse_files(paths, workers=workers)))
+        stages[f"parse_files_workers_{workers}"] = StageResult(
+            seconds, files=len(paths), functions=function_count, extra={"workers": workers}
+        )
+
+    sample = paths[:blame_limit]
+    _, seconds = _timed(lambda: [discover_developers_for_file(path) for path in sample])
+    stages["discover_developers_for_file"] = StageResult(seconds, files=len(sample), extra={"sampled": len(sample)})
+
+    def _log_index() -> int:
+        index = LogAuthorIndex(root)
+        index.build()
+        return sum(1 for path in paths if index.developers_for(path))
+
+    attributed, seconds = _timed(_log_index)
+    stages["authorship_git_log"] = StageResult(seconds, files=len(paths), extra={"attributed_files": attributed})
+
+    modules, functions, libraries, developers_by_file = collect_graph_data(root, include_devs=False, workers=1)
+    client, new_session = _open_session_factory(use_neo4j)
+    try:
+        with new_session() as session:
+            writer = BulkWriter(session, batch_size=batch_size)
+            _, seconds = _timed(lambda: writer.write_graph(modules, functions, libraries, developers_by_file, root))
+        stages["bulk_write"] = StageResult(
+            seconds,
+            files=len(modules),
+            functions=len(functions),
+            extra=_session_stats(session, batch_size),
+        )
+
+        with new_session() as session:
+            pipeline = IngestPipeline(root, BulkWriter(session, batch_size=batch_size), include_devs=False, workers=workers)
+            result, seconds = _timed(lambda: pipeline.run(paths))
+        stages["pipeline_end_to_end"] = StageResult(
+            seconds,
+            files=result.files,
+            functions=result.functions,
+            extra={"calls": result.calls, **_session_stats(session, batch_size)},
+        )
+    finally:
+        if client is not None:
+            client.close()
+    return stages
+
+
+def _session_stats(session: Any, batch_size: int) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"batch_size": batch_size}
+    if isinstance(session, RecordingSession):
+        stats.update(transactions=session.transactions, statements=session.statements, rows=session.rows)
+    return stats
+
+
+def build_report(
+    stages: Dict[str, StageResult],
+    config: Optional[SyntheticRepoConfig],
+    root: Path,
+    workers: int,
+    batch_size: int,
+    use_neo4j: bool,
+) -> Dict[str, Any]:
+    return {
+        "revision": git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repository": str(root) if config is None else None,
+        "synthetic": config.as_dict() if config is not None else None,
+        "workers": workers,
+        "batch_size": batch_size,
+        "writer": "neo4j" if use_neo4j else "recording",
+        "stages": {name: stage.as_dict() for name, stage in stages.items()},
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    lines = [f"{'stage':32} {'baseline s':>12} {'current s':>12} {'change':>9}"]
+    for name, stage in current["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if not old or not old.get("seconds"):
+            lines.append(f"{name:32} {'-':>12} {stage['seconds']:>12.4f} {'new':>9}")
+            continue
+        change = (stage["seconds"] - old["seconds"]) / old["seconds"] * 100
+        lines.append(f"{name:32} {old['seconds']:>12.4f} {stage['seconds']:>12.4f} {change:>+8.1f}%")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ingestion stages on a synthetic (or existing) repository")
+    parser.add_argument("--repo", type=str, default=None, help="Benchmark an existing source tree instead")
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--functions-per-module", type=int, default=20)
+    parser.add_argument("--call-density", type=float, default=3.0, help="Average calls per function")
+    parser.add_argument("--import-fanout", type=int, default=3, help="Project modules imported per module")
+    parser.add_argument("--git-commits", type=int, default=0, help="Synthetic commits to create (0 = no git history)")
+    parser.add_argument("--git-authors", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--blame-limit", type=int, default=200, help="Files sampled for the per-file git blame stage")
+    parser.add_argument(
+        "--neo4j",
+        action="store_true",
+        help="Write to the configured Neo4j (NEO4J_* settings) instead of the recording stand-in",
+    )
+    parser.add_argument("--output", type=str, default="bench_ingest.json", help="JSON report path")
+    parser.add_argument("--compare", type=str, default=None, help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    config: Optional[SyntheticRepoConfig] = None
+    with tempfile.TemporaryDirectory(prefix="ingest-bench-") as tmp:
+        if args.repo:
+            root = Path(args.repo)
+        else:
+            config = SyntheticRepoConfig(
+                modules=args.modules,
+                functions_per_module=args.functions_per_module,
+                call_density=args.call_density,
+                import_fanout=args.import_fanout,
+                git_commits=args.git_commits,
+                git_authors=args.git_authors,
+                seed=args.seed,
+            )
+            root = generate_repository(Path(tmp) / "repo", config)
+        stages = run_benchmark(
+            root,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            blame_limit=args.blame_limit,
+            use_neo4j=args.neo4j,
+        )
+
+    report = build_report(stages, config, root, args.workers, args.batch_size, args.neo4j)
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    for name, stage in report["stages"].items():
+        rate = f"{stage['files_per_s']} files/s" if stage["files_per_s"] else ""
+        frate = f"{stage['functions_per_s']} functions/s" if stage["functions_per_s"] else ""
+        print(f"{name:32} {stage['seconds']:>10.4f} s  {rate:>18} {frate:>22}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print()
+        print("\n".join(compare_reports(baseline, report)))
+    print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import os
+import random
+import subprocess
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+@dataclass
+class SyntheticRepoConfig:
+    modules: int = 200
+    functions_per_module: int = 20
+    # average outgoing calls per function; split between local and imported targets
+    call_density: float = 3.0
+    # modules imported by each module
+    import_fanout: int = 3
+    modules_per_package: int = 50
+    git_commits: int = 0
+    git_authors: int = 5
+    seed: int = 1234
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _module_path(index: int, config: SyntheticRepoConfig) -> str:
+    return f"pkg_{index // config.modules_per_package}/mod_{index}.py"
+
+
+def _module_name(index: int, config: SyntheticRepoConfig) -> str:
+    return f"pkg_{index // config.modules_per_package}.mod_{index}"
+
+
+def _render_module(index: int, config: SyntheticRepoConfig, rng: random.Random) -> str:
+    others = [i for i in range(config.modules) if i != index]
+    imported = rng.sample(others, min(config.import_fanout, len(others)))
+    lines: List[str] = ["import os", "import json", ""]
+    for i in imported:
+        lines.append(f"from {_module_name(i, config)} import func_{i}_0")
+    for n, i in enumerate(imported):
+        lines.append(f"import {_module_name(i, config)} as m{n}")
+    lines.append("")
+
+    for f in range(config.functions_per_module):
+        calls = int(config.call_density) + (1 if rng.random() < config.call_density % 1 else 0)
+        lines.append(f"def func_{index}_{f}(a, b=None) -> int:")
+        body: List[str] = []
+        for _ in range(calls):
+            kind = rng.random()
+            if kind < 0.5 or not imported:
+                body.append(f"    func_{index}_{rng.randrange(config.functions_per_module)}(a)")
+            elif kind < 0.75:
+                i = rng.choice(imported)
+                body.append(f"    func_{i}_0(a)")
+            else:
+                n = rng.randrange(len(imported))
+                body.append(f"    m{n}.func_{imported[n]}_{rng.randrange(config.functions_per_module)}(a)")
+        body.append("    return len(json.dumps(os.sep))")
+        lines.extend(body)
+        lines.append("")
+
+    lines.append(f"class Service{index}:")
+    lines.append("    def run(self):")
+    lines.append(f"        return self.helper() + func_{index}_0(1)")
+    lines.append("")
+    lines.append("    def helper(self):")
+    lines.append("        return 0")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _git(root: Path, *args: str, env: Dict[str, str] | None = None) -> None:
+    subprocess.run(["git", *args], cwd=str(root), check=True, capture_output=True, env=env)
+
+
+def _write_history(root: Path, config: SyntheticRepoConfig, rng: random.Random) -> None:
+    _git(root, "init", "-q")
+    authors = [(f"Dev {n}", f"dev{n}@example.com") for n in range(max(1, config.git_authors))]
+    paths = [_module_path(i, config) for i in range(config.modules)]
+    for commit in range(config.git_commits):
+        name, email = rng.choice(authors)
+        env = {
+            **os.environ,
+            "GIT_AUTHOR_NAME": name,
+            "GIT_AUTHOR_EMAIL": email,
+            "GIT_COMMITTER_NAME": name,
+            "GIT_COMMITTER_EMAIL": email,
+        }
+        if commit == 0:
+            _git(root, "add", "-A")
+        else:
+            touched = rng.sample(paths, min(len(paths), max(1, len(paths) // 20)))
+            for rel in touched:
+                with open(root / rel, "a", encoding="utf-8") as fh:
+                    fh.write(f"\n# revision {commit}\n")
+            _git(root, "add", *touched)
+        _git(root, "commit", "-q", "-m", f"synthetic commit {commit}", env=env)
+
+
+def generate_repository(root: Path, config: SyntheticRepoConfig) -> Path:
+    rng = random.Random(config.seed)
+    root.mkdir(parents=True, exist_ok=True)
+    packages = {i // config.modules_per_package for i in range(config.modules)}
+    for package in packages:
+        (root / f"pkg_{package}").mkdir(exist_ok=True)
+        (root / f"pkg_{package}" / "__init__.py").write_text("", encoding="utf-8")
+    for index in range(config.modules):
+        (root / _module_path(index, config)).write_text(_render_module(index, config, rng), encoding="utf-8")
+    if config.git_commits > 0:
+        _write_history(root, config, rng)
+    return root
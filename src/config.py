@@ -18,6 +18,36 @@ class Settings:
     NEO4J_USERNAME: str | None = _get_env_str("NEO4J_USERNAME", "neo4j")
     NEO4J_PASSWORD: str | None = _get_env_str("NEO4J_PASSWORD", "tyFMUlet-VQCED7akjYElNqgy5RAd4XJmpxElg-MkTU")
     NEO4J_DATABASE: str | None = _get_env_str("NEO4J_DATABASE", "neo4j")
+    # Connection pool of the process-wide driver (bridge server)
+    NEO4J_MAX_POOL_SIZE: int = int(_get_env_str("NEO4J_MAX_POOL_SIZE", "50"))
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT: float = float(_get_env_str("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "30"))
+    NEO4J_MAX_CONNECTION_LIFETIME: float = float(_get_env_str("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+    # Per-request deadline (seconds) for bridge queries
+    NEO4J_QUERY_TIMEOUT: float = float(_get_env_str("NEO4J_QUERY_TIMEOUT", "30"))
+    # Row limits of bridge responses: plain responses are truncated at QUERY_MAX_ROWS,
+    # paginated ones serve pages of QUERY_PAGE_SIZE, NDJSON streams stop at STREAM_MAX_ROWS
+    QUERY_MAX_ROWS: int = int(_get_env_str("QUERY_MAX_ROWS", "1000"))
+    QUERY_PAGE_SIZE: int = int(_get_env_str("QUERY_PAGE_SIZE", "200"))
+    STREAM_MAX_ROWS: int = int(_get_env_str("STREAM_MAX_ROWS", "100000"))
+    # /execute_cypher_batch: items per request, concurrent sessions in parallel mode
+    BATCH_MAX_ITEMS: int = int(_get_env_str("BATCH_MAX_ITEMS", "50"))
+    BATCH_MAX_PARALLEL: int = int(_get_env_str("BATCH_MAX_PARALLEL", "8"))
+    # Query admission: every query is EXPLAINed once (plan summary cached per normalized query)
+    # and rejected above ADMISSION_MAX_ESTIMATED_ROWS or when its plan uses a forbidden operator;
+    # above ADMISSION_SOFT_ESTIMATED_ROWS it runs with the shorter ADMISSION_SOFT_TIMEOUT
+    ADMISSION_ENABLED: bool = _get_env_str("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+    ADMISSION_MAX_ESTIMATED_ROWS: float = float(_get_env_str("ADMISSION_MAX_ESTIMATED_ROWS", "10000000"))
+    ADMISSION_SOFT_ESTIMATED_ROWS: float = float(_get_env_str("ADMISSION_SOFT_ESTIMATED_ROWS", "1000000"))
+    ADMISSION_SOFT_TIMEOUT: float = float(_get_env_str("ADMISSION_SOFT_TIMEOUT", "10"))
+    ADMISSION_FORBIDDEN_OPERATORS: str = _get_env_str("ADMISSION_FORBIDDEN_OPERATORS", "CartesianProduct") or ""
+    ADMISSION_PLAN_CACHE_SIZE: int = int(_get_env_str("ADMISSION_PLAN_CACHE_SIZE", "1024"))
+    ADMISSION_PLAN_TTL: float = float(_get_env_str("ADMISSION_PLAN_TTL", "600"))
+    # Read-only query result cache (bytes, seconds); invalidated on every ingestion run
+    QUERY_CACHE_ENABLED: bool = _get_env_str("QUERY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+    QUERY_CACHE_MAX_BYTES: int = int(_get_env_str("QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    QUERY_CACHE_TTL: float = float(_get_env_str("QUERY_CACHE_TTL", "300"))
+    # how often the graph generation marker is re-read (seconds)
+    QUERY_CACHE_GENERATION_CHECK: float = float(_get_env_str("QUERY_CACHE_GENERATION_CHECK", "5"))
 
     # Bridge server (MCP-like)
     MCP_SERVER_HOST: str | None = _get_env_str("MCP_SERVER_HOST", "0.0.0.0")
@@ -26,6 +56,43 @@ class Settings:
 
     # Gemini
     GEMINI_API_KEY: str | None = _get_env_str("GEMINI_API_KEY", None)
+    # Per-request deadline (seconds) for /ask, tool round trips included
+    ASK_TIMEOUT: float = float(_get_env_str("ASK_TIMEOUT", "120"))
+    # Questions talking to Gemini at once; up to ASK_MAX_QUEUE more wait ASK_QUEUE_TIMEOUT
+    # seconds for a slot, the rest get 503
+    ASK_MAX_CONCURRENCY: int = int(_get_env_str("ASK_MAX_CONCURRENCY", "8"))
+    ASK_MAX_QUEUE: int = int(_get_env_str("ASK_MAX_QUEUE", "32"))
+    ASK_QUEUE_TIMEOUT: float = float(_get_env_str("ASK_QUEUE_TIMEOUT", "30"))
+    # Tool calls of /ask run in-process; set a bridge URL to send them to a remote bridge instead.
+    # Comma-separated: the first is the default, the others may be picked per request (`server`)
+    ASK_BRIDGE_URL: str | None = _get_env_str("ASK_BRIDGE_URL", None)
+    ASK_BRIDGE_MAX_CONNECTIONS: int = int(_get_env_str("ASK_BRIDGE_MAX_CONNECTIONS", "20"))
+    # Tool results sent back to the model: larger ones are cut to the budget (rows, bytes)
+    # and summarized per column (TOP_K most frequent values)
+    TOOL_RESULT_MAX_ROWS: int = int(_get_env_str("TOOL_RESULT_MAX_ROWS", "50"))
+    TOOL_RESULT_MAX_BYTES: int = int(_get_env_str("TOOL_RESULT_MAX_BYTES", "16384"))
+    TOOL_RESULT_TOP_K: int = int(_get_env_str("TOOL_RESULT_TOP_K", "5"))
+    # Seconds between reads of the live graph schema used in the assistant's prompt
+    SCHEMA_REFRESH_INTERVAL: float = float(_get_env_str("SCHEMA_REFRESH_INTERVAL", "600"))
+    # common /ask question shapes answered from fixed Cypher templates without the model
+    INTENT_ROUTER_ENABLED: bool = _get_env_str("INTENT_ROUTER_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+    # /ask plan cache: normalized question -> validated Cypher in SQLite (entries, seconds);
+    # results of at most PLAN_CACHE_TEMPLATE_ROWS rows are answered without the model
+    PLAN_CACHE_ENABLED: bool = _get_env_str("PLAN_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+    PLAN_CACHE_PATH: str = _get_env_str("PLAN_CACHE_PATH", ".graph_plan_cache.sqlite3") or ".graph_plan_cache.sqlite3"
+    PLAN_CACHE_MAX_ENTRIES: int = int(_get_env_str("PLAN_CACHE_MAX_ENTRIES", "5000"))
+    PLAN_CACHE_TTL: float = float(_get_env_str("PLAN_CACHE_TTL", str(7 * 24 * 3600)))
+    PLAN_CACHE_TEMPLATE_ROWS: int = int(_get_env_str("PLAN_CACHE_TEMPLATE_ROWS", "5"))
+
+    # Backends for offline benchmarks / CI: LLM_BACKEND=fake replays FAKE_LLM_SCRIPT (JSON,
+    # default: built-in rules) with FAKE_LLM_LATENCY seconds per model turn; GRAPH_BACKEND=memory
+    # answers from a synthetic in-memory graph of FAKE_GRAPH_MODULES modules
+    LLM_BACKEND: str = (_get_env_str("LLM_BACKEND", "gemini") or "gemini").lower()
+    FAKE_LLM_SCRIPT: str | None = _get_env_str("FAKE_LLM_SCRIPT", None)
+    FAKE_LLM_LATENCY: float = float(_get_env_str("FAKE_LLM_LATENCY", "0.05"))
+    GRAPH_BACKEND: str = (_get_env_str("GRAPH_BACKEND", "neo4j") or "neo4j").lower()
+    FAKE_GRAPH_MODULES: int = int(_get_env_str("FAKE_GRAPH_MODULES", "200"))
+    FAKE_GRAPH_LATENCY: float = float(_get_env_str("FAKE_GRAPH_LATENCY", "0.002"))
 
 
 settings = Settings()
@@ -4,6 +4,7 @@ import argparse
 import json
 from typing import Any, Dict, List
 
+from src.config import settings
 from src.gemini.service import ask
 
 
@@ -36,7 +37,7 @@ def build_tool_schema(server_url: str) -> Dict[str, Any]:
 
 
 def run_question(question: str, server_url: str) -> None:
-    print(ask(question, server_url))
+    print(ask(question, server_url, intent_router=settings.INTENT_ROUTER_ENABLED))
 
 
 def main() -> None:
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Pattern, Sequence, Tuple
+
+
+# Deterministic fast path in front of the Gemini tool loop: the common question shapes are
+# matched with Turkish and English patterns, answered with a fixed parameterized Cypher
+# template and rendered locally. Anything that does not match goes to the model.
+#
+# Patterns run on a folded copy of the question (lowercase, Turkish letters -> ASCII) that
+# has the same length as the original, so captured names are sliced from the original text.
+
+_FOLD = str.maketrans("ıİüÜöÖçÇşŞğĞ", "iiuuooccssgg")
+_TRAILING = re.compile(r"[\s?!.]+$")
+_WHITESPACE = re.compile(r"\s+")
+_LEADING_DOT = re.compile(r"^(?:\.?/)+")
+
+_FILE = r"[`'\"]?(?P<dosya>[\w./\\-]*\w\.[a-z][a-z0-9]{0,4})[`'\"]?"
+_FUNCTION = r"[`'\"]?(?P<fonksiyon>[a-z_]\w*)(?:\(\))?[`'\"]?"
+# Turkish case suffix after a name: auth.py'yi, parse'ın
+_SUFFIX = r"(?:'\w+)?"
+_NOUN_FILE = r"(?:\s+(?:dosya|modul)\w*)?"
+_EN_FILE = r"(?:the\s+)?(?:file\s+|module\s+)?" + _FILE + r"(?:\s+(?:file|module))?"
+_EN_FUNCTION = r"(?:the\s+)?(?:function\s+)?" + _FUNCTION + r"(?:\s+function)?"
+_TOP = r"(?:top\s+)?"
+_LIMIT = r"(?:(?P<n>\d{1,3})\s+)?"
+
+# GrafOzet property, label, Turkish noun, English noun
+_COUNTS: Dict[str, Tuple[str, str, str, str]] = {
+    "modul": ("modul_sayisi", "Modul", "modül", "modules"),
+    "fonksiyon": ("fonksiyon_sayisi", "Fonksiyon", "fonksiyon", "functions"),
+    "kutuphane": ("kutuphane_sayisi", "Kutuphane", "kütüphane", "libraries"),
+    "gelistirici": ("gelistirici_sayisi", "Gelistirici", "geliştirici", "developers"),
+}
+_COUNT_KINDS = {
+    "modu": "modul",
+    "fonk": "fonksiyon",
+    "func": "fonksiyon",
+    "kutu": "kutuphane",
+    "libr": "kutuphane",
+    "geli": "gelistirici",
+    "deve": "gelistirici",
+    "auth": "gelistirici",
+}
+_TR_KIND = r"(?P<kind>modul|fonksiyon|kutuphane|gelistirici)\w*"
+_EN_KIND = r"(?P<kind>modules?|functions?|librar(?:y|ies)|developers?|authors?)"
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+# module by file name or path suffix, seeking the dosya_adi index; see file_params
+_MATCH_MODUL = (
+    "MATCH (m:Modul {dosya_adi: $dosya_adi}) "
+    "WHERE m.goreli_yol = $yol OR m.goreli_yol ENDS WITH $sonek OR m.dosya_yolu = $dosya "
+)
+
+WHO_WROTE = (
+    _MATCH_MODUL
+    + "MATCH (g:Gelistirici)-[:YAZDI]->(m) "
+    "RETURN DISTINCT g.isim AS isim, g.email AS email ORDER BY isim LIMIT 50"
+)
+LIBRARIES_OF = (
+    _MATCH_MODUL
+    + "MATCH (m)-[:KULLANIR]->(k:Kutuphane) "
+    "RETURN DISTINCT k.isim AS isim, k.versiyon AS versiyon ORDER BY isim LIMIT 100"
+)
+CALLERS_OF = (
+    "MATCH (f:Fonksiyon {isim: $fonksiyon})<-[:CAGIRIR]-(c:Fonksiyon) "
+    "RETURN DISTINCT c.isim AS isim, c.dosya_yolu AS dosya_yolu ORDER BY dosya_yolu, isim LIMIT 100"
+)
+TOP_FUNCTIONS = (
+    "MATCH (f:Fonksiyon) WHERE f.fan_in IS NOT NULL "
+    "RETURN f.isim AS isim, f.dosya_yolu AS dosya_yolu, f.fan_in AS fan_in ORDER BY f.fan_in DESC LIMIT $limit"
+)
+TOP_LIBRARIES = (
+    "MATCH (k:Kutuphane) WHERE k.kullanan_modul_sayisi IS NOT NULL "
+    "RETURN k.isim AS isim, k.kullanan_modul_sayisi AS sayi ORDER BY k.kullanan_modul_sayisi DESC LIMIT $limit"
+)
+# the precomputed summary when present, a label count (count store) before the first analytics run
+COUNT_QUERIES = {
+    kind: (
+        "OPTIONAL MATCH (o:GrafOzet {ad: 'graf'}) "
+        f"RETURN CASE WHEN o.{prop} IS NULL THEN COUNT {{ (:{label}) }} ELSE o.{prop} END AS sayi"
+    )
+    for kind, (prop, label, _, _) in _COUNTS.items()
+}
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    intent: str
+    # "tr" or "en": language of the matched pattern, used for the answer
+    lang: str
+    cypher: str
+    params: Dict[str, Any]
+    render: Callable[[List[Dict[str, Any]], "IntentMatch"], str]
+
+
+@dataclass(frozen=True)
+class _Intent:
+    name: str
+    patterns: Tuple[Tuple[str, Pattern[str]], ...]
+    build: Callable[[Dict[str, str]], Tuple[str, Dict[str, Any]]]
+    render: Callable[[List[Dict[str, Any]], IntentMatch], str]
+
+
+def _patterns(tr: Sequence[str], en: Sequence[str]) -> Tuple[Tuple[str, Pattern[str]], ...]:
+    return tuple(("tr", re.compile(f"^{p}$")) for p in tr) + tuple(("en", re.compile(f"^{p}$")) for p in en)
+
+
+def file_params(name: str) -> Dict[str, Any]:
+    # against the lowercase, "/" separated lookup properties; "db.py" must not match "mydb.py"
+    posix = _LEADING_DOT.sub("", name.replace("\\", "/")).lower()
+    return {"dosya": name, "dosya_adi": posix.rsplit("/", 1)[-1], "yol": posix, "sonek": "/" + posix}
+
+
+def _limit(groups: Dict[str, str]) -> int:
+    n = groups.get("n")
+    return min(max(1, int(n)), MAX_LIMIT) if n else DEFAULT_LIMIT
+
+
+def _people(rows: List[Dict[str, Any]]) -> str:
+    return ", ".join(f"{r['isim']} ({r['email']})" if r.get("email") else str(r.get("isim")) for r in rows)
+
+
+def _truncated_note(match: IntentMatch, truncated: bool) -> str:
+    if not truncated:
+        return ""
+    return " (liste kısaltıldı)" if match.lang == "tr" else " (list truncated)"
+
+
+def _render_who_wrote(rows: List[Dict[str, Any]], match: IntentMatch) -> str:
+    name = match.params["dosya"]
+    if not rows:
+        if match.lang == "tr":
+            return f"{name} için kayıtlı geliştirici bulunamadı."
+        return f"No developers are recorded for {name}."
+    if match.lang == "tr":
+        return f"{name} dosyasını yazanlar: {_people(rows)}."
+    return f"{name} was written by {_people(rows)}."
+
+
+def _render_libraries(rows: List[Dict[str, Any]], match: IntentMatch) -> str:
+    name = match.params["dosya"]
+    names = ", ".join(f"{r['isim']} {r['versiyon']}" if r.get("versiyon") else str(r["isim"]) for r in rows)
+    if not rows:
+        if match.lang == "tr":
+            return f"{name} için kullanılan kütüphane bulunamadı."
+        return f"No libraries are recorded for {name}."
+    if match.lang == "tr":
+        return f"{name} şu kütüphaneleri kullanıyor: {names}."
+    return f"{name} uses: {names}."
+
+
+def _render_callers(rows: List[Dict[str, Any]], match: IntentMatch) -> str:
+    name = match.params["fonksiyon"]
+    if not rows:
+        if match.lang == "tr":
+            return f"{name} fonksiyonunu çağıran bir fonksiyon bulunamadı."
+        return f"No function calls {name}."
+    callers = "\n".join(f"- {r['isim']} ({r['dosya_yolu']})" for r in rows)
+    if match.lang == "tr":
+        return f"{name} fonksiyonunu çağıranlar ({len(rows)}):\n{callers}"
+    return f"{name} is called by ({len(rows)}):\n{callers}"
+
+
+def _render_top_functions(rows: List[Dict[str, Any]], match: IntentMatch) -> str:
+    if not rows:
+        if match.lang == "tr":
+            return "Çağrı sayıları henüz hesaplanmamış (analiz adımını çalıştırın)."
+        return "Call counts have not been computed yet (run the analytics stage)."
+    lines = "\n".join(f"{i}. {r['isim']} ({r['dosya_yolu']}): {r['fan_in']}" for i, r in enumerate(rows, 1))
+    if match.lang == "tr":
+        return f"En çok çağrılan fonksiyonlar:\n{lines}"
+    return f"Most called functions:\n{lines}"
+
+
+def _render_top_libraries(rows: List[Dict[str, Any]], match: IntentMatch) -> str:
+    if not rows:
+        if match.lang == "tr":
+            return "Kütüphane kullanım sayıları henüz hesaplanmamış (analiz adımını çalıştırın)."
+        return "Library usage counts have not been computed yet (run the analytics stage)."
+    lines = "\n".join(f"{i}. {r['isim']}: {r['sayi']}" for i, r in enumerate(rows, 1))
+    if match.lang == "tr":
+        return f"En çok kullanılan kütüphaneler (modül sayısı):\n{lines}"
+    return f"Most used libraries (number of modules):\n{lines}"
+
+
+def _render_count(rows: List[Dict[str, Any]], match: IntentMatch) -> str:
+    _, _, tr_noun, en_noun = _COUNTS[match.params["kind"]]
+    count = rows[0]["sayi"] if rows else 0
+    if match.lang == "tr":
+        return f"Grafta {count} {tr_noun} var."
+    return f"The graph has {count} {en_noun}."
+
+
+def _count_kind(groups: Dict[str, str]) -> str:
+    return _COUNT_KINDS[groups["kind"].translate(_FOLD).lower()[:4]]
+
+
+INTENTS: Tuple[_Intent, ...] = (
+    _Intent(
+        "who_wrote",
+        _patterns(
+            tr=[
+                _FILE + _SUFFIX + _NOUN_FILE + r"\s+(?:kim|kimler|hangi\s+gelistiriciler?)\s+(?:tarafindan\s+)?yaz\w*",
+                _FILE + _SUFFIX + _NOUN_FILE + r"\s+(?:gelistiric|yazar)\w*(?:\s+(?:kim\w*|neler|nedir))?",
+                r"kim(?:ler)?\s+yazd\w*\s+" + _FILE + _SUFFIX + _NOUN_FILE,
+            ],
+            en=[
+                r"who\s+(?:wrote|authored|worked\s+on|owns|maintains|contributed\s+to)\s+" + _EN_FILE,
+                r"(?:authors?|developers?|contributors?|owners?)\s+(?:of|for)\s+" + _EN_FILE,
+            ],
+        ),
+        lambda g: (WHO_WROTE, file_params(g["dosya"])),
+        _render_who_wrote,
+    ),
+    _Intent(
+        "libraries_of",
+        _patterns(
+            tr=[
+                _FILE + _SUFFIX + _NOUN_FILE
+                + r"\s+(?:hangi\s+)?(?:kutuphane|bagimlilik)\w*(?:\s+(?:kullan\w*|neler\w*|nedir|hangileri\w*))?",
+            ],
+            en=[
+                r"(?:which|what)\s+(?:libraries|packages|dependencies)\s+(?:does|do|is)\s+"
+                + _EN_FILE + r"\s+(?:use|import|depend\s+on|using)",
+                r"(?:libraries|packages|dependencies|imports)\s+(?:of|used\s+by|in)\s+" + _EN_FILE,
+            ],
+        ),
+        lambda g: (LIBRARIES_OF, file_params(g["dosya"])),
+        _render_libraries,
+    ),
+    _Intent(
+        "callers_of",
+        _patterns(
+            tr=[
+                _FUNCTION + _SUFFIX + r"(?:\s+fonksiyon\w*)?"
+                + r"\s+(?:kim|kimler|hangi\s+fonksiyonlar?|nereden|nerelerden)\s+(?:tarafindan\s+)?cagr?\w*",
+            ],
+            en=[
+                r"(?:who|what|which\s+functions?)\s+calls?\s+" + _EN_FUNCTION,
+                r"(?:callers|call\s+sites)\s+of\s+" + _EN_FUNCTION,
+                r"where\s+is\s+" + _EN_FUNCTION + r"\s+called(?:\s+from)?",
+            ],
+        ),
+        lambda g: (CALLERS_OF, {"fonksiyon": g["fonksiyon"]}),
+        _render_callers,
+    ),
+    _Intent(
+        "top_functions",
+        _patterns(
+            tr=[r"en\s+cok\s+(?:cagrilan|cagirilan|kullanilan)\s+" + _LIMIT + r"fonksiyon\w*(?:\s+(?:hangileri\w*|neler\w*|nedir))?"],
+            en=[
+                r"(?:what\s+are\s+)?(?:the\s+)?" + _TOP + _LIMIT + r"most\s+(?:called|used)\s+functions?",
+                r"(?:the\s+)?top\s+" + _LIMIT + r"functions?(?:\s+by\s+(?:calls|fan.in))?",
+            ],
+        ),
+        lambda g: (TOP_FUNCTIONS, {"limit": _limit(g)}),
+        _render_top_functions,
+    ),
+    _Intent(
+        "top_libraries",
+        _patterns(
+            tr=[r"en\s+cok\s+kullanilan\s+" + _LIMIT + r"kutuphane\w*(?:\s+(?:hangileri\w*|neler\w*|nedir))?"],
+            en=[
+                r"(?:what\s+are\s+)?(?:the\s+)?" + _TOP + _LIMIT + r"most\s+used\s+(?:libraries|packages|dependencies)",
+                r"(?:the\s+)?top\s+" + _LIMIT + r"(?:libraries|packages|dependencies)",
+            ],
+        ),
+        lambda g: (TOP_LIBRARIES, {"limit": _limit(g)}),
+        _render_top_libraries,
+    ),
+    _Intent(
+        "count",
+        _patterns(
+            tr=[
+                r"(?:grafta\s+|projede\s+)?(?:toplam\s+)?(?:kac|ne\s+kadar)\s+(?:tane\s+)?" + _TR_KIND + r"(?:\s+(?:var|bulunuyor|mevcut)\w*)?",
+                r"(?:toplam\s+)?" + _TR_KIND + r"\s+sayisi(?:\s+(?:nedir|kac\w*|ne))?",
+            ],
+            en=[
+                r"how\s+many\s+" + _EN_KIND
+                + r"(?:\s+(?:are\s+there|exist|do\s+we\s+have|(?:are\s+)?in\s+the\s+(?:graph|project|repo\w*|codebase)))?",
+                r"(?:the\s+)?(?:total\s+)?(?:number|count)\s+of\s+" + _EN_KIND,
+            ],
+        ),
+        lambda g: (COUNT_QUERIES[_count_kind(g)], {"kind": _count_kind(g)}),
+        _render_count,
+    ),
+)
+
+
+def match_intent(question: str) -> Optional[IntentMatch]:
+    text = _TRAILING.sub("", _WHITESPACE.sub(" ", (question or "").strip()))
+    folded = text.translate(_FOLD).lower()
+    if len(folded) != len(text):
+        # lower() changed the length (rare scripts); spans would not line up
+        return None
+    for intent in INTENTS:
+        for lang, pattern in intent.patterns:
+            m = pattern.match(folded)
+            if m is None:
+                continue
+            # names keep the spelling of the question
+            groups = {k: text[m.start(k):m.end(k)] for k, v in m.groupdict().items() if v is not None}
+            cypher, params = intent.build(groups)
+            return IntentMatch(intent=intent.name, lang=lang, cypher=cypher, params=params, render=intent.render)
+    return None
+
+
+def render_answer(match: IntentMatch, result: Dict[str, Any]) -> str:
+    return match.render(result.get("results", []), match) + _truncated_note(match, result.get("truncated", False))
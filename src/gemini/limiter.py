@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class AskOverloaded(RuntimeError):
+    # all model slots are busy and the wait queue is full (or the wait timed out)
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Too many questions in progress; try again shortly.")
+        self.retry_after = retry_after
+
+
+class AskLimiter:
+    # Bounds how many questions talk to Gemini at once. Up to max_waiting more wait in line
+    # for at most wait_timeout seconds; beyond that a request fails fast with AskOverloaded
+    # instead of piling onto the API quota. One instance per event loop (app.state).
+
+    def __init__(self, max_concurrent: int, max_waiting: int, wait_timeout: Optional[float] = None) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_waiting = max(0, max_waiting)
+        self.wait_timeout = wait_timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._active = 0
+        self._waiting = 0
+        self._stats = dict.fromkeys(("admitted", "queued", "rejected", "timed_out"), 0)
+
+    def _retry_after(self) -> float:
+        return self.wait_timeout or 1.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if not self._semaphore.locked():
+            # a free slot is taken without suspending
+            await self._semaphore.acquire()
+        else:
+            if self._waiting >= self.max_waiting:
+                self._stats["rejected"] += 1
+                raise AskOverloaded(self._retry_after())
+            self._stats["queued"] += 1
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.wait_timeout)
+            except asyncio.TimeoutError:
+                self._stats["timed_out"] += 1
+                raise AskOverloaded(self._retry_after()) from None
+            finally:
+                self._waiting -= 1
+        self._active += 1
+        self._stats["admitted"] += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_waiting": self.max_waiting,
+            "active": self._active,
+            "waiting": self._waiting,
+            **self._stats,
+        }
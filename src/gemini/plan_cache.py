@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+PLAN_CACHE_FILENAME = ".graph_plan_cache.sqlite3"
+
+# literal values lifted out of a question into parameters: quoted text and file names
+_SLOT = re.compile(r"""`([^`]+)`|"([^"]+)"|'([^']+)'|((?:[\w.-]+/)*[\w-]+\.[A-Za-z][A-Za-z0-9]{0,4})\b""")
+_PUNCTUATION = re.compile(r"[?!.,;:]+(?=\s|$)")
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    key TEXT PRIMARY KEY,
+    prompt_version TEXT NOT NULL,
+    cypher TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS plans_last_used ON plans (last_used);
+"""
+
+
+def slot_name(index: int) -> str:
+    return f"slot{index}"
+
+
+def _fold(text: str) -> str:
+    # casefold() turns the Turkish dotted capital İ into "i" plus a combining dot
+    return text.replace("İ", "i").casefold()
+
+
+def normalize_question(question: str) -> Tuple[str, List[str]]:
+    # "Auth.py modülünü kim yazdı?" -> ("{0} modülünü kim yazdı", ["Auth.py"]); slot values
+    # keep their case, only the key is folded
+    slots: List[str] = []
+
+    def _lift(match: re.Match) -> str:
+        slots.append(next(group for group in match.groups() if group is not None))
+        return f" {{{len(slots) - 1}}} "
+
+    text = _SLOT.sub(_lift, question or "")
+    text = _PUNCTUATION.sub(" ", _fold(text))
+    return _WHITESPACE.sub(" ", text).strip(), slots
+
+
+def _literal(value: str) -> re.Pattern:
+    return re.compile("'" + re.escape(value) + "'|\"" + re.escape(value) + '"')
+
+
+def parameterize(cypher: str, slots: List[str], question: str = "") -> Optional[str]:
+    # every slot value must appear as a string literal, otherwise the query cannot be reused
+    # for the same question about another file; a value the model lowercased (the lookup
+    # properties are lowercase) becomes toLower($slotN), so "AUTH.PY" reuses it correctly
+    for index, value in enumerate(slots):
+        param = "$" + slot_name(index)
+        cypher, found = _literal(value).subn(param, cypher)
+        if not found and value.lower() != value:
+            cypher, found = _literal(value.lower()).subn(f"toLower({param})", cypher)
+        if not found:
+            return None
+    # any other literal copied from the question would be served to every question that
+    # only differs from it in case ("Foo" vs "foo"), since the key is folded
+    folded = _fold(question)
+    for match in _STRING_LITERAL.finditer(cypher):
+        text = _fold(match.group(0)[1:-1])
+        if text and re.search(r"(?<!\w)" + re.escape(text) + r"(?!\w)", folded):
+            return None
+    return cypher
+
+
+@dataclass(frozen=True)
+class CachedPlan:
+    key: str
+    cypher: str
+    params: Dict[str, Any]
+
+
+class PlanCache:
+    # normalized question -> validated Cypher, persisted in SQLite. Entries are bound to the
+    # prompt version (system prompt, tool schema, model), evicted least-recently-used past
+    # max_entries and dropped after ttl seconds.
+
+    def __init__(self, path: Path, prompt_version: str, max_entries: int = 5000, ttl: float = 7 * 24 * 3600) -> None:
+        self.path = path
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(("hits", "misses", "stores", "evictions", "invalidations"), 0)
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.executescript(_SCHEMA)
+        # a changed prompt makes every stored plan suspect
+        cursor = self._db.execute("DELETE FROM plans WHERE prompt_version != ?", (prompt_version,))
+        self._stats["invalidations"] += cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def lookup(self, question: str) -> Optional[CachedPlan]:
+        key, slots = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT cypher, created FROM plans WHERE key = ? AND prompt_version = ?",
+                (key, self.prompt_version),
+            ).fetchone()
+            if row is not None and row[1] + self.ttl <= now:
+                self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+                self._stats["evictions"] += 1
+                row = None
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE plans SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._stats["hits"] += 1
+        return CachedPlan(key=key, cypher=row[0], params={slot_name(i): value for i, value in enumerate(slots)})
+
+    def store(self, question: str, cypher: str) -> bool:
+        key, slots = normalize_question(question)
+        template = parameterize(cypher, slots, question)
+        if not key or template is None:
+            return False
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO plans (key, prompt_version, cypher, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, self.prompt_version, template, now, now),
+            )
+            self._stats["stores"] += 1
+            count = self._db.execute("SELECT count(*) FROM plans").fetchone()[0]
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM plans WHERE key IN (SELECT key FROM plans ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                self._stats["evictions"] += count - self.max_entries
+        return True
+
+    def forget(self, key: str) -> None:
+        # the stored query failed or was rejected; the next ask regenerates it
+        with self._lock:
+            self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = self._db.execute("SELECT count(*) FROM plans").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["prompt_version"] = self.prompt_version
+        return stats
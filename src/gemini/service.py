@@ -1,29 +1,82 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from typing import Any, Dict, List
+import time
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 import google.generativeai as genai
 import httpx
 
 from src.config import settings
+from src.gemini.intents import match_intent, render_answer
+from src.gemini.limiter import AskLimiter
+from src.gemini.plan_cache import PlanCache
+from src.gemini.shaping import shape_result
+from src.graph.admission import QueryRejected
+from src.graph.neo4j_client import FONKSIYON_FULLTEXT_INDEX, MODUL_FULLTEXT_INDEX, QUERY_ERRORS, query_error
 
+if TYPE_CHECKING:
+    from src.server.metrics import BridgeMetrics
 
-SYSTEM_PROMPT = (
+# (event name, payload) pairs produced by ask_events()
+AskEvent = Tuple[str, Dict[str, Any]]
+
+
+# used until the live schema has been read (and by the CLI when the bridge has none)
+STATIC_SCHEMA = (
+    "Düğümler: Gelistirici(isim,email,team,modul_sayisi), Modul(dosya_yolu,dosya_adi,goreli_yol,modul_adi,dil,fonksiyon_sayisi,kutuphane_sayisi,gelistirici_sayisi), "
+    "Fonksiyon(id,isim,parametreler,geri_donus_tipi,satir,dosya_yolu,fan_in,fan_out), Kutuphane(isim,versiyon,kullanan_modul_sayisi), "
+    "GrafOzet(ad='graf',modul_sayisi,fonksiyon_sayisi,kutuphane_sayisi,gelistirici_sayisi,cagri_sayisi). "
+    "İlişkiler: YAZDI(Gelistirici->Modul), ICERIR(Modul->Fonksiyon), CAGIRIR(Fonksiyon->Fonksiyon), KULLANIR(Modul->Kutuphane)."
+)
+
+SCHEMA_PLACEHOLDER = "<SEMA>"
+
+SYSTEM_PROMPT_TEMPLATE = (
     "Sen, bir yazılım projesinin kod tabanı hakkında uzman bir asistansın. "
     "Elindeki tek aracın execute_cypher_query olduğunu ve Neo4j bilgi grafiğini Cypher ile sorgulayacağını unutma. "
     "Şema detayları (etiketler ve alan adları KESİN olarak bunlardır): "
-    "Düğümler: Gelistirici(isim,email,team), Modul(dosya_yolu,dil), Fonksiyon(id,isim,parametreler,geri_donus_tipi,satir,dosya_yolu), Kutuphane(isim,versiyon). "
-    "İlişkiler: YAZDI(Gelistirici->Modul), ICERIR(Modul->Fonksiyon), CAGIRIR(Fonksiyon->Fonksiyon), KULLANIR(Modul->Kutuphane). "
-    "ÖNEMLİ: 'dosya_adi' alanı YOKTUR, her zaman 'dosya_yolu' kullan. Başlık/son ekle dosya ararken EŞİTLEME kullanma; dosya adı verilirse ENDS WITH ile eşle. "
+    + SCHEMA_PLACEHOLDER + " "
+    "ÖNEMLİ: dosya ararken dosya_yolu üzerinde ENDS WITH/CONTAINS kullanma (tüm modülleri tarar). İndeksli arama alanları küçük harflidir: "
+    "dosya adı için dosya_adi ('auth.py'), klasörlü yol için goreli_yol ENDS WITH ('auth/service.py', '/' ayraçlı), "
+    "modül adı için modul_adi ('src.auth.service', STARTS WITH de olur), fonksiyon için isim eşitliği. "
+    "Adın yalnızca bir parçası ya da yaklaşık hali verilirse tam metin indeksini kullan: "
+    f"modüller için '{MODUL_FULLTEXT_INDEX}', fonksiyonlar için '{FONKSIYON_FULLTEXT_INDEX}' (terimler yol/ad parçalarıdır, 'auth*' önek, 'auth~' yakın eşleşme). "
     "Örnekler: "
-    "1) Belirli bir dosya adı: MATCH (m:Modul) WHERE m.dosya_yolu ENDS WITH 'auth.py' MATCH (g:Gelistirici)-[:YAZDI]->(m) RETURN g.isim, g.email. "
-    "2) Modül sayısı: MATCH (m:Modul) RETURN count(m) AS modul_sayisi. "
-    "3) Kütüphaneler: MATCH (m:Modul)-[:KULLANIR]->(k:Kutuphane) RETURN k.isim, count(*) AS kullanilma. "
+    "1) Belirli bir dosya adı: MATCH (m:Modul {dosya_adi: 'auth.py'}) MATCH (g:Gelistirici)-[:YAZDI]->(m) RETURN g.isim, g.email. "
+    "2) Modül sayısı: MATCH (o:GrafOzet {ad: 'graf'}) RETURN o.modul_sayisi. "
+    "3) Kütüphaneler: MATCH (k:Kutuphane) RETURN k.isim, k.kullanan_modul_sayisi ORDER BY k.kullanan_modul_sayisi DESC LIMIT 10. "
+    "4) En çok çağrılan fonksiyonlar: MATCH (f:Fonksiyon) WHERE f.fan_in IS NOT NULL RETURN f.isim, f.dosya_yolu, f.fan_in ORDER BY f.fan_in DESC LIMIT 10. "
+    f"5) Adı 'auth' geçen modüller: CALL db.index.fulltext.queryNodes('{MODUL_FULLTEXT_INDEX}', 'auth*') YIELD node AS m, score "
+    "RETURN m.goreli_yol, score ORDER BY score DESC LIMIT 10. "
+    "fan_in/fan_out, *_sayisi alanları ve GrafOzet yükleme sırasında hesaplanmış hazır sayılardır; bu sorular için ilişkileri count() ile yeniden sayma, bu alanları oku. "
+    "Değişken uzunluklu yollara her zaman üst sınır ver ([:CAGIRIR*1..3]); birbirine bağlı olmayan MATCH kalıplarını aynı sorguda birleştirme. "
+    "Araç sonucu 'error' içerirse oradaki 'hint' alanına göre sorguyu düzeltip yeniden dene. "
+    "Sonuç 'truncated' ise satırların yalnızca bir kısmı gelmiştir; 'summary' tüm satırları özetler. "
+    "Kesin cevap gerekiyorsa sorguyu WHERE, count() veya LIMIT ile daraltıp yeniden çalıştır. "
     "Sadece gerekli alanları döndür ve mümkünse kısa yanıt ver."
 )
 
 
+def system_prompt(schema: Optional[str] = None) -> str:
+    return SYSTEM_PROMPT_TEMPLATE.replace(SCHEMA_PLACEHOLDER, schema or STATIC_SCHEMA)
+
+
+SYSTEM_PROMPT = system_prompt()
+
+
+MODEL_NAME = "gemini-1.5-pro"
+
+ANSWER_PROMPT = (
+    "Sen, bir yazılım projesinin kod tabanı hakkında uzman bir asistansın. "
+    "Sana bir soru ve bu soru için Neo4j grafında çalıştırılmış sorgunun sonucu verilecek. "
+    "Yalnızca bu sonuca dayanarak soruyu kısa ve doğal bir dille yanıtla."
+)
+
+
 def _build_tool_schema() -> Dict[str, Any]:
     return {
         "function_declarations": [
@@ -34,6 +87,11 @@ def _build_tool_schema() -> Dict[str, Any]:
                     "type": "OBJECT",
                     "properties": {
                         "query": {"type": "STRING", "description": "Cypher query"},
+                        "columns": {
+                            "type": "ARRAY",
+                            "items": {"type": "STRING"},
+                            "description": "Sonuçta istenen sütunlar (RETURN adları); boşsa hepsi",
+                        },
                     },
                     "required": ["query"],
                 },
@@ -42,57 +100,339 @@ def _build_tool_schema() -> Dict[str, Any]:
     }
 
 
-def _call_bridge(server_url: str, query: str) -> List[Dict[str, Any]]:
-    with httpx.Client(timeout=60) as client:
-        resp = client.post(f"{server_url}/execute_cypher_query", json={"query": query})
-        resp.raise_for_status()
-        data = resp.json()
-        return data.get("results", [])
+def _tool_result(resp: httpx.Response) -> Dict[str, Any]:
+    # a rejected or invalid query goes back to the model as the tool result, so it can fix it
+    if resp.status_code == 400:
+        return {"error": resp.json().get("detail")}
+    resp.raise_for_status()
+    data = resp.json()
+    return {"results": data.get("results", []), "truncated": data.get("truncated", False)}
 
 
-def ask(question: str, server_url: str) -> str:
-    if not settings.GEMINI_API_KEY:
-        raise RuntimeError("GEMINI_API_KEY is not set")
+class HttpToolExecutor:
+    # runs tool calls against a remote bridge; one keep-alive connection pool for all of them,
+    # so create it once per bridge URL and aclose() it on shutdown
+
+    def __init__(self, server_url: str, timeout: float = 60.0, max_connections: int = 20) -> None:
+        self.server_url = server_url.rstrip("/")
+        self._client = httpx.AsyncClient(
+            base_url=self.server_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def execute_cypher(self, query: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return _tool_result(await self._client.post("/execute_cypher_query", json={"query": query, "params": params}))
 
-    genai.configure(api_key=settings.GEMINI_API_KEY)
+    async def aclose(self) -> None:
+        await self._client.aclose()
 
-    def tool_handler(name: str, arguments: Dict[str, Any]):
-        if name != "execute_cypher_query":
-            return {"error": f"Unknown tool {name}"}
-        query = arguments.get("query", "")
-        # Guard: common misnaming fix
-        query = query.replace("dosya_adi", "dosya_yolu")
-        results = _call_bridge(server_url, query)
-        return {"results": results}
 
-    model = genai.GenerativeModel(
-        model_name="gemini-1.5-pro",
+class LocalToolExecutor:
+    # runs tool calls in the hosting process through `run(query, params) -> {"results": ...}`,
+    # e.g. the bridge server's own query path; no HTTP round trip back into the same server
+
+    def __init__(self, run: Callable[[str, Optional[Dict[str, Any]]], Awaitable[Dict[str, Any]]]) -> None:
+        self._run = run
+
+    async def execute_cypher(self, query: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        try:
+            return await self._run(query, params)
+        except QueryRejected as qr:
+            return {"error": qr.as_dict()}
+        except ValueError as ve:
+            return {"error": str(ve)}
+        except QUERY_ERRORS as e:
+            # Neo4j errors and deadlines go back to the model too, not out of the tool loop
+            return {"error": query_error(e)}
+
+    async def aclose(self) -> None:
+        return None
+
+
+ToolExecutor = Union[HttpToolExecutor, LocalToolExecutor]
+
+
+def _tool_query(name: str, arguments: Dict[str, Any]) -> str | None:
+    if name != "execute_cypher_query":
+        return None
+    return arguments.get("query", "")
+
+
+def _tool_columns(arguments: Dict[str, Any]) -> Optional[List[str]]:
+    columns = arguments.get("columns")
+    if not columns or isinstance(columns, str):
+        return None
+    return [str(c) for c in columns]
+
+
+def _shape(result: Dict[str, Any], columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    # what the model gets to see of a tool result
+    return shape_result(
+        result,
+        max_rows=settings.TOOL_RESULT_MAX_ROWS,
+        max_bytes=settings.TOOL_RESULT_MAX_BYTES,
+        top_k=settings.TOOL_RESULT_TOP_K,
+        columns=columns,
+    )
+
+
+@lru_cache(maxsize=8)
+def _configured_model(api_key: str, answer_only: bool, schema: Optional[str] = None):
+    # configured once per process, key and schema; a GenerativeModel holds no per-chat state
+    genai.configure(api_key=api_key)
+    if answer_only:
+        return genai.GenerativeModel(model_name=MODEL_NAME, system_instruction=ANSWER_PROMPT)
+    return genai.GenerativeModel(
+        model_name=MODEL_NAME,
         tools=[_build_tool_schema()],
-        system_instruction=SYSTEM_PROMPT,
+        system_instruction=system_prompt(schema),
     )
 
-    chat = model.start_chat(enable_automatic_function_calling=True)
-    # Newer SDKs handle function calling automatically when enabled; no explicit tool_config needed
-    response = chat.send_message(question)
-
-    while True:
-        made_call = False
-        for candidate in response.candidates or []:
-            for part in candidate.content.parts or []:
-                if getattr(part, "function_call", None):
-                    fn = part.function_call
-                    name = fn.name
-                    args = {k: v for k, v in fn.args.items()} if hasattr(fn, "args") else {}
-                    # Pass a JSON object (dict), not a JSON string
-                    tool_result = genai.protos.FunctionResponse(name=name, response=tool_handler(name, args))
-                    response = chat.send_message(tool_result)
-                    made_call = True
-                    break
-            if made_call:
-                break
-        if not made_call:
-            break
+
+@lru_cache(maxsize=1)
+def _fake_model(script: Optional[str], latency: float):
+    from src.bench.fake_llm import FakeGenerativeModel, load_script
+
+    return FakeGenerativeModel(load_script(script), latency)
+
+
+def _build_model(schema: Optional[str] = None):
+    if settings.LLM_BACKEND == "fake":
+        return _fake_model(settings.FAKE_LLM_SCRIPT, settings.FAKE_LLM_LATENCY)
+    if not settings.GEMINI_API_KEY:
+        raise RuntimeError("GEMINI_API_KEY is not set")
+    return _configured_model(settings.GEMINI_API_KEY, False, schema)
+
+
+def _build_answer_model():
+    # for plan-cache hits: the query already ran, the model only words the answer
+    if settings.LLM_BACKEND == "fake":
+        return _fake_model(settings.FAKE_LLM_SCRIPT, settings.FAKE_LLM_LATENCY)
+    if not settings.GEMINI_API_KEY:
+        raise RuntimeError("GEMINI_API_KEY is not set")
+    return _configured_model(settings.GEMINI_API_KEY, True)
+
+
+def prompt_version() -> str:
+    # plan cache entries are only valid for the prompt, tool schema and model that produced them;
+    # the live graph schema is left out, a plan broken by a schema change is forgotten on error
+    payload = json.dumps([SYSTEM_PROMPT_TEMPLATE, _build_tool_schema(), MODEL_NAME], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    # local answer for small results, no model call
+    if not rows:
+        return "Sonuç bulunamadı."
+    if len(rows) == 1 and len(rows[0]) == 1:
+        key, value = next(iter(rows[0].items()))
+        return f"{key}: {value}"
+    lines = [", ".join(f"{key}: {value}" for key, value in row.items()) for row in rows]
+    return "\n".join(f"- {line}" for line in lines)
+
+
+def _first_function_call(response):
+    for candidate in response.candidates or []:
+        for part in candidate.content.parts or []:
+            if getattr(part, "function_call", None):
+                fn = part.function_call
+                args = {k: v for k, v in fn.args.items()} if hasattr(fn, "args") else {}
+                return fn.name, args
+    return None
+
+
+def _bridge_schema(bridge: httpx.Client) -> Optional[str]:
+    # live schema description of the bridge; older bridges or an unreadable graph -> static one
+    try:
+        resp = bridge.get("/schema")
+        if resp.status_code == 200:
+            return resp.json().get("prompt")
+    except httpx.HTTPError:
+        pass
+    return None
+
+
+def ask(question: str, server_url: str, *, intent_router: bool = True) -> str:
+    intent = match_intent(question) if intent_router else None
+    if intent is not None:
+        with httpx.Client(base_url=server_url.rstrip("/"), timeout=60) as bridge:
+            resp = bridge.post("/execute_cypher_query", json={"query": intent.cypher, "params": intent.params})
+            result = _tool_result(resp)
+        if "error" not in result:
+            return render_answer(intent, result)
+
+    # one connection for the schema and all tool rounds of the question
+    with httpx.Client(base_url=server_url.rstrip("/"), timeout=60) as bridge:
+        model = _build_model(_bridge_schema(bridge))
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        # Newer SDKs handle function calling automatically when enabled; no explicit tool_config needed
+        response = chat.send_message(question)
+
+        while (call := _first_function_call(response)) is not None:
+            name, args = call
+            query = _tool_query(name, args)
+            if query is None:
+                result = {"error": f"Unknown tool {name}"}
+            else:
+                resp = bridge.post("/execute_cypher_query", json={"query": query})
+                result = _shape(_tool_result(resp), _tool_columns(args))
+            # Pass a JSON object (dict), not a JSON string
+            response = chat.send_message(genai.protos.FunctionResponse(name=name, response=result))
 
     return response.text or ""
 
 
+def _chunk_text(chunk) -> str:
+    # text of a streamed chunk or a whole response; .text raises when there is only a
+    # function call
+    texts = []
+    for candidate in chunk.candidates or []:
+        for part in candidate.content.parts or []:
+            if getattr(part, "text", None):
+                texts.append(part.text)
+    return "".join(texts)
+
+
+async def _model_turn(send, metrics, stream: bool) -> AsyncIterator[AskEvent]:
+    # one model call; while streaming yields ("token", ...) per chunk, always ends with
+    # ("response", response) carrying the complete response
+    started = time.perf_counter()
+    try:
+        response = await send(stream)
+        if stream:
+            async for chunk in response:
+                text = _chunk_text(chunk)
+                if text:
+                    yield "token", {"text": text}
+    finally:
+        if metrics is not None:
+            metrics.observe_gemini(time.perf_counter() - started)
+    yield "response", response
+
+
+async def ask_events(
+    question: str,
+    executor: ToolExecutor,
+    metrics: Optional[BridgeMetrics] = None,
+    plan_cache: Optional[PlanCache] = None,
+    intent_router: bool = True,
+    limiter: Optional[AskLimiter] = None,
+    stream: bool = False,
+    schema: Optional[str] = None,
+) -> AsyncIterator[AskEvent]:
+    # Progress of one question as (event, data) pairs:
+    #   tool_call {round, query}, tool_result {round, rows, truncated, error},
+    #   token {text} (stream=True only), answer {answer, source}
+    # source is "intent", "plan_cache" or "model". Model calls run inside a limiter slot;
+    # schema is the live graph description for the prompt (None: STATIC_SCHEMA).
+    if intent_router:
+        intent = match_intent(question)
+        if intent is not None:
+            yield "tool_call", {"round": 0, "query": intent.cypher, "intent": intent.intent}
+            result = await executor.execute_cypher(intent.cypher, intent.params)
+            yield "tool_result", _result_event(0, result)
+            # a failing template (e.g. rejected by admission) falls through to the model
+            if "error" not in result:
+                if metrics is not None:
+                    metrics.observe_intent(intent.intent)
+                    metrics.observe_tool_rounds(0)
+                yield "answer", {"answer": render_answer(intent, result), "source": "intent"}
+                return
+        if metrics is not None:
+            metrics.observe_intent("none")
+
+    slot = limiter.slot() if limiter is not None else nullcontext()
+
+    if plan_cache is not None:
+        plan = plan_cache.lookup(question)
+        if metrics is not None:
+            metrics.observe_plan_cache("hit" if plan is not None else "miss")
+        if plan is not None:
+            yield "tool_call", {"round": 0, "query": plan.cypher, "cached": True}
+            result = await executor.execute_cypher(plan.cypher, plan.params)
+            yield "tool_result", _result_event(0, result)
+            if "error" not in result:
+                if metrics is not None:
+                    metrics.observe_tool_rounds(0)
+                rows = result.get("results", [])
+                if len(rows) <= settings.PLAN_CACHE_TEMPLATE_ROWS and not result.get("truncated"):
+                    yield "answer", {"answer": format_rows(rows), "source": "plan_cache"}
+                    return
+                shaped = json.dumps(_shape(result), ensure_ascii=False, default=str)
+                prompt = f"Soru: {question}\nSorgu sonucu (JSON): {shaped}"
+                model = _build_answer_model()
+                async with slot:
+                    async for event, data in _model_turn(
+                        lambda s: model.generate_content_async(prompt, stream=s), metrics, stream
+                    ):
+                        if event == "response":
+                            yield "answer", {"answer": _chunk_text(data), "source": "plan_cache"}
+                        else:
+                            yield event, data
+                return
+            plan_cache.forget(plan.key)
+
+    model = _build_model(schema)
+    # tools are declarations only, the loop below executes them; no automatic function
+    # calling, which the SDK does not support together with streaming anyway
+    chat = model.start_chat()
+    rounds = 0
+    succeeded: List[str] = []
+    content: Any = question
+
+    async with slot:
+        while True:
+            response = None
+            async for event, data in _model_turn(lambda s: chat.send_message_async(content, stream=s), metrics, stream):
+                if event == "response":
+                    response = data
+                else:
+                    yield event, data
+            call = _first_function_call(response)
+            if call is None:
+                break
+            rounds += 1
+            name, args = call
+            query = _tool_query(name, args)
+            if query is None:
+                result = {"error": f"Unknown tool {name}"}
+            else:
+                yield "tool_call", {"round": rounds, "query": query}
+                result = await executor.execute_cypher(query)
+                if "error" not in result:
+                    succeeded.append(query)
+            yield "tool_result", _result_event(rounds, result)
+            content = genai.protos.FunctionResponse(name=name, response=_shape(result, _tool_columns(args)))
+
+    if metrics is not None:
+        metrics.observe_tool_rounds(rounds)
+    # only answers that rest on exactly one successful query can be replayed from that query
+    if plan_cache is not None and len(succeeded) == 1 and plan_cache.store(question, succeeded[0]):
+        if metrics is not None:
+            metrics.observe_plan_cache("store")
+    yield "answer", {"answer": _chunk_text(response), "source": "model"}
+
+
+def _result_event(round_: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    if "error" in result:
+        return {"round": round_, "error": result["error"]}
+    return {"round": round_, "rows": len(result.get("results", [])), "truncated": result.get("truncated", False)}
+
+
+async def ask_async(
+    question: str,
+    executor: ToolExecutor,
+    metrics: Optional[BridgeMetrics] = None,
+    plan_cache: Optional[PlanCache] = None,
+    intent_router: bool = True,
+    limiter: Optional[AskLimiter] = None,
+    schema: Optional[str] = None,
+) -> str:
+    # same tool loop as ask(), without holding a thread for the Gemini and tool round trips
+    answer = ""
+    events = ask_events(question, executor, metrics, plan_cache, intent_router, limiter, schema=schema)
+    async for event, data in events:
+        if event == "answer":
+            answer = data["answer"]
+    return answer
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+
+# Tool results are shaped before they go back to the model: rows are projected to the
+# requested columns, long strings are clipped, and a result over the row or byte budget is
+# cut to the rows that fit plus a per-column summary of everything that was fetched, with
+# a note telling the model to narrow the query.
+
+MAX_STRING_CHARS = 200
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _clip(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > MAX_STRING_CHARS:
+        return value[:MAX_STRING_CHARS] + "…"
+    if isinstance(value, dict):
+        return {k: _clip(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clip(v) for v in value]
+    return value
+
+
+def project(rows: List[Dict[str, Any]], columns: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    # unknown column names are ignored rather than failing the tool call
+    if not columns or not rows:
+        return rows
+    keep = [c for c in columns if c in rows[0]]
+    if not keep:
+        return rows
+    return [{c: row.get(c) for c in keep} for row in rows]
+
+
+def _hashable(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return value
+
+
+def summarize_column(values: List[Any], top_k: int) -> Dict[str, Any]:
+    present = [v for v in values if v is not None]
+    counts = Counter(_hashable(v) for v in present)
+    summary: Dict[str, Any] = {"distinct": len(counts), "nulls": len(values) - len(present)}
+    numbers = [v for v in present if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    if numbers and len(numbers) == len(present):
+        summary.update(min=min(numbers), max=max(numbers), sum=sum(numbers))
+    else:
+        summary["top"] = [[_clip(value), count] for value, count in counts.most_common(top_k)]
+    return summary
+
+
+def shape_result(
+    result: Dict[str, Any],
+    *,
+    max_rows: int,
+    max_bytes: int,
+    top_k: int = 5,
+    columns: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    if "error" in result:
+        return result
+    rows = [_clip(row) for row in project(result.get("results", []), columns)]
+    upstream_truncated = bool(result.get("truncated"))
+    if len(rows) <= max_rows and _size(rows) <= max_bytes:
+        return {"results": rows, "truncated": upstream_truncated}
+
+    summary = {
+        "row_count": len(rows),
+        # the bridge already cut the result at its own row cap
+        "row_count_is_lower_bound": upstream_truncated,
+        "columns": {c: summarize_column([row.get(c) for row in rows], top_k) for c in rows[0]},
+    }
+    budget = max_bytes - _size(summary)
+    kept: List[Dict[str, Any]] = []
+    used = 2
+    for row in rows[:max_rows]:
+        size = _size(row) + 1
+        if used + size > budget:
+            break
+        kept.append(row)
+        used += size
+    return {
+        "results": kept,
+        "truncated": True,
+        "summary": summary,
+        "note": (
+            f"Only the first {len(kept)} of {len(rows)}{'+' if upstream_truncated else ''} rows are shown; "
+            "'summary' describes all of them. For exact answers refine the query: filter with WHERE, "
+            "aggregate with count()/collect(), ORDER BY with LIMIT, or return fewer columns."
+        ),
+    }
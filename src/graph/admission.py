@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from neo4j.exceptions import Neo4jError
+
+from src.graph.cache import normalize_query
+
+
+# summary.query_type values that change the graph ("s" = schema: indexes, constraints)
+WRITE_QUERY_TYPES = ("w", "rw", "s")
+VAR_LENGTH_OPERATORS = ("VarLengthExpand", "BFSPruningVarExpand", "PruningVarExpand")
+# *, *2.., *..  -- but not *3 or *1..5
+_UNBOUNDED_LENGTH = re.compile(r"\*\s*(?:(?:\d+\s*)?\.\.\s*)?\]")
+
+# Explain(query, params) -> (summary.plan, summary.query_type)
+Explain = Callable[[str, Optional[Dict[str, Any]]], Awaitable[Tuple[Optional[Dict[str, Any]], Optional[str]]]]
+
+
+class QueryRejected(ValueError):
+    # reason is a stable code, hint tells the caller (usually the LLM) how to rewrite the query
+    def __init__(self, reason: str, message: str, hint: str) -> None:
+        super().__init__(f"{message} {hint}")
+        self.reason = reason
+        self.message = message
+        self.hint = hint
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"rejected": self.reason, "message": self.message, "hint": self.hint}
+
+
+@dataclass(frozen=True)
+class PlanSummary:
+    query_type: str
+    # largest row estimate of any operator, i.e. the widest point of the plan
+    estimated_rows: float
+    operators: Tuple[str, ...]
+    unbounded_var_length: bool
+
+    @property
+    def writes(self) -> bool:
+        return self.query_type in WRITE_QUERY_TYPES
+
+
+def _walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("children") or ():
+        yield from _walk(child)
+
+
+def _operator_name(node: Dict[str, Any]) -> str:
+    # "VarLengthExpand(All)@neo4j" -> "VarLengthExpand"
+    return re.split(r"[(@]", node.get("operatorType") or "", maxsplit=1)[0]
+
+
+def summarize_plan(plan: Optional[Dict[str, Any]], query_type: Optional[str], query: str) -> PlanSummary:
+    operators = []
+    estimated = 0.0
+    unbounded = False
+    for node in _walk(plan or {}):
+        name = _operator_name(node)
+        if not name:
+            continue
+        operators.append(name)
+        arguments = node.get("arguments") or {}
+        estimated = max(estimated, float(arguments.get("EstimatedRows") or 0))
+        if name in VAR_LENGTH_OPERATORS:
+            # older servers do not put the pattern in Details; fall back to the query text
+            details = str(arguments.get("Details") or "")
+            unbounded = unbounded or bool(_UNBOUNDED_LENGTH.search(details if "*" in details else query))
+    return PlanSummary(
+        query_type=query_type or "r",
+        estimated_rows=estimated,
+        operators=tuple(dict.fromkeys(operators)),
+        unbounded_var_length=unbounded,
+    )
+
+
+class QueryAdmission:
+    # Runs EXPLAIN once per normalized query, keeps the plan summary for plan_ttl seconds and
+    # decides per request: reject, admit with the shorter soft_timeout, or admit as is.
+
+    def __init__(
+        self,
+        max_estimated_rows: float,
+        soft_estimated_rows: float,
+        soft_timeout: Optional[float],
+        forbidden_operators: Sequence[str] = ("CartesianProduct",),
+        plan_cache_size: int = 1024,
+        plan_ttl: float = 600.0,
+    ) -> None:
+        self.max_estimated_rows = max_estimated_rows
+        self.soft_estimated_rows = soft_estimated_rows
+        self.soft_timeout = soft_timeout
+        self.forbidden_operators = tuple(forbidden_operators)
+        self.plan_cache_size = plan_cache_size
+        self.plan_ttl = plan_ttl
+        self._plans: "OrderedDict[str, Tuple[PlanSummary, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(("plan_hits", "plan_misses", "admitted", "capped", "rejected"), 0)
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _cached(self, key: str) -> Optional[PlanSummary]:
+        with self._lock:
+            entry = self._plans.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                self._plans.pop(key, None)
+                self._stats["plan_misses"] += 1
+                return None
+            self._plans.move_to_end(key)
+            self._stats["plan_hits"] += 1
+            return entry[0]
+
+    def _store(self, key: str, summary: PlanSummary) -> None:
+        with self._lock:
+            self._plans[key] = (summary, time.monotonic() + self.plan_ttl)
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.plan_cache_size:
+                self._plans.popitem(last=False)
+
+    async def plan(self, query: str, params: Optional[Dict[str, Any]], explain: Explain) -> PlanSummary:
+        key = normalize_query(query)
+        summary = self._cached(key)
+        if summary is not None:
+            return summary
+        try:
+            plan, query_type = await explain(query, params)
+        except Neo4jError as e:
+            # syntax and semantic errors are the caller's to fix; anything else is ours
+            if (e.code or "").startswith("Neo.ClientError.Statement."):
+                self._bump("rejected")
+                raise QueryRejected(
+                    "invalid_query",
+                    f"Neo4j could not plan the query: {e.message}",
+                    "Fix the Cypher syntax, labels or property names and try again.",
+                ) from e
+            raise
+        summary = summarize_plan(plan, query_type, query)
+        self._store(key, summary)
+        return summary
+
+    def check(self, summary: PlanSummary, *, readonly: bool, timeout: Optional[float]) -> Optional[float]:
+        # returns the transaction timeout to use; raises QueryRejected
+        try:
+            if readonly and summary.writes:
+                raise QueryRejected(
+                    "write_not_allowed",
+                    "Write operations are not allowed in read-only mode.",
+                    "Only use MATCH/OPTIONAL MATCH/WITH/RETURN; do not create, update or delete data.",
+                )
+            forbidden = [op for op in summary.operators if op in self.forbidden_operators]
+            if "CartesianProduct" in forbidden:
+                raise QueryRejected(
+                    "cartesian_product",
+                    "The query combines disconnected patterns into a cartesian product.",
+                    "Connect the MATCH patterns through a relationship or shared variable, or split them into separate queries.",
+                )
+            if forbidden:
+                raise QueryRejected(
+                    "operator_not_allowed",
+                    f"The query plan uses operators that are not allowed here: {', '.join(forbidden)}.",
+                    "Rewrite the query so that it does not need these operators.",
+                )
+            if summary.unbounded_var_length:
+                raise QueryRejected(
+                    "unbounded_path",
+                    "The query expands a variable-length relationship without an upper bound.",
+                    "Give the relationship an upper bound, e.g. [:CAGIRIR*1..3] instead of [:CAGIRIR*].",
+                )
+            if summary.estimated_rows > self.max_estimated_rows:
+                raise QueryRejected(
+                    "too_expensive",
+                    f"The query is estimated to touch {int(summary.estimated_rows)} rows "
+                    f"(limit {int(self.max_estimated_rows)}).",
+                    "Narrow the MATCH with an indexed property filter (e.g. (m:Modul {dosya_adi: 'x.py'}), "
+                    "or WHERE m.goreli_yol ENDS WITH 'pkg/x.py'), aggregate with count() or add a LIMIT.",
+                )
+        except QueryRejected:
+            self._bump("rejected")
+            raise
+        if summary.estimated_rows > self.soft_estimated_rows and self.soft_timeout is not None:
+            self._bump("capped")
+            return self.soft_timeout if timeout is None else min(timeout, self.soft_timeout)
+        self._bump("admitted")
+        return timeout
+
+    async def admit(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]],
+        explain: Explain,
+        *,
+        readonly: bool,
+        timeout: Optional[float],
+    ) -> Optional[float]:
+        summary = await self.plan(query, params, explain)
+        return self.check(summary, readonly=readonly, timeout=timeout)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["plans"] = len(self._plans)
+        return stats
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+# Every ingestion run bumps this counter; cached results of an older generation are dropped.
+GENERATION_QUERY = "MATCH (s:GrafSurumu {ad: 'graf'}) RETURN s.nesil AS nesil"
+BUMP_GENERATION = """
+MERGE (s:GrafSurumu {ad: 'graf'})
+SET s.nesil = coalesce(s.nesil, 0) + 1, s.guncelleme = datetime()
+RETURN s.nesil AS nesil
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+Rows = List[Dict[str, Any]]
+
+
+def normalize_query(query: str) -> str:
+    # whitespace and a trailing ';' do not change a query; case might (string literals)
+    return _WHITESPACE.sub(" ", query or "").strip().rstrip(";").strip()
+
+
+def cache_key(query: str, params: Optional[Dict[str, Any]] = None) -> str:
+    return normalize_query(query) + "\x00" + json.dumps(params or {}, sort_keys=True, default=str)
+
+
+@dataclass(slots=True)
+class _Entry:
+    rows: Rows
+    size: int
+    expires: float
+
+
+class QueryCache:
+    # LRU result cache for read-only queries, bounded by an approximate byte size (the JSON
+    # length of the rows) and a TTL. It is flushed whenever the graph generation changes.
+
+    def __init__(self, max_bytes: int, ttl: float, generation_check_interval: float = 5.0) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation_check_interval = generation_check_interval
+        self.generation: Optional[int] = None
+        self._generation_checked = float("-inf")
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "asyncio.Future[Rows]"] = {}
+        self._stats = dict.fromkeys(("hits", "misses", "shared", "bypasses", "evictions", "expired", "invalidations"), 0)
+
+    # -- generation ---------------------------------------------------------
+
+    def generation_stale(self) -> bool:
+        return time.monotonic() - self._generation_checked >= self.generation_check_interval
+
+    def observe_generation(self, generation: Optional[int]) -> None:
+        with self._lock:
+            self._generation_checked = time.monotonic()
+            if generation != self.generation:
+                if self._entries:
+                    self._stats["invalidations"] += 1
+                self._entries.clear()
+                self._bytes = 0
+                self.generation = generation
+
+    # -- entries ------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Rows]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry.expires <= time.monotonic():
+                self._drop(key)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.rows
+
+    def put(self, key: str, rows: Rows, generation: Optional[int]) -> bool:
+        size = len(json.dumps(rows, default=str)) + len(key)
+        with self._lock:
+            # a result computed against an older graph must not be stored under the new one
+            if generation != self.generation or size > self.max_bytes:
+                return False
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(rows=rows, size=size, expires=time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+            return True
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self._stats["bypasses"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats.update(entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+            stats["generation"] = self.generation
+        # misses include lookups that joined an identical query already in flight ("shared");
+        # both those and hits are served without running the query again
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["shared"]) / lookups, 4) if lookups else None
+        return stats
+
+    # -- asyncio front end ----------------------------------------------------
+
+    async def fetch(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]],
+        run: Callable[[], Awaitable[Rows]],
+        read_generation: Callable[[], Awaitable[Optional[int]]],
+        variant: str = "",
+    ) -> Tuple[Rows, str]:
+        # returns (rows, "HIT" | "SHARED" | "MISS"); identical misses in flight share one execution
+        if self.generation_stale():
+            self.observe_generation(await read_generation())
+        # variant separates different slices (row cap, page) of the same query
+        key = cache_key(query, params) + "\x00" + variant
+        rows = self.get(key)
+        if rows is not None:
+            return rows, "HIT"
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                rows = await asyncio.shield(pending)
+                with self._lock:
+                    self._stats["shared"] += 1
+                return rows, "SHARED"
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # the request that was running the query went away; run it here instead
+
+        generation = self.generation
+        future: "asyncio.Future[Rows]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            rows = await run()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(rows)
+        self.put(key, rows, generation)
+        return rows, "MISS"
@@ -1,30 +1,211 @@
 from __future__ import annotations
 
+import asyncio
 import re
-from typing import Any, Dict, List, Optional
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from neo4j import GraphDatabase, basic_auth
+from neo4j import READ_ACCESS, WRITE_ACCESS, AsyncGraphDatabase, GraphDatabase, Query, basic_auth, unit_of_work
+from neo4j.exceptions import DriverError, Neo4jError
 
+from src.graph.admission import QueryAdmission, QueryRejected
+from src.graph.cache import GENERATION_QUERY
 
-WRITE_TOKENS = re.compile(r"\\b(CREATE|MERGE|DELETE|SET|DROP|LOAD\\s+CSV|CALL\\s+dbms|CALL\\s+db\\.)\\b", re.IGNORECASE)
+
+# neo4j driver default for max_connection_pool_size
+DEFAULT_MAX_POOL_SIZE = 100
+
+# cheap first gate; the EXPLAIN-based QueryAdmission classifies from the plan itself.
+# Full-text index lookups are the only db.* procedures let through.
+WRITE_TOKENS = re.compile(
+    r"\b(?:CREATE|MERGE|DELETE|SET|REMOVE|DROP|LOAD\s+CSV|CALL\s+dbms)\b"
+    r"|\bCALL\s+db\.(?!index\.fulltext\.query(?:Nodes|Relationships)\b)",
+    re.IGNORECASE,
+)
+# full-text indexes created by ensure_constraints, queried with db.index.fulltext.queryNodes
+MODUL_FULLTEXT_INDEX = "modul_arama"
+FONKSIYON_FULLTEXT_INDEX = "fonksiyon_arama"
+
+# 'create.py' in a filter is not a write
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+
+
+def check_readonly(query: str, readonly: bool) -> None:
+    if readonly and WRITE_TOKENS.search(_STRING_LITERAL.sub("''", query or "")):
+        raise ValueError("Write operations are not allowed in read-only mode.")
+
+
+def _pool_config(
+    max_pool_size: Optional[int],
+    acquisition_timeout: Optional[float],
+    max_connection_lifetime: Optional[float],
+) -> Dict[str, Any]:
+    # unset pool options keep the driver defaults
+    config: Dict[str, Any] = {}
+    if max_pool_size is not None:
+        config["max_connection_pool_size"] = max_pool_size
+    if acquisition_timeout is not None:
+        config["connection_acquisition_timeout"] = acquisition_timeout
+    if max_connection_lifetime is not None:
+        config["max_connection_lifetime"] = max_connection_lifetime
+    return config
+
+
+# what a failed query can raise, short of a bug: admission, read-only gate, Neo4j, deadlines
+QUERY_ERRORS = (QueryRejected, ValueError, Neo4jError, DriverError, asyncio.TimeoutError)
+
+
+def query_error(e: BaseException) -> Dict[str, Any]:
+    # JSON description of a failed query (batch items, in-process tool results)
+    if isinstance(e, QueryRejected):
+        return {"type": "QueryRejected", **e.as_dict()}
+    if isinstance(e, asyncio.TimeoutError):
+        return {"type": "Timeout", "message": "Query timed out"}
+    if isinstance(e, Neo4jError):
+        if "TransactionTimedOut" in (e.code or ""):
+            return {"type": "Timeout", "code": e.code, "message": "Query timed out"}
+        return {"type": "Neo4jError", "code": e.code, "message": "Execution error"}
+    if isinstance(e, (ValueError, RuntimeError)):
+        return {"type": e.__class__.__name__, "message": str(e)}
+    return {"type": e.__class__.__name__, "message": "Execution error"}
+
+
+# paged queries get SKIP/LIMIT appended to their final RETURN, see AsyncNeo4jClient.run_query
+PAGE_SKIP_PARAM = "__sayfa_skip"
+PAGE_LIMIT_PARAM = "__sayfa_limit"
+
+# literals, quoted names and comments, blanked before looking for clause keywords
+_OPAQUE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|//[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+def _top_level(query: str) -> str:
+    # the query with literals, comments and everything nested in ()/[]/{} blanked out
+    text = _OPAQUE.sub(lambda m: " " * len(m.group(0)), query)
+    out: List[str] = []
+    depth = 0
+    for ch in text:
+        if ch in "([{":
+            depth += 1
+            out.append(ch if depth == 1 else " ")
+        elif ch in ")]}":
+            depth = max(0, depth - 1)
+            out.append(ch if depth == 0 else " ")
+        else:
+            out.append(ch if depth == 0 else " ")
+    return "".join(out)
+
+
+@lru_cache(maxsize=1024)
+def paged_query(query: str, limited: bool = True) -> Optional[str]:
+    # None when the pagination cannot go into the query itself: no final RETURN, a UNION
+    # (SKIP/LIMIT would bind to its last part only) or a RETURN that already skips/limits
+    body = query.strip().rstrip(";").rstrip()
+    flat = _top_level(body).upper()
+    returns = [m.start() for m in re.finditer(r"(?<![.$\w])RETURN\b", flat)]
+    if not returns or re.search(r"(?<![.$\w])UNION\b", flat):
+        return None
+    if re.search(r"(?<![.$\w])(?:SKIP|OFFSET|LIMIT)\b", flat[returns[-1]:]):
+        return None
+    tail = f" LIMIT ${PAGE_LIMIT_PARAM}" if limited else ""
+    return f"{body}\nSKIP ${PAGE_SKIP_PARAM}{tail}"
+
+
+async def _trimmed(result, skip: int, limit: Optional[int]) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    seen = 0
+    async for record in result:
+        seen += 1
+        if seen <= skip:
+            continue
+        rows.append(record.data())
+        if limit is not None and len(rows) >= limit:
+            break
+    return rows
+
+
+@dataclass
+class BatchOutcome:
+    rows: Optional[List[Dict[str, Any]]] = None
+    error: Optional[BaseException] = None
+    # write batches only: the statement ran, but a later failure rolled its changes back
+    rolled_back: bool = False
+
+
+class PoolUsage:
+    # the driver does not expose pool occupancy, so sessions in flight are counted here;
+    # each one holds at most one pooled connection while its transaction runs
+
+    def __init__(self, max_size: Optional[int]) -> None:
+        self.max_size = max_size or DEFAULT_MAX_POOL_SIZE
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._peak_in_use = 0
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_use -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_use, peak = self._in_use, self._peak_in_use
+        return {
+            "max_size": self.max_size,
+            "in_use": in_use,
+            "peak_in_use": peak,
+            "saturation": round(in_use / self.max_size, 3),
+        }
 
 
 class Neo4jClient:
-    def __init__(self, uri: str, username: str, password: str, database: Optional[str] = None) -> None:
-        self._driver = GraphDatabase.driver(uri, auth=basic_auth(username, password))
+    def __init__(
+        self,
+        uri: str,
+        username: str,
+        password: str,
+        database: Optional[str] = None,
+        *,
+        max_pool_size: Optional[int] = None,
+        acquisition_timeout: Optional[float] = None,
+        max_connection_lifetime: Optional[float] = None,
+    ) -> None:
+        self._driver = GraphDatabase.driver(
+            uri,
+            auth=basic_auth(username, password),
+            **_pool_config(max_pool_size, acquisition_timeout, max_connection_lifetime),
+        )
         self._database = database
+        self._pool = PoolUsage(max_pool_size)
 
     def close(self) -> None:
         self._driver.close()
 
+    @contextmanager
+    def session(self) -> Iterator[Any]:
+        self._pool.acquire()
+        try:
+            with self._driver.session(database=self._database) as session:
+                yield session
+        finally:
+            self._pool.release()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self._pool.stats()
+
     def run_query(self, query: str, params: Optional[Dict[str, Any]] = None, *, readonly: bool = False) -> List[Dict[str, Any]]:
-        if readonly and WRITE_TOKENS.search(query or ""):
-            raise ValueError("Write operations are not allowed in read-only mode.")
+        check_readonly(query, readonly)
 
         def _work(tx):
             return list(tx.run(query, params or {}).data())
 
-        with self._driver.session(database=self._database) as session:
+        with self.session() as session:
             if readonly:
                 return session.execute_read(_work)
             return session.execute_write(_work)
@@ -35,9 +216,206 @@ class Neo4jClient:
             "CREATE CONSTRAINT fonksiyon_id_unique IF NOT EXISTS FOR (f:Fonksiyon) REQUIRE f.id IS UNIQUE",
             "CREATE CONSTRAINT gelistirici_email_unique IF NOT EXISTS FOR (g:Gelistirici) REQUIRE g.email IS UNIQUE",
             "CREATE CONSTRAINT kutuphane_isim_unique IF NOT EXISTS FOR (k:Kutuphane) REQUIRE k.isim IS UNIQUE",
+            # ORDER BY f.fan_in DESC LIMIT n reads these instead of sorting all functions
+            "CREATE INDEX fonksiyon_fan_in IF NOT EXISTS FOR (f:Fonksiyon) ON (f.fan_in)",
+            "CREATE INDEX fonksiyon_fan_out IF NOT EXISTS FOR (f:Fonksiyon) ON (f.fan_out)",
+            # lookups by name instead of ENDS WITH scans over every Modul.dosya_yolu (see
+            # writer.module_lookup): exact file and dotted module names (range, also STARTS WITH),
+            # path suffixes (text index: ENDS WITH / CONTAINS), function names
+            "CREATE INDEX modul_dosya_adi IF NOT EXISTS FOR (m:Modul) ON (m.dosya_adi)",
+            "CREATE INDEX modul_modul_adi IF NOT EXISTS FOR (m:Modul) ON (m.modul_adi)",
+            "CREATE TEXT INDEX modul_goreli_yol IF NOT EXISTS FOR (m:Modul) ON (m.goreli_yol)",
+            "CREATE INDEX fonksiyon_isim IF NOT EXISTS FOR (f:Fonksiyon) ON (f.isim)",
+            # partial and fuzzy names ('auth' -> src/auth/service.py); the simple analyzer
+            # splits on every non-letter, so path segments and snake_case parts become terms
+            f"CREATE FULLTEXT INDEX {MODUL_FULLTEXT_INDEX} IF NOT EXISTS FOR (m:Modul) ON EACH [m.goreli_yol, m.modul_adi] "
+            "OPTIONS {indexConfig: {`fulltext.analyzer`: 'simple'}}",
+            f"CREATE FULLTEXT INDEX {FONKSIYON_FULLTEXT_INDEX} IF NOT EXISTS FOR (f:Fonksiyon) ON EACH [f.isim] "
+            "OPTIONS {indexConfig: {`fulltext.analyzer`: 'simple'}}",
         ]
         with self._driver.session(database=self._database) as session:
             for stmt in statements:
                 session.execute_write(lambda tx, q=stmt: tx.run(q))
 
 
+class AsyncNeo4jClient:
+    # asyncio counterpart of Neo4jClient for the bridge server; the ingest CLI keeps the sync one
+
+    def __init__(
+        self,
+        uri: str,
+        username: str,
+        password: str,
+        database: Optional[str] = None,
+        *,
+        max_pool_size: Optional[int] = None,
+        acquisition_timeout: Optional[float] = None,
+        max_connection_lifetime: Optional[float] = None,
+        admission: Optional[QueryAdmission] = None,
+    ) -> None:
+        self._driver = AsyncGraphDatabase.driver(
+            uri,
+            auth=basic_auth(username, password),
+            **_pool_config(max_pool_size, acquisition_timeout, max_connection_lifetime),
+        )
+        self._database = database
+        self._pool = PoolUsage(max_pool_size)
+        self.admission = admission
+
+    async def close(self) -> None:
+        await self._driver.close()
+
+    @asynccontextmanager
+    async def session(self, **config: Any) -> AsyncIterator[Any]:
+        self._pool.acquire()
+        try:
+            async with self._driver.session(database=self._database, **config) as session:
+                yield session
+        finally:
+            self._pool.release()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self._pool.stats()
+
+    async def _explain(self, query: str, params: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        async with self.session() as session:
+            result = await session.run("EXPLAIN " + query, params or {})
+            summary = await result.consume()
+            return summary.plan, summary.query_type
+
+    async def _admit(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]],
+        readonly: bool,
+        timeout: Optional[float],
+    ) -> Optional[float]:
+        # raises ValueError/QueryRejected; returns the transaction timeout the query may use
+        check_readonly(query, readonly)
+        if self.admission is None:
+            return timeout
+        return await self.admission.admit(query, params, self._explain, readonly=readonly, timeout=timeout)
+
+    async def run_query(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        readonly: bool = False,
+        timeout: Optional[float] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        # timeout applies twice: as the server-side transaction timeout and as a client-side
+        # deadline that cancels the await (and with it the connection) if the server is slow.
+        # skip/limit go into the query when its last clause is a RETURN, so a later page is
+        # skipped on the server; otherwise (and as a cap) they are applied while records stream in.
+        timeout = await self._admit(query, params, readonly, timeout)
+        paged = paged_query(query, limit is not None) if skip or limit is not None else None
+
+        async def _work(tx):
+            if paged is not None:
+                paged_params = {**(params or {}), PAGE_SKIP_PARAM: skip}
+                if limit is not None:
+                    paged_params[PAGE_LIMIT_PARAM] = limit
+                return await _trimmed(await tx.run(paged, paged_params), 0, limit)
+            result = await tx.run(query, params or {})
+            if not skip and limit is None:
+                return await result.data()
+            return await _trimmed(result, skip, limit)
+
+        return await self._run_work(_work, readonly, timeout)
+
+    async def _run_work(self, work_fn, readonly: bool, timeout: Optional[float]) -> Any:
+        if timeout is not None:
+            work_fn = unit_of_work(timeout=timeout)(work_fn)
+
+        async with self.session() as session:
+            work = session.execute_read(work_fn) if readonly else session.execute_write(work_fn)
+            if timeout is None:
+                return await work
+            return await asyncio.wait_for(work, timeout)
+
+    async def stream_query(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        readonly: bool = False,
+        timeout: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # rows are yielded as the driver pulls them (fetch_size records at a time); an
+        # auto-commit transaction, since a managed one could be retried after rows went out
+        timeout = await self._admit(query, params, readonly, timeout)
+        access = READ_ACCESS if readonly else WRITE_ACCESS
+        async with self.session(default_access_mode=access) as session:
+            result = await session.run(Query(query, timeout=timeout), params or {})
+            sent = 0
+            async for record in result:
+                if limit is not None and sent >= limit:
+                    break
+                yield record.data()
+                sent += 1
+
+    async def graph_generation(self, timeout: Optional[float] = None) -> Optional[int]:
+        rows = await self.run_query(GENERATION_QUERY, readonly=True, timeout=timeout)
+        return rows[0]["nesil"] if rows else None
+
+    async def run_batch(
+        self,
+        items: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+        *,
+        readonly: bool = False,
+        timeout: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[BatchOutcome]:
+        # Runs (query, params) items in order in one explicit transaction on one session.
+        # A failing statement terminates the transaction: in read mode the remaining items
+        # continue in a fresh one; in write mode they are skipped and the batch rolls back.
+        outcomes = [BatchOutcome() for _ in items]
+        todo: List[int] = []
+        tx_timeout = timeout
+        for i, (query, params) in enumerate(items):
+            try:
+                item_timeout = await self._admit(query, params, readonly, timeout)
+                todo.append(i)
+            except ValueError as e:
+                outcomes[i].error = e
+                continue
+            # one transaction: the most restrictive admitted timeout applies to all items
+            if item_timeout is not None:
+                tx_timeout = item_timeout if tx_timeout is None else min(tx_timeout, item_timeout)
+
+        access = READ_ACCESS if readonly else WRITE_ACCESS
+        async with self.session(default_access_mode=access) as session:
+            while todo:
+                tx = await session.begin_transaction(timeout=tx_timeout)
+                done: List[int] = []
+                failed = False
+                try:
+                    while todo and not failed:
+                        i = todo.pop(0)
+                        query, params = items[i]
+                        try:
+                            result = await tx.run(query, params or {})
+                            records = await result.fetch(limit) if limit is not None else [r async for r in result]
+                            await result.consume()
+                            outcomes[i].rows = [record.data() for record in records]
+                            done.append(i)
+                        except Neo4jError as e:
+                            outcomes[i].error = e
+                            failed = True
+                    if failed or readonly:
+                        await tx.rollback()
+                    else:
+                        await tx.commit()
+                finally:
+                    await tx.close()
+                if failed and not readonly:
+                    for i in done:
+                        outcomes[i].rolled_back = True
+                    for i in todo:
+                        outcomes[i].error = RuntimeError("Not executed: an earlier statement in the batch failed.")
+                    todo = []
+        return outcomes
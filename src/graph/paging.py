@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from src.graph.cache import cache_key
+
+
+# Offset cursors: opaque to clients, bound to the query they were issued for. Pages are
+# only stable across requests when the query has an ORDER BY.
+
+
+def _fingerprint(query: str, params: Optional[Dict[str, Any]]) -> str:
+    return hashlib.sha1(cache_key(query, params).encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(query: str, params: Optional[Dict[str, Any]], offset: int) -> str:
+    payload = json.dumps({"o": offset, "q": _fingerprint(query, params)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], query: str, params: Optional[Dict[str, Any]]) -> int:
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(payload["o"])
+        fingerprint = payload["q"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    if fingerprint != _fingerprint(query, params) or offset < 0:
+        raise ValueError("Cursor does not belong to this query.")
+    return offset
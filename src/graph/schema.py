@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from neo4j import READ_ACCESS
+from neo4j.exceptions import DriverError, Neo4jError
+
+
+# Live graph schema (labels, property keys, relationship patterns) for the assistant's
+# prompt, read through the db.schema procedures. Those can take a while on a large graph,
+# hence SchemaCache.
+
+NODE_PROPERTIES_QUERY = """
+CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName
+UNWIND nodeLabels AS etiket
+RETURN etiket, collect(DISTINCT propertyName) AS ozellikler
+"""
+
+RELATIONSHIPS_QUERY = """
+CALL db.schema.visualization() YIELD relationships
+UNWIND relationships AS r
+RETURN DISTINCT type(r) AS tip, labels(startNode(r)) AS kaynak, labels(endNode(r)) AS hedef
+"""
+
+# bookkeeping labels: the cache generation node and the pending-analytics tag
+HIDDEN_LABELS = frozenset({"GrafSurumu", "AnalizBekliyor"})
+
+
+@dataclass(frozen=True)
+class GraphSchema:
+    # label -> property keys; (relationship type, start label, end label)
+    labels: Dict[str, Tuple[str, ...]]
+    relationships: Tuple[Tuple[str, str, str], ...]
+
+    def describe(self) -> str:
+        nodes = ", ".join(f"{label}({','.join(props)})" for label, props in self.labels.items())
+        rels = ", ".join(f"{rel}({start}->{end})" for rel, start, end in self.relationships)
+        return f"Düğümler: {nodes}. İlişkiler: {rels}."
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "labels": {label: list(props) for label, props in self.labels.items()},
+            "relationships": [{"type": r, "from": s, "to": e} for r, s, e in self.relationships],
+        }
+
+
+def _visible(labels: List[str]) -> List[str]:
+    return [label for label in labels if label not in HIDDEN_LABELS]
+
+
+async def load_schema(client) -> GraphSchema:
+    # client: AsyncNeo4jClient. The procedures are internal reads, so they bypass the
+    # read-only keyword gate and admission that guard caller-supplied Cypher. Auto-commit,
+    # without the managed-transaction retries: an unreachable graph fails fast and the
+    # prompt falls back to the static schema.
+    async with client.session(default_access_mode=READ_ACCESS) as session:
+        props = await (await session.run(NODE_PROPERTIES_QUERY)).data()
+        rels = await (await session.run(RELATIONSHIPS_QUERY)).data()
+    labels: Dict[str, Tuple[str, ...]] = {}
+    for row in sorted(props, key=lambda r: r["etiket"]):
+        if row["etiket"] not in HIDDEN_LABELS:
+            labels[row["etiket"]] = tuple(sorted(p for p in row["ozellikler"] if p))
+    relationships = set()
+    for row in rels:
+        for start in _visible(row["kaynak"]):
+            for end in _visible(row["hedef"]):
+                relationships.add((row["tip"], start, end))
+    return GraphSchema(labels=labels, relationships=tuple(sorted(relationships)))
+
+
+class SchemaCache:
+    # one introspection per ttl seconds, shared by concurrent callers; a failed refresh
+    # keeps serving the last schema (or None, and the caller uses its static description)
+
+    def __init__(self, ttl: float, timeout: Optional[float] = None) -> None:
+        self.ttl = ttl
+        self.timeout = timeout
+        self._schema: Optional[GraphSchema] = None
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, client) -> Optional[GraphSchema]:
+        if time.monotonic() < self._expires:
+            return self._schema
+        async with self._lock:
+            if time.monotonic() < self._expires:
+                return self._schema
+            try:
+                self._schema = await asyncio.wait_for(load_schema(client), self.timeout)
+            except (Neo4jError, DriverError, OSError, asyncio.TimeoutError):
+                pass
+            # failures are retried after the same interval, not on every question
+            self._expires = time.monotonic() + self.ttl
+            return self._schema
+
+    def invalidate(self) -> None:
+        self._expires = 0.0
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+
+# Aggregates materialized on the nodes at the end of an ingestion run, so the assistant
+# reads f.fan_in instead of counting CAGIRIR edges on every question:
+#   Fonksiyon.fan_in / fan_out            incoming / outgoing CAGIRIR
+#   Modul.fonksiyon_sayisi / kutuphane_sayisi / gelistirici_sayisi
+#   Kutuphane.kullanan_modul_sayisi       modules using the library
+#   Gelistirici.modul_sayisi              modules written
+#   (:GrafOzet {ad: 'graf'})              graph-wide totals
+# Writes that change a degree tag the other end with PENDING_LABEL (see writer.py); an
+# incremental run refreshes only tagged nodes plus everything around the re-parsed modules.
+
+PENDING_LABEL = "AnalizBekliyor"
+
+REFRESH_FONKSIYON = """
+UNWIND $rows AS row
+MATCH (f:Fonksiyon {id: row.key})
+SET f.fan_in = COUNT { (f)<-[:CAGIRIR]-(:Fonksiyon) },
+    f.fan_out = COUNT { (f)-[:CAGIRIR]->(:Fonksiyon) }
+REMOVE f:AnalizBekliyor
+"""
+
+REFRESH_MODUL = """
+UNWIND $rows AS row
+MATCH (m:Modul {dosya_yolu: row.key})
+SET m.fonksiyon_sayisi = COUNT { (m)-[:ICERIR]->(:Fonksiyon) },
+    m.kutuphane_sayisi = COUNT { (m)-[:KULLANIR]->(:Kutuphane) },
+    m.gelistirici_sayisi = COUNT { (:Gelistirici)-[:YAZDI]->(m) }
+REMOVE m:AnalizBekliyor
+"""
+
+REFRESH_KUTUPHANE = """
+UNWIND $rows AS row
+MATCH (k:Kutuphane {isim: row.key})
+SET k.kullanan_modul_sayisi = COUNT { (:Modul)-[:KULLANIR]->(k) }
+REMOVE k:AnalizBekliyor
+"""
+
+REFRESH_GELISTIRICI = """
+UNWIND $rows AS row
+MATCH (g:Gelistirici {email: row.key})
+SET g.modul_sayisi = COUNT { (g)-[:YAZDI]->(:Modul) }
+REMOVE g:AnalizBekliyor
+"""
+
+REFRESH_OZET = """
+CALL { MATCH (n:Modul) RETURN count(n) AS moduller }
+CALL { MATCH (n:Fonksiyon) RETURN count(n) AS fonksiyonlar }
+CALL { MATCH (n:Kutuphane) RETURN count(n) AS kutuphaneler }
+CALL { MATCH (n:Gelistirici) RETURN count(n) AS gelistiriciler }
+CALL { MATCH (:Fonksiyon)-[r:CAGIRIR]->(:Fonksiyon) RETURN count(r) AS cagrilar }
+MERGE (o:GrafOzet {ad: 'graf'})
+SET o.modul_sayisi = moduller,
+    o.fonksiyon_sayisi = fonksiyonlar,
+    o.kutuphane_sayisi = kutuphaneler,
+    o.gelistirici_sayisi = gelistiriciler,
+    o.cagri_sayisi = cagrilar,
+    o.guncelleme = datetime()
+"""
+
+# tags the re-parsed modules and every node whose aggregates they can change
+MARK_MODUL_CLOSURE = """
+UNWIND $rows AS row
+MATCH (m:Modul {dosya_yolu: row.dosya_yolu})
+SET m:AnalizBekliyor
+WITH m
+CALL { WITH m MATCH (m)-[:ICERIR]->(f:Fonksiyon) SET f:AnalizBekliyor }
+CALL { WITH m MATCH (m)-[:ICERIR]->(:Fonksiyon)-[:CAGIRIR]-(f:Fonksiyon) SET f:AnalizBekliyor }
+CALL { WITH m MATCH (m)-[:KULLANIR]->(k:Kutuphane) SET k:AnalizBekliyor }
+CALL { WITH m MATCH (g:Gelistirici)-[:YAZDI]->(m) SET g:AnalizBekliyor }
+"""
+
+# label -> (key property, refresh query)
+REFRESH_QUERIES: Dict[str, Tuple[str, str]] = {
+    "Fonksiyon": ("id", REFRESH_FONKSIYON),
+    "Modul": ("dosya_yolu", REFRESH_MODUL),
+    "Kutuphane": ("isim", REFRESH_KUTUPHANE),
+    "Gelistirici": ("email", REFRESH_GELISTIRICI),
+}
+
+
+def _keys_query(label: str, key: str, full: bool) -> str:
+    pending = "" if full else f":{PENDING_LABEL}"
+    return f"MATCH (n:{label}{pending}) RETURN n.{key} AS key"
+
+
+def refresh_analytics(writer, changed_paths: Iterable[str] = (), full: bool = False) -> Dict[str, int]:
+    # writer: BulkWriter; returns refreshed node counts per label
+    refreshed: Dict[str, int] = {}
+    changed: List[str] = sorted(set(changed_paths))
+    if not full and changed:
+        writer.write(MARK_MODUL_CLOSURE, ({"dosya_yolu": path} for path in changed))
+    for label, (key, query) in REFRESH_QUERIES.items():
+        keys = writer.read_column(_keys_query(label, key, full))
+        refreshed[label] = writer.write(query, ({"key": value} for value in keys if value is not None))
+    writer.execute(REFRESH_OZET)
+    return refreshed
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.ingest.concurrency import ordered_map
+
+
+AUTHORSHIP_MODES = ("log", "blame")
+DEFAULT_BLAME_WORKERS = 8
+
+# record separator marks a commit header line, unit separator splits name and email
+_COMMIT_MARK = "\x1e"
+_FIELD_SEP = "\x1f"
+
+
+@dataclass(slots=True)
+class DeveloperInfo:
+    name: Optional[str]
+    email: Optional[str]
+    team: Optional[str]
+
+
+def _safe_run_git(args: List[str], cwd: Path) -> str:
+    try:
+        result = subprocess.run(["git", *args], cwd=str(cwd), capture_output=True, text=True, check=False)
+        return result.stdout
+    except Exception:
+        return ""
+
+
+def _developers_from_pairs(pairs: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[DeveloperInfo]:
+    # keep each (name, email) pair as git reported it, in first-seen order
+    seen: Dict[Tuple[Optional[str], Optional[str]], None] = {}
+    for name, email in pairs:
+        if name or email:
+            seen.setdefault((name or None, email or None), None)
+    return [DeveloperInfo(name=name, email=email, team=None) for name, email in seen]
+
+
+def discover_developers_for_file(file_path: Path) -> List[DeveloperInfo]:
+    # Use git blame to discover emails and names
+    cwd = file_path.parent
+    output = _safe_run_git(["blame", "--line-porcelain", file_path.name], cwd)
+    if not output:
+        return []
+
+    pairs: List[Tuple[Optional[str], Optional[str]]] = []
+    name: Optional[str] = None
+    for line in output.splitlines():
+        if line.startswith("author "):
+            name = line[len("author "):].strip()
+        elif line.startswith("author-mail "):
+            email = line[len("author-mail "):].strip().strip("<>")
+            pairs.append((name, email))
+            name = None
+    return _developers_from_pairs(pairs)
+
+
+def _git_toplevel(root: Path) -> Optional[Path]:
+    output = _safe_run_git(["rev-parse", "--show-toplevel"], root).strip()
+    return Path(output).resolve() if output else None
+
+
+def _relative_key(toplevel: Path, path: Path) -> Optional[str]:
+    try:
+        return path.resolve().relative_to(toplevel).as_posix()
+    except ValueError:
+        return None
+
+
+class LogAuthorIndex:
+    # one streamed `git log --name-only` pass over the whole history instead of a blame per file
+
+    def __init__(self, root: Path, suffix: str = ".py") -> None:
+        self.root = root if root.is_dir() else root.parent
+        self.suffix = suffix
+        self._toplevel: Optional[Path] = None
+        self._pairs: Dict[str, Dict[Tuple[Optional[str], Optional[str]], None]] = {}
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "LogAuthorIndex":
+        # build in the background so git runs while files are being parsed
+        self._thread = threading.Thread(target=self.build, name="git-log-authors", daemon=True)
+        self._thread.start()
+        return self
+
+    def build(self) -> None:
+        try:
+            self._toplevel = _git_toplevel(self.root)
+            if self._toplevel is not None:
+                self._scan(self._toplevel)
+        finally:
+            self._ready.set()
+
+    def _scan(self, toplevel: Path) -> None:
+        args = [
+            "git",
+            "-c",
+            "core.quotepath=off",
+            "log",
+            "--no-color",
+            "--name-only",
+            f"--format={_COMMIT_MARK}%an{_FIELD_SEP}%ae",
+            "--",
+            str(self.root.resolve()),
+        ]
+        try:
+            proc = subprocess.Popen(
+                args,
+                cwd=str(toplevel),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+        except Exception:
+            return
+
+        author: Tuple[Optional[str], Optional[str]] = (None, None)
+        assert proc.stdout is not None
+        with proc.stdout:
+            for raw in proc.stdout:
+                line = raw.rstrip("\n")
+                if line.startswith(_COMMIT_MARK):
+                    name, _sep, email = line[1:].partition(_FIELD_SEP)
+                    author = (name.strip() or None, email.strip() or None)
+                elif line.endswith(self.suffix):
+                    self._pairs.setdefault(line, {}).setdefault(author, None)
+        proc.wait()
+
+    def developers_for(self, path: Path) -> List[DeveloperInfo]:
+        self._ready.wait()
+        if self._toplevel is None:
+            return []
+        key = _relative_key(self._toplevel, path)
+        if key is None or key not in self._pairs:
+            return []
+        return _developers_from_pairs(self._pairs[key])
+
+
+def authors_from_log(root: Path, paths: Iterable[Path]) -> Dict[str, List[DeveloperInfo]]:
+    index = LogAuthorIndex(root)
+    index.build()
+    return {str(path): index.developers_for(path) for path in paths}
+
+
+def iter_blame_authors(paths: Iterable[Path], workers: int = DEFAULT_BLAME_WORKERS) -> Iterator[List[DeveloperInfo]]:
+    # precise mode: line-level blame, bounded by a thread pool since each call is a git subprocess
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from ordered_map(executor, discover_developers_for_file, paths, window=workers * 2)
+
+
+def authors_from_blame(paths: Iterable[Path], workers: int = DEFAULT_BLAME_WORKERS) -> Dict[str, List[DeveloperInfo]]:
+    paths = list(paths)
+    return {str(path): devs for path, devs in zip(paths, iter_blame_authors(paths, workers=workers))}
+
+
+def collect_authors(
+    root: Path,
+    paths: Iterable[Path],
+    mode: str = "log",
+    workers: int = DEFAULT_BLAME_WORKERS,
+) -> Dict[str, List[DeveloperInfo]]:
+    if mode == "log":
+        return authors_from_log(root, paths)
+    if mode == "blame":
+        return authors_from_blame(paths, workers=workers)
+    raise ValueError(f"Unknown authorship mode: {mode!r} (expected one of {', '.join(AUTHORSHIP_MODES)})")
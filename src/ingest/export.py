@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from src.ingest.metrics import IngestMetrics
+from src.ingest.parser import DeveloperInfo, FunctionInfo, ModuleInfo
+from src.ingest.writer import (
+    DEFAULT_BATCH_SIZE,
+    developer_rows,
+    function_rows,
+    icerir_rows,
+    kullanir_rows,
+    module_rows,
+    yazdi_rows,
+)
+
+
+ARRAY_DELIMITER = ";"
+
+# file stem -> (header, row keys); ids live in per-label id spaces
+NODE_FILES: Dict[str, Tuple[List[str], List[str]]] = {
+    "modul": (
+        ["dosya_yolu:ID(Modul)", "dil", "dosya_adi", "goreli_yol", "modul_adi", ":LABEL"],
+        ["dosya_yolu", "dil", "dosya_adi", "goreli_yol", "modul_adi"],
+    ),
+    "fonksiyon": (
+        [
+            "id:ID(Fonksiyon)",
+            "isim",
+            "parametreler:string[]",
+            "geri_donus_tipi",
+            "satir:int",
+            "dosya_yolu",
+            ":LABEL",
+        ],
+        ["id", "isim", "parametreler", "geri_donus_tipi", "satir", "dosya_yolu"],
+    ),
+    "kutuphane": (["isim:ID(Kutuphane)", "versiyon", ":LABEL"], ["isim", "versiyon"]),
+    "gelistirici": (["email:ID(Gelistirici)", "isim", "team", ":LABEL"], ["email", "isim", "team"]),
+}
+
+RELATIONSHIP_FILES: Dict[str, Tuple[List[str], List[str]]] = {
+    "yazdi": ([":START_ID(Gelistirici)", ":END_ID(Modul)", ":TYPE"], ["email", "dosya_yolu"]),
+    "icerir": ([":START_ID(Modul)", ":END_ID(Fonksiyon)", ":TYPE"], ["dosya_yolu", "id"]),
+    "cagirir": ([":START_ID(Fonksiyon)", ":END_ID(Fonksiyon)", ":TYPE"], ["caller_id", "callee_id"]),
+    "kullanir": ([":START_ID(Modul)", ":END_ID(Kutuphane)", ":TYPE"], ["dosya_yolu", "isim"]),
+}
+
+LABELS = {"modul": "Modul", "fonksiyon": "Fonksiyon", "kutuphane": "Kutuphane", "gelistirici": "Gelistirici"}
+TYPES = {"yazdi": "YAZDI", "icerir": "ICERIR", "cagirir": "CAGIRIR", "kullanir": "KULLANIR"}
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ARRAY_DELIMITER.join(str(v) for v in value)
+    return value
+
+
+class CsvExporter:
+    # Offline counterpart of BulkWriter: streams nodes and relationships into header + data CSV
+    # pairs for `neo4j-admin database import full`; needs no database connection.
+
+    def __init__(
+        self,
+        export_dir: Path,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        metrics: Optional[IngestMetrics] = None,
+    ) -> None:
+        self.export_dir = export_dir
+        self.batch_size = batch_size
+        self.metrics = metrics
+        self.counts: Dict[str, int] = {}
+        self._files: List[IO[str]] = []
+        self._writers: Dict[str, Any] = {}
+        self._seen_libraries: Set[str] = set()
+        self._seen_developers: Set[str] = set()
+
+    def __enter__(self) -> "CsvExporter":
+        self.open()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def open(self) -> None:
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        for stem, (header, _keys) in {**NODE_FILES, **RELATIONSHIP_FILES}.items():
+            with open(self.export_dir / f"{stem}_header.csv", "w", newline="", encoding="utf-8") as fh:
+                csv.writer(fh).writerow(header)
+            data = open(self.export_dir / f"{stem}.csv", "w", newline="", encoding="utf-8")
+            self._files.append(data)
+            self._writers[stem] = csv.writer(data)
+            self.counts[stem] = 0
+        (self.export_dir / "import.args").write_text(self.import_arguments(), encoding="utf-8")
+
+    def close(self) -> None:
+        for fh in self._files:
+            fh.close()
+        self._files = []
+        self._writers = {}
+
+    def import_arguments(self) -> str:
+        # usable as `neo4j-admin database import full @import.args <database>`
+        lines = [f"--array-delimiter={ARRAY_DELIMITER}"]
+        base = self.export_dir.resolve()
+        for stem, label in LABELS.items():
+            lines.append(f"--nodes={label}={base / f'{stem}_header.csv'},{base / f'{stem}.csv'}")
+        for stem, rel_type in TYPES.items():
+            lines.append(f"--relationships={rel_type}={base / f'{stem}_header.csv'},{base / f'{stem}.csv'}")
+        return "\n".join(lines) + "\n"
+
+    def _emit(self, stem: str, rows: Iterable[Dict[str, Any]]) -> int:
+        _header, keys = {**NODE_FILES, **RELATIONSHIP_FILES}[stem]
+        tail = LABELS.get(stem) or TYPES[stem]
+        writer = self._writers[stem]
+        written = 0
+        for row in rows:
+            writer.writerow([_cell(row.get(key)) for key in keys] + [tail])
+            written += 1
+        self.counts[stem] += written
+        if self.metrics is not None:
+            total = "nodes_written" if stem in LABELS else "edges_written"
+            self.metrics.count(total, written)
+            self.metrics.count(f"{total}.{tail}", written)
+        return written
+
+    # -- BulkWriter interface used by IngestPipeline ---------------------
+
+    def write_modules(self, modules: Iterable[ModuleInfo], root: Optional[Path] = None) -> int:
+        return self._emit("modul", module_rows(modules, root))
+
+    def write_functions(self, functions: Iterable[FunctionInfo]) -> int:
+        return self._emit("fonksiyon", function_rows(functions))
+
+    def write_libraries(self, libraries: Iterable[str]) -> int:
+        new = sorted(set(libraries) - self._seen_libraries)
+        self._seen_libraries.update(new)
+        return self._emit("kutuphane", ({"isim": name, "versiyon": None} for name in new))
+
+    def write_developers(self, developers_by_file: Mapping[str, List[DeveloperInfo]]) -> int:
+        rows = [row for row in developer_rows(developers_by_file) if row["email"] not in self._seen_developers]
+        self._seen_developers.update(row["email"] for row in rows)
+        return self._emit("gelistirici", rows)
+
+    def write_icerir(self, functions: Iterable[FunctionInfo]) -> int:
+        return self._emit("icerir", icerir_rows(functions))
+
+    def write_kullanir(self, modules: Iterable[ModuleInfo]) -> int:
+        return self._emit("kullanir", kullanir_rows(modules))
+
+    def write_yazdi(self, developers_by_file: Mapping[str, List[DeveloperInfo]]) -> int:
+        return self._emit("yazdi", yazdi_rows(developers_by_file))
+
+    def write_call_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        return self._emit("cagirir", rows)
+
+    # an import starts from an empty database, so there is no cache generation to bump
+    def bump_generation(self) -> None:
+        return None
+
+    # an export always describes a fresh database, so there is nothing to delete
+    def delete_modules(self, file_paths: Iterable[str]) -> int:
+        return 0
+
+    def delete_functions(self, function_ids: Iterable[str]) -> int:
+        return 0
+
+    def clear_module_edges(self, file_paths: Iterable[str]) -> int:
+        return 0
@@ -1,171 +1,310 @@
 from __future__ import annotations
 
 import argparse
-from typing import Dict, List, Tuple
-
+import contextlib
+import sys
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from src.config import settings
 from src.graph.neo4j_client import Neo4jClient
-from src.ingest.parser import collect_graph_data, DeveloperInfo, FunctionInfo, ModuleInfo
-
-
-def _merge_modul(tx, module: ModuleInfo):
-    tx.run(
-        """
-        MERGE (m:Modul {dosya_yolu: $dosya_yolu})
-        ON CREATE SET m.dil = $dil
-        ON MATCH SET m.dil = coalesce(m.dil, $dil)
-        """,
-        dosya_yolu=module.file_path,
-        dil=module.language,
-    )
-
-
-def _merge_fonksiyon(tx, func: FunctionInfo):
-    tx.run(
-        """
-        MERGE (f:Fonksiyon {id: $id})
-        SET f.isim = $isim,
-            f.parametreler = $parametreler,
-            f.geri_donus_tipi = $geri_donus_tipi,
-            f.dosya_yolu = $dosya_yolu,
-            f.satir = $satir
-        """,
-        id=func.id,
-        isim=func.name,
-        parametreler=func.parameters,
-        geri_donus_tipi=func.returns,
-        dosya_yolu=func.file_path,
-        satir=func.line,
-    )
-
-
-def _rel_icerir(tx, module: ModuleInfo, func: FunctionInfo):
-    tx.run(
-        """
-        MATCH (m:Modul {dosya_yolu: $dosya_yolu}), (f:Fonksiyon {id: $id})
-        MERGE (m)-[:ICERIR]->(f)
-        """,
-        dosya_yolu=module.file_path,
-        id=func.id,
-    )
-
-
-def _merge_kutuphane(tx, name: str, version: str | None = None):
-    tx.run(
-        """
-        MERGE (k:Kutuphane {isim: $isim})
-        ON CREATE SET k.versiyon = $versiyon
-        ON MATCH SET k.versiyon = coalesce(k.versiyon, $versiyon)
-        """,
-        isim=name,
-        versiyon=version,
+from src.ingest.analytics import refresh_analytics
+from src.ingest.authorship import AUTHORSHIP_MODES, DEFAULT_BLAME_WORKERS
+from src.ingest.export import CsvExporter
+from src.ingest.manifest import MANIFEST_FILENAME, Manifest, ManifestEntry
+from src.ingest.metrics import METRICS_FILENAME, IngestMetrics, ProgressDisplay, print_summary
+from src.ingest.parser import iter_source_files
+from src.ingest.pipeline import FileRecord, IngestPipeline, PipelineResult
+from src.ingest.resolver import imported_modules, module_name_for, references_any
+from src.ingest.writer import DEFAULT_BATCH_SIZE, BulkWriter
+
+
+@dataclass
+class IngestPlan:
+    current: Dict[str, ManifestEntry]
+    to_parse: List[Path]
+    removed: List[str] = field(default_factory=list)
+    # manifest entries of files already in the graph that get re-parsed / stay untouched
+    previous: Dict[str, ManifestEntry] = field(default_factory=dict)
+    known: Dict[str, ManifestEntry] = field(default_factory=dict)
+    full: bool = False
+
+
+def plan_full(manifest: Manifest, current: Dict[str, ManifestEntry]) -> IngestPlan:
+    return IngestPlan(current=current, to_parse=[Path(key) for key in current], full=True)
+
+
+def plan_incremental(
+    root: Path,
+    manifest: Manifest,
+    current: Dict[str, ManifestEntry],
+    removed: List[str],
+) -> IngestPlan:
+    # `current` holds digests of the candidate files; everything else in the manifest is unchanged
+    dirty = {key for key, entry in current.items() if key not in manifest.files or manifest.files[key].hash != entry.hash}
+    removed = [key for key in removed if key in manifest.files]
+    untouched = [key for key in manifest.files if key not in dirty and key not in set(removed)]
+    # touched but identical files keep their entry; record the new stat so the next run skips the hash
+    for key in untouched:
+        if key in current:
+            manifest.files[key].size = current[key].size
+            manifest.files[key].mtime_ns = current[key].mtime_ns
+    # unchanged files importing a touched module are re-parsed too, so their calls re-resolve
+    touched = {module_name_for(key, root) for key in [*dirty, *removed]}
+    dependents = {key for key in untouched if references_any(manifest.files[key].imports, touched)} if touched else set()
+    for key in dependents:
+        current.setdefault(key, manifest.files[key])
+    return IngestPlan(
+        current=current,
+        to_parse=[Path(key) for key in sorted(dirty | dependents)],
+        removed=sorted(removed),
+        previous=dict(manifest.files),
+        known={key: manifest.files[key] for key in untouched if key not in dependents},
     )
 
 
-def _rel_kullanir_modul(tx, module: ModuleInfo, lib_name: str):
-    tx.run(
-        """
-        MATCH (m:Modul {dosya_yolu: $dosya_yolu}), (k:Kutuphane {isim: $isim})
-        MERGE (m)-[:KULLANIR]->(k)
-        """,
-        dosya_yolu=module.file_path,
-        isim=lib_name,
+def run_plan(
+    writer,
+    root: Path,
+    manifest: Manifest,
+    plan: IngestPlan,
+    include_devs: bool = True,
+    workers: int = 1,
+    authorship: str = "log",
+    blame_workers: int = DEFAULT_BLAME_WORKERS,
+    metrics: Optional[IngestMetrics] = None,
+) -> PipelineResult:
+    if plan.full:
+        manifest.files = {}
+    for key in plan.removed:
+        manifest.files.pop(key, None)
+
+    def _record_manifest(record: FileRecord) -> None:
+        entry = plan.current[record.key]
+        entry.functions = [func.id for func in record.functions]
+        if record.module is not None:
+            module_name = module_name_for(record.key, root)
+            is_package = Path(record.key).stem == "__init__"
+            entry.imports = sorted(imported_modules(module_name, record.module.aliases, is_package))
+        manifest.files[record.key] = entry
+
+    writer.delete_modules(plan.removed)
+    pipeline = IngestPipeline(
+        root,
+        writer,
+        include_devs=include_devs,
+        workers=workers,
+        authorship=authorship,
+        blame_workers=blame_workers,
+        previous=plan.previous,
+        known=plan.known,
+        metrics=metrics,
     )
+    return pipeline.run(plan.to_parse, on_file=_record_manifest)
 
 
-def _merge_gelistirici(tx, dev: DeveloperInfo):
-    tx.run(
-        """
-        MERGE (g:Gelistirici {email: $email})
-        ON CREATE SET g.isim = $isim, g.team = $team
-        ON MATCH SET g.isim = coalesce(g.isim, $isim), g.team = coalesce(g.team, $team)
-        """,
-        email=dev.email or dev.name or "unknown",
-        isim=dev.name,
-        team=dev.team,
-    )
-
-
-def _rel_yazdi_modul(tx, module: ModuleInfo, dev: DeveloperInfo):
-    tx.run(
-        """
-        MATCH (g:Gelistirici {email: $email}), (m:Modul {dosya_yolu: $dosya_yolu})
-        MERGE (g)-[:YAZDI]->(m)
-        """,
-        email=dev.email or dev.name or "unknown",
-        dosya_yolu=module.file_path,
-    )
-
-
-def _rel_cagirir(tx, caller: FunctionInfo, callee_name: str):
-    # naive: connect by name within same module
-    tx.run(
-        """
-        MATCH (f1:Fonksiyon {id: $caller_id})
-        MATCH (f2:Fonksiyon {isim: $callee_name, dosya_yolu: $dosya_yolu})
-        MERGE (f1)-[:CAGIRIR]->(f2)
-        """,
-        caller_id=caller.id,
-        callee_name=callee_name,
-        dosya_yolu=caller.file_path,
-    )
-
-
-def ingest(root: Path, include_devs: bool = True) -> None:
-    client = Neo4jClient(
+def open_client() -> Neo4jClient:
+    return Neo4jClient(
         settings.NEO4J_URI or "bolt://localhost:7687",
         settings.NEO4J_USERNAME or "neo4j",
         settings.NEO4J_PASSWORD or "",
         database=settings.NEO4J_DATABASE,
     )
-    client.ensure_constraints()
 
-    modules, functions, libraries, developers_by_file = collect_graph_data(root, include_devs=include_devs)
 
-    with client._driver.session(database=settings.NEO4J_DATABASE) as session:
-        # nodes
-        for module in modules.values():
-            session.execute_write(_merge_modul, module)
-        for func in functions:
-            session.execute_write(_merge_fonksiyon, func)
-        for lib in libraries:
-            session.execute_write(_merge_kutuphane, lib, None)
-
-        # relationships
-        for module in modules.values():
-            # ICERIR
-            for func in [f for f in functions if f.file_path == module.file_path]:
-                session.execute_write(_rel_icerir, module, func)
-                # CAGIRIR by name
-                for callee in func.calls:
-                    session.execute_write(_rel_cagirir, func, callee)
-
-            # KULLANIR
-            for (lib_name, _lvl) in module.imported_libs:
-                session.execute_write(_rel_kullanir_modul, module, lib_name)
-
-            # YAZDI
-            if include_devs:
-                for dev in developers_by_file.get(module.file_path, []):
-                    session.execute_write(_merge_gelistirici, dev)
-                    session.execute_write(_rel_yazdi_modul, module, dev)
+def ingest(
+    root: Path,
+    include_devs: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    authorship: str = "log",
+    blame_workers: int = DEFAULT_BLAME_WORKERS,
+    incremental: bool = False,
+    manifest_path: Path | None = None,
+    export_dir: Path | None = None,
+    metrics: Optional[IngestMetrics] = None,
+) -> IngestMetrics:
+    if export_dir is not None and incremental:
+        raise ValueError("--export-dir writes a full import set and cannot be combined with --incremental")
+    metrics = metrics or IngestMetrics()
+
+    manifest = Manifest.load(manifest_path or root / MANIFEST_FILENAME)
+    with metrics.stage("discover"):
+        paths = sorted(iter_source_files(root))
+    metrics.count("files_discovered", len(paths))
+    with metrics.stage("hash"):
+        current = manifest.digests(paths)
+    with metrics.stage("plan"):
+        if incremental:
+            plan = plan_incremental(root, manifest, current, manifest.diff(current).removed)
+        else:
+            plan = plan_full(manifest, current)
+    metrics.count("files_planned", len(plan.to_parse))
+    metrics.count("files_removed", len(plan.removed))
+    options = dict(
+        include_devs=include_devs,
+        workers=workers,
+        authorship=authorship,
+        blame_workers=blame_workers,
+        metrics=metrics,
+    )
 
-    client.close()
+    if export_dir is not None:
+        with CsvExporter(export_dir, batch_size=batch_size, metrics=metrics) as exporter:
+            run_plan(exporter, root, manifest, plan, **options)
+    else:
+        client = open_client()
+        client.ensure_constraints()
+        with client._driver.session(database=settings.NEO4J_DATABASE) as session:
+            writer = BulkWriter(session, batch_size=batch_size, metrics=metrics)
+            with metrics.stage("migrate"):
+                metrics.count("legacy_functions_deleted", writer.delete_legacy_functions())
+            run_plan(writer, root, manifest, plan, **options)
+            with metrics.stage("lookup"):
+                metrics.count("modules_lookup_backfilled", writer.backfill_lookup(root))
+            with metrics.stage("analytics"):
+                refresh_analytics(writer, [str(path) for path in plan.to_parse], full=plan.full)
+            writer.bump_generation()
+        client.close()
+
+    with metrics.stage("manifest"):
+        manifest.save()
+    metrics.finish()
+    return metrics
+
+
+def refresh_all_analytics(batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    # recomputes every aggregate, e.g. after a neo4j-admin import of --export-dir output
+    client = open_client()
+    client.ensure_constraints()
+    try:
+        with client._driver.session(database=settings.NEO4J_DATABASE) as session:
+            writer = BulkWriter(session, batch_size=batch_size)
+            refreshed = refresh_analytics(writer, full=True)
+            writer.bump_generation()
+    finally:
+        client.close()
+    return refreshed
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Ingest codebase into Neo4j graph")
-    parser.add_argument("--root", type=str, required=True, help="Path to source code root")
+    parser.add_argument("--root", type=str, default=None, help="Path to source code root")
     parser.add_argument("--include-dev", type=str, default="true", help="Use git blame to infer developers")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Rows per UNWIND batch (one write transaction per batch)",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Number of parser processes (1 = parse in-process)")
+    parser.add_argument(
+        "--authorship",
+        choices=AUTHORSHIP_MODES,
+        default=None,
+        help="log: one repository-wide git log pass (fast, default); blame: per-file git blame "
+        "(precise, default with --watch)",
+    )
+    parser.add_argument(
+        "--blame-workers",
+        type=int,
+        default=DEFAULT_BLAME_WORKERS,
+        help="Concurrent git blame processes in --authorship blame mode",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-ingest files added, changed or removed since the last run (per the manifest)",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help=f"Content-hash manifest path (default: <root>/{MANIFEST_FILENAME})",
+    )
+    parser.add_argument(
+        "--export-dir",
+        type=str,
+        default=None,
+        help="Write neo4j-admin import CSVs (header + data per label/type) here instead of writing to Neo4j",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Sync incrementally, then keep the graph in step with file changes under --root",
+    )
+    parser.add_argument("--debounce-ms", type=int, default=300, help="Quiet period that ends a burst of changes (--watch)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between scans when stat-polling (--watch)")
+    parser.add_argument(
+        "--force-polling",
+        action="store_true",
+        help="Use stat polling even if filesystem notifications are available (--watch)",
+    )
+    parser.add_argument(
+        "--progress",
+        choices=("auto", "on", "off"),
+        default="auto",
+        help="Live per-stage progress display (auto: only on a terminal)",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=str,
+        default=None,
+        help="JSON summary of stage timings, counters and transaction latency (default: <root>/.graph_ingest_metrics.json)",
+    )
+    parser.add_argument(
+        "--analytics-only",
+        action="store_true",
+        help="Only recompute the materialized aggregates (fan_in, fonksiyon_sayisi, ...) of the existing graph",
+    )
     args = parser.parse_args()
 
+    if args.analytics_only:
+        refreshed = refresh_all_analytics(batch_size=args.batch_size)
+        print("[analytics] refreshed " + ", ".join(f"{count} {label}" for label, count in refreshed.items()))
+        return
+    if not args.root:
+        parser.error("--root is required")
+
     include_devs = args.include_dev.lower() in ("1", "true", "yes", "on")
-    ingest(Path(args.root), include_devs=include_devs)
+    if args.watch:
+        from src.ingest.watch import watch
+
+        watch(
+            Path(args.root),
+            include_devs=include_devs,
+            authorship=args.authorship or "blame",
+            blame_workers=args.blame_workers,
+            manifest_path=Path(args.manifest) if args.manifest else None,
+            debounce_ms=args.debounce_ms,
+            poll_interval=args.poll_interval,
+            force_polling=args.force_polling,
+        )
+        return
+
+    root = Path(args.root)
+    metrics = IngestMetrics()
+    show_progress = args.progress == "on" or (args.progress == "auto" and sys.stdout.isatty())
+    with ProgressDisplay() if show_progress else contextlib.nullcontext() as display:
+        if display is not None:
+            metrics.add_hook(display)
+        ingest(
+            root,
+            include_devs=include_devs,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            authorship=args.authorship or "log",
+            blame_workers=args.blame_workers,
+            incremental=args.incremental,
+            manifest_path=Path(args.manifest) if args.manifest else None,
+            export_dir=Path(args.export_dir) if args.export_dir else None,
+            metrics=metrics,
+        )
+    metrics.write_summary(Path(args.metrics_out) if args.metrics_out else root / METRICS_FILENAME)
+    if show_progress:
+        print_summary(metrics)
 
 
 if __name__ == "__main__":
     main()
-
-
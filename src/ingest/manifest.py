@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping
+
+
+MANIFEST_FILENAME = ".graph_manifest.json"
+MANIFEST_VERSION = 2
+
+
+def file_digest(path: Path) -> str:
+    # same value as `git hash-object`, so it can be compared with git blob ids
+    data = path.read_bytes()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    hash: str
+    functions: List[str] = field(default_factory=list)
+    size: int = -1
+    mtime_ns: int = -1
+    # absolute dotted import targets, used to find dependents of changed modules
+    imports: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ManifestDiff:
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+    unchanged: List[str]
+
+    @property
+    def dirty(self) -> List[str]:
+        return sorted(self.added + self.changed)
+
+
+class Manifest:
+    def __init__(self, path: Path, files: Dict[str, ManifestEntry] | None = None) -> None:
+        self.path = path
+        self.files: Dict[str, ManifestEntry] = files or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        if not path.exists():
+            return cls(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            # unknown layout (or ids from an older parser): treat as a first run
+            return cls(path)
+        files = {
+            key: ManifestEntry(
+                hash=entry["hash"],
+                functions=list(entry.get("functions", [])),
+                size=entry.get("size", -1),
+                mtime_ns=entry.get("mtime_ns", -1),
+                imports=list(entry.get("imports", [])),
+            )
+            for key, entry in data.get("files", {}).items()
+        }
+        return cls(path, files)
+
+    def save(self) -> None:
+        payload = {
+            "version": MANIFEST_VERSION,
+            "files": {
+                key: {
+                    "hash": entry.hash,
+                    "size": entry.size,
+                    "mtime_ns": entry.mtime_ns,
+                    "functions": entry.functions,
+                    "imports": entry.imports,
+                }
+                for key, entry in sorted(self.files.items())
+            },
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, indent=1, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def digests(self, paths: Iterable[Path]) -> Dict[str, ManifestEntry]:
+        # hash only files whose size or mtime moved; everything else reuses the recorded hash
+        current: Dict[str, ManifestEntry] = {}
+        for path in paths:
+            key = str(path)
+            stat = path.stat()
+            known = self.files.get(key)
+            if known is not None and known.size == stat.st_size and known.mtime_ns == stat.st_mtime_ns:
+                digest = known.hash
+            else:
+                digest = file_digest(path)
+            current[key] = ManifestEntry(hash=digest, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        return current
+
+    def diff(self, current: Mapping[str, ManifestEntry]) -> ManifestDiff:
+        added: List[str] = []
+        changed: List[str] = []
+        unchanged: List[str] = []
+        for key, entry in current.items():
+            known = self.files.get(key)
+            if known is None:
+                added.append(key)
+            elif known.hash != entry.hash:
+                changed.append(key)
+            else:
+                unchanged.append(key)
+        removed = [key for key in self.files if key not in current]
+        return ManifestDiff(sorted(added), sorted(changed), sorted(removed), sorted(unchanged))
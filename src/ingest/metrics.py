@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+
+METRICS_FILENAME = ".graph_ingest_metrics.json"
+
+
+@dataclass(frozen=True)
+class MetricsEvent:
+    # kind: "count" | "stage_started" | "stage_finished" | "transaction" | "finished"
+    kind: str
+    name: str
+    value: float = 0.0
+
+
+Hook = Callable[[MetricsEvent, "IngestMetrics"], None]
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    # nearest-rank percentile of an unsorted sample
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class IngestMetrics:
+    # Counters, accumulated per-stage wall time and write transaction latencies of one
+    # ingestion run. Updated from the pipeline threads; every update is also pushed to the
+    # registered hooks, which is how the progress display and external monitoring get it.
+
+    def __init__(self, hooks: Sequence[Hook] = ()) -> None:
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.stage_seconds: Dict[str, float] = defaultdict(float)
+        self.active_stages: Dict[str, int] = defaultdict(int)
+        self.transaction_ms: List[float] = []
+        self._hooks: List[Hook] = list(hooks)
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Hook) -> None:
+        self._hooks.append(hook)
+
+    def _emit(self, event: MetricsEvent) -> None:
+        for hook in list(self._hooks):
+            try:
+                hook(event, self)
+            except Exception as e:
+                # a broken monitoring hook must not abort an ingestion run
+                with self._lock:
+                    if hook in self._hooks:
+                        self._hooks.remove(hook)
+                print(f"[metrics] hook disabled after {e.__class__.__name__}: {e}", flush=True)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if not value:
+            return
+        with self._lock:
+            self.counters[name] += value
+        self._emit(MetricsEvent("count", name, value))
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        # time spent in a stage accumulates across entries, so it can wrap each batch
+        with self._lock:
+            self.active_stages[name] += 1
+        self._emit(MetricsEvent("stage_started", name))
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stage_seconds[name] += elapsed
+                self.active_stages[name] -= 1
+            self._emit(MetricsEvent("stage_finished", name, elapsed))
+
+    def observe_transaction(self, seconds: float) -> None:
+        with self._lock:
+            self.transaction_ms.append(seconds * 1000)
+        self._emit(MetricsEvent("transaction", "write", seconds))
+
+    def finish(self) -> None:
+        self.finished = time.monotonic()
+        self._emit(MetricsEvent("finished", "ingest", self.elapsed))
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def transaction_summary(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self.transaction_ms)
+        summary: Dict[str, Any] = {"count": len(samples)}
+        if samples:
+            summary.update(
+                mean_ms=round(sum(samples) / len(samples), 3),
+                p50_ms=round(percentile(samples, 50), 3),
+                p90_ms=round(percentile(samples, 90), 3),
+                p99_ms=round(percentile(samples, 99), 3),
+                max_ms=round(max(samples), 3),
+            )
+        return summary
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(sorted(self.counters.items()))
+            stages = {name: round(seconds, 6) for name, seconds in self.stage_seconds.items()}
+        return {
+            "elapsed_s": round(self.elapsed, 6),
+            "counters": counters,
+            "stages_s": stages,
+            "transactions": self.transaction_summary(),
+        }
+
+    def write_summary(self, path: Path) -> None:
+        path.write_text(json.dumps(self.summary(), indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+class ProgressDisplay:
+    # rich live view: one bar per pipeline stage plus write/transaction figures
+
+    # bar label -> counters whose sum is the number of files through that stage
+    BARS = {
+        "parse": ("files_parsed", "syntax_errors"),
+        "authorship": ("files_attributed",),
+        "write": ("files_written",),
+    }
+
+    def __init__(self, console=None) -> None:
+        from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+
+        self._progress = Progress(
+            TextColumn("[bold]{task.description:<11}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TextColumn("{task.fields[detail]}"),
+            TimeElapsedColumn(),
+            console=console,
+            transient=False,
+        )
+        self._tasks = {label: self._progress.add_task(label, total=None, detail="") for label in self.BARS}
+        self._last_refresh = 0.0
+
+    def __enter__(self) -> "ProgressDisplay":
+        self._progress.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._progress.stop()
+
+    def __call__(self, event: MetricsEvent, metrics: IngestMetrics) -> None:
+        if event.kind == "count" and event.name == "files_planned":
+            for task in self._tasks.values():
+                self._progress.update(task, total=metrics.counters["files_planned"])
+        now = time.monotonic()
+        if event.kind not in ("finished", "stage_finished") and now - self._last_refresh < 0.1:
+            return
+        self._last_refresh = now
+        counters = metrics.counters
+        for label, task in self._tasks.items():
+            self._progress.update(task, completed=sum(counters.get(name, 0) for name in self.BARS[label]))
+        self._progress.update(
+            self._tasks["parse"],
+            detail=f"{counters.get('functions', 0)} functions, {counters.get('syntax_errors', 0)} skipped",
+        )
+        tx = metrics.transaction_summary()
+        latency = f", tx p50 {tx['p50_ms']:.1f} ms / p99 {tx['p99_ms']:.1f} ms" if tx["count"] else ""
+        self._progress.update(
+            self._tasks["write"],
+            detail=f"{counters.get('nodes_written', 0)} nodes, {counters.get('edges_written', 0)} edges{latency}",
+        )
+
+
+def print_summary(metrics: IngestMetrics, console=None) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    summary = metrics.summary()
+    table = Table(title=f"ingestion finished in {summary['elapsed_s']:.2f} s", show_header=True)
+    table.add_column("metric")
+    table.add_column("value", justify="right")
+    for name, seconds in summary["stages_s"].items():
+        table.add_row(f"stage {name}", f"{seconds:.3f} s")
+    for name, value in summary["counters"].items():
+        table.add_row(name, str(value))
+    for name, value in summary["transactions"].items():
+        table.add_row(f"transactions {name}", str(value))
+    (console or Console()).print(table)
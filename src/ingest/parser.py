@@ -1,22 +1,27 @@
 from __future__ import annotations
 
 import ast
-import os
-import re
-import subprocess
-from dataclasses import dataclass
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
+from src.ingest.authorship import DEFAULT_BLAME_WORKERS, DeveloperInfo, collect_authors
+from src.ingest.concurrency import chunked, ordered_map
+from src.ingest.metrics import IngestMetrics
 
-@dataclass
+
+@dataclass(slots=True)
 class ModuleInfo:
     file_path: str
     language: str
     imported_libs: Set[Tuple[str, Optional[str]]]
+    # local name -> imported dotted target; relative imports keep their leading dots
+    aliases: Dict[str, str] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionInfo:
     id: str
     name: str
@@ -25,99 +30,99 @@ class FunctionInfo:
     file_path: str
     line: int
     calls: Set[str]
+    qualname: str = ""
 
 
-@dataclass
-class DeveloperInfo:
-    name: Optional[str]
-    email: Optional[str]
-    team: Optional[str]
+def function_id(file_path: str, qualname: str) -> str:
+    # stable identity: does not change when lines above the function shift
+    return f"{file_path}::{qualname}"
 
 
-def _safe_run_git(args: List[str], cwd: Path) -> str:
-    try:
-        result = subprocess.run(["git", *args], cwd=str(cwd), capture_output=True, text=True, check=False)
-        return result.stdout
-    except Exception:
-        return ""
-
-
-def discover_developers_for_file(file_path: Path) -> List[DeveloperInfo]:
-    # Use git blame to discover emails and names
-    cwd = file_path.parent
-    output = _safe_run_git(["blame", "--line-porcelain", file_path.name], cwd)
-    if not output:
-        return []
-
-    emails: Set[str] = set()
-    names: Set[str] = set()
-
-    for line in output.splitlines():
-        if line.startswith("author "):
-            names.add(line[len("author "):].strip())
-        elif line.startswith("author-mail "):
-            email = line[len("author-mail "):].strip().strip("<>")
-            emails.add(email)
-
-    developers: List[DeveloperInfo] = []
-    for name in names or {None}:
-        # naive mapping: pair any name with any email
-        if emails:
-            for email in emails:
-                developers.append(DeveloperInfo(name=name, email=email, team=None))
-        else:
-            developers.append(DeveloperInfo(name=name, email=None, team=None))
-    if not names and emails:
-        for email in emails:
-            developers.append(DeveloperInfo(name=None, email=email, team=None))
-    return developers
+def call_target(func: ast.expr) -> Optional[str]:
+    parts: List[str] = []
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+    elif parts:
+        parts = parts[:1] + ["*"]
+    else:
+        return None
+    return ".".join(reversed(parts))
 
 
 class PythonModuleVisitor(ast.NodeVisitor):
-    def __init__(self) -> None:
+    def __init__(self, file_path: str = "") -> None:
         super().__init__()
+        self.file_path = file_path
         self.functions: List[FunctionInfo] = []
         self.calls_by_function_stack: List[Set[str]] = []
         self.imports: Set[Tuple[str, Optional[str]]] = set()
+        self.aliases: Dict[str, str] = {}
+        self.scope_stack: List[str] = []
+        self._qualname_counts: Dict[str, int] = {}
+
+    def _qualname(self, name: str) -> str:
+        qualname = ".".join([*self.scope_stack, name])
+        count = self._qualname_counts.get(qualname, 0) + 1
+        self._qualname_counts[qualname] = count
+        # redefinitions (e.g. property setters) get a source-order suffix
+        return qualname if count == 1 else f"{qualname}#{count}"
 
     def visit_Import(self, node: ast.Import) -> None:  # type: ignore[override]
         for alias in node.names:
             self.imports.add((alias.name.split(".")[0], None))
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            else:
+                # `import a.b` binds `a`
+                head = alias.name.split(".")[0]
+                self.aliases[head] = head
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node: ast.ImportFrom) -> None:  # type: ignore[override]
         if node.module:
             self.imports.add((node.module.split(".")[0], getattr(node, "level", None)))
+        prefix = "." * (node.level or 0) + (f"{node.module}." if node.module else "")
+        for alias in node.names:
+            if alias.name != "*":
+                self.aliases[alias.asname or alias.name] = prefix + alias.name
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:  # type: ignore[override]
+        self.scope_stack.append(node.name)
         self.generic_visit(node)
+        self.scope_stack.pop()
 
     def visit_FunctionDef(self, node: ast.FunctionDef) -> None:  # type: ignore[override]
         param_names = [arg.arg for arg in node.args.args]
         returns = None
         if node.returns is not None:
             returns = ast.unparse(node.returns) if hasattr(ast, "unparse") else None
-        func_id = f"{node.name}:{getattr(node, 'lineno', 0)}"
+        qualname = self._qualname(node.name)
+        self.scope_stack.append(node.name)
         self.calls_by_function_stack.append(set())
         self.generic_visit(node)
         calls = self.calls_by_function_stack.pop() if self.calls_by_function_stack else set()
+        self.scope_stack.pop()
         self.functions.append(
             FunctionInfo(
-                id=func_id,
+                id=function_id(self.file_path, qualname),
                 name=node.name,
                 parameters=param_names,
                 returns=returns,
-                file_path="",
+                file_path=self.file_path,
                 line=getattr(node, "lineno", 0),
                 calls=calls,
+                qualname=qualname,
             )
         )
 
     def visit_Call(self, node: ast.Call) -> None:  # type: ignore[override]
-        # Record simple function name calls: foo(), module.foo()
-        name: Optional[str] = None
-        if isinstance(node.func, ast.Name):
-            name = node.func.id
-        elif isinstance(node.func, ast.Attribute):
-            name = node.func.attr
+        # Record dotted call targets: foo(), module.foo(), self.foo(), pkg.mod.foo();
+        # calls on computed receivers keep only the attribute: x().foo() -> "*.foo"
+        name = call_target(node.func)
         if name and self.calls_by_function_stack:
             self.calls_by_function_stack[-1].add(name)
         self.generic_visit(node)
@@ -126,12 +131,14 @@ class PythonModuleVisitor(ast.NodeVisitor):
 def parse_python_file(file_path: Path) -> Tuple[ModuleInfo, List[FunctionInfo]]:
     source = file_path.read_text(encoding="utf-8", errors="ignore")
     tree = ast.parse(source)
-    visitor = PythonModuleVisitor()
+    visitor = PythonModuleVisitor(str(file_path))
     visitor.visit(tree)
-    # attach file path
-    for f in visitor.functions:
-        f.file_path = str(file_path)
-    module = ModuleInfo(file_path=str(file_path), language="python", imported_libs=visitor.imports)
+    module = ModuleInfo(
+        file_path=str(file_path),
+        language="python",
+        imported_libs=visitor.imports,
+        aliases=visitor.aliases,
+    )
     return module, visitor.functions
 
 
@@ -142,24 +149,83 @@ def iter_source_files(root: Path) -> Iterable[Path]:
         yield path
 
 
-def collect_graph_data(root: Path, include_devs: bool = True):
+ParsedFile = Tuple[ModuleInfo, List[FunctionInfo]]
+
+
+def _parse_worker(path: str) -> Optional[ParsedFile]:
+    # runs in a child process: return plain dataclass records, None for unparsable files
+    try:
+        return parse_python_file(Path(path))
+    except SyntaxError:
+        return None
+
+
+def _parse_chunk(paths: List[str]) -> List[Optional[ParsedFile]]:
+    return [_parse_worker(path) for path in paths]
+
+
+PARSE_CHUNK_SIZE = 32
+
+
+def _pool_context():
+    # parse_files() runs next to threads that spawn git subprocesses; a plain fork() taken
+    # while another thread is inside Popen inherits its exec-status pipe and stalls that
+    # Popen until the pool exits, so workers come from a fork server where available
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def parse_files(paths: Iterable[Path], workers: int = 1) -> Iterator[Optional[ParsedFile]]:
+    # results are yielded in input order, so output does not depend on the worker count;
+    # paths are consumed lazily with a bounded number of chunks in flight
+    if workers <= 1:
+        for path in paths:
+            yield _parse_worker(str(path))
+        return
+
+    chunks = ([str(p) for p in chunk] for chunk in chunked(paths, PARSE_CHUNK_SIZE))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as executor:
+        for results in ordered_map(executor, _parse_chunk, chunks, window=workers * 2):
+            yield from results
+
+
+def collect_graph_data(
+    root: Path,
+    include_devs: bool = True,
+    workers: int = 1,
+    authorship: str = "log",
+    blame_workers: int = DEFAULT_BLAME_WORKERS,
+    paths: Optional[Sequence[Path]] = None,
+    metrics: Optional[IngestMetrics] = None,
+):
+    metrics = metrics or IngestMetrics()
     modules: Dict[str, ModuleInfo] = {}
     functions: List[FunctionInfo] = []
     developers_by_file: Dict[str, List[DeveloperInfo]] = {}
     libraries: Set[str] = set()
 
-    for file_path in iter_source_files(root):
-        try:
-            module, funcs = parse_python_file(file_path)
-        except SyntaxError:
-            continue
-        modules[module.file_path] = module
-        functions.extend(funcs)
-        for name, _lvl in module.imported_libs:
-            libraries.add(name)
-        if include_devs:
-            developers_by_file[module.file_path] = discover_developers_for_file(file_path)
+    with metrics.stage("discover"):
+        paths = sorted(iter_source_files(root) if paths is None else paths)
+    metrics.count("files_discovered", len(paths))
+    metrics.count("files_planned", len(paths))
+    parsed_paths: List[Path] = []
+    with metrics.stage("parse"):
+        for file_path, parsed in zip(paths, parse_files(paths, workers=workers)):
+            if parsed is None:
+                metrics.count("syntax_errors")
+                continue
+            module, funcs = parsed
+            modules[module.file_path] = module
+            functions.extend(funcs)
+            for name, _lvl in module.imported_libs:
+                libraries.add(name)
+            parsed_paths.append(file_path)
+            metrics.count("files_parsed")
+            metrics.count("functions", len(funcs))
+
+    if include_devs:
+        with metrics.stage("authorship"):
+            developers_by_file = collect_authors(root, parsed_paths, mode=authorship, workers=blame_workers)
+        metrics.count("files_attributed", len(parsed_paths))
 
     return modules, functions, libraries, developers_by_file
-
-
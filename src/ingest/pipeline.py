@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import json
+import queue
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+from src.ingest.authorship import DEFAULT_BLAME_WORKERS, LogAuthorIndex, discover_developers_for_file
+from src.ingest.concurrency import chunked, ordered_map
+from src.ingest.manifest import ManifestEntry
+from src.ingest.metrics import IngestMetrics
+from src.ingest.parser import DeveloperInfo, FunctionInfo, ModuleInfo, parse_files
+from src.ingest.resolver import SymbolIndex, resolved_call_rows
+from src.ingest.writer import BulkWriter, developer_key
+
+
+DEFAULT_QUEUE_SIZE = 256
+
+_DONE = object()
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class FileRecord:
+    key: str
+    module: Optional[ModuleInfo]  # None when the file could not be parsed
+    functions: List[FunctionInfo]
+    developers: List[DeveloperInfo]
+
+
+@dataclass
+class PipelineResult:
+    files: int = 0
+    modules: int = 0
+    functions: int = 0
+    skipped: int = 0
+    calls: int = 0
+
+
+class IngestPipeline:
+    # discover -> parse -> attribute -> write, each stage a thread joined by bounded queues.
+    # Node and containment writes happen while parsing is still running; CAGIRIR needs both
+    # endpoints in the graph, so call sites are spooled to disk and resolved in a final pass.
+    # With --authorship log the git log scan runs alongside all stages and its YAZDI edges are
+    # written after it finishes, so no file waits on the history.
+
+    def __init__(
+        self,
+        root: Path,
+        writer: BulkWriter,
+        include_devs: bool = True,
+        workers: int = 1,
+        authorship: str = "log",
+        blame_workers: int = DEFAULT_BLAME_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        previous: Optional[Mapping[str, ManifestEntry]] = None,
+        known: Optional[Mapping[str, ManifestEntry]] = None,
+        metrics: Optional[IngestMetrics] = None,
+    ) -> None:
+        self.root = root
+        self.writer = writer
+        self.include_devs = include_devs
+        self.workers = workers
+        self.authorship = authorship
+        self.blame_workers = blame_workers
+        self.queue_size = queue_size
+        self.metrics = metrics or IngestMetrics()
+        # manifest entries of files that already exist in the graph (incremental runs)
+        self.previous: Mapping[str, ManifestEntry] = previous or {}
+        # symbols of every module seen so far, for resolving calls across modules; files that are
+        # not re-parsed (incremental runs) contribute the function ids recorded in the manifest
+        self.index = SymbolIndex(root)
+        for key, entry in (known or {}).items():
+            self.index.add_ids(key, entry.functions)
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._seen_libraries: Set[str] = set()
+        self._seen_developers: Set[str] = set()
+        self._authors: Optional[LogAuthorIndex] = None
+
+    # -- queue plumbing -------------------------------------------------
+
+    def _put(self, q: "queue.Queue[Any]", item: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise PipelineCancelled()
+
+    def _drain(self, q: "queue.Queue[Any]") -> Iterator[Any]:
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise PipelineCancelled()
+                continue
+            if item is _DONE:
+                return
+            yield item
+
+    def _stage(self, name: str, target: Callable[..., None], *args: Any) -> threading.Thread:
+        out = args[-1]
+
+        def _run() -> None:
+            try:
+                target(*args)
+            except PipelineCancelled:
+                pass
+            except BaseException as exc:  # surfaced by run()
+                self._errors.append(exc)
+                self._stop.set()
+            finally:
+                try:
+                    out.put_nowait(_DONE)
+                except queue.Full:
+                    if not self._stop.is_set():
+                        self._put(out, _DONE)
+
+        thread = threading.Thread(target=_run, name=f"ingest-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    # -- stages -----------------------------------------------------------
+
+    def _discover(self, paths: Iterable[Path], out: "queue.Queue[Any]") -> None:
+        for path in paths:
+            self._put(out, path)
+
+    def _parse(self, inp: "queue.Queue[Any]", out: "queue.Queue[Any]") -> None:
+        in_flight: Deque[Path] = deque()
+
+        def _source() -> Iterator[Path]:
+            for path in self._drain(inp):
+                in_flight.append(path)
+                yield path
+
+        with self.metrics.stage("parse"):
+            for parsed in parse_files(_source(), workers=self.workers):
+                if parsed is None:
+                    self.metrics.count("syntax_errors")
+                else:
+                    self.metrics.count("files_parsed")
+                    self.metrics.count("functions", len(parsed[1]))
+                self._put(out, (in_flight.popleft(), parsed))
+
+    def _attribute(self, inp: "queue.Queue[Any]", out: "queue.Queue[Any]") -> None:
+        with self.metrics.stage("authorship"):
+            self._attribute_files(inp, out)
+
+    def _attribute_files(self, inp: "queue.Queue[Any]", out: "queue.Queue[Any]") -> None:
+        def _record(item: Any, developers: List[DeveloperInfo]) -> FileRecord:
+            path, parsed = item
+            self.metrics.count("files_attributed")
+            if parsed is None:
+                return FileRecord(key=str(path), module=None, functions=[], developers=[])
+            module, functions = parsed
+            return FileRecord(key=module.file_path, module=module, functions=functions, developers=developers)
+
+        if not self.include_devs or self._authors is not None:
+            for item in self._drain(inp):
+                self._put(out, _record(item, []))
+            return
+
+        def _blame(item: Any) -> FileRecord:
+            path, parsed = item
+            return _record(item, discover_developers_for_file(path) if parsed is not None else [])
+
+        workers = max(1, self.blame_workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for record in ordered_map(executor, _blame, self._drain(inp), window=workers * 2):
+                self._put(out, record)
+
+    # -- write stage (caller's thread: owns the Neo4j session) -------------
+
+    def _flush(self, chunk: List[FileRecord], spool: IO[str], result: PipelineResult) -> None:
+        with self.metrics.stage("write"):
+            self._write_chunk(chunk, spool, result)
+        self.metrics.count("files_written", len(chunk))
+
+    def _write_chunk(self, chunk: List[FileRecord], spool: IO[str], result: PipelineResult) -> None:
+        parsed = [record for record in chunk if record.module is not None]
+
+        gone = [record.key for record in chunk if record.module is None and record.key in self.previous]
+        stale: List[str] = []
+        refreshed: List[str] = []
+        for record in parsed:
+            known = self.previous.get(record.key)
+            if known is None:
+                continue
+            current = {func.id for func in record.functions}
+            stale.extend(func_id for func_id in known.functions if func_id not in current)
+            refreshed.append(record.key)
+        self.writer.delete_modules(gone)
+        self.writer.delete_functions(stale)
+        self.writer.clear_module_edges(refreshed)
+
+        modules = [record.module for record in parsed]
+        functions = [func for record in parsed for func in record.functions]
+        libraries = {name for module in modules for name, _lvl in module.imported_libs} - self._seen_libraries
+        self._seen_libraries |= libraries
+
+        self.writer.write_modules(modules, self.root)
+        self.writer.write_functions(functions)
+        self.writer.write_libraries(libraries)
+        self.writer.write_icerir(functions)
+        self.writer.write_kullanir(modules)
+        self._write_developers({record.key: record.developers for record in parsed if record.developers})
+
+        for record in parsed:
+            self.index.add(record.key, ((func.qualname, func.id) for func in record.functions))
+            spool.write(json.dumps(_spool_record(record), ensure_ascii=False))
+            spool.write("\n")
+
+        result.modules += len(modules)
+        result.functions += len(functions)
+
+    def _write_developers(self, developers_by_file: Dict[str, List[DeveloperInfo]]) -> None:
+        new_developers = {
+            key: [dev for dev in devs if developer_key(dev) not in self._seen_developers]
+            for key, devs in developers_by_file.items()
+        }
+        self._seen_developers.update(developer_key(dev) for devs in developers_by_file.values() for dev in devs)
+        self.writer.write_developers(new_developers)
+        self.writer.write_yazdi(developers_by_file)
+
+    def _write_authors(self, spool: IO[str]) -> None:
+        # log authorship: every written module is in the spool; by now the scan is usually done
+        if self._authors is None:
+            return
+        spool.seek(0)
+        keys = (json.loads(line)[0] for line in spool)
+        with self.metrics.stage("authorship"):
+            for batch in chunked(keys, self.writer.batch_size):
+                developers_by_file = {key: self._authors.developers_for(Path(key)) for key in batch}
+                self._write_developers({key: devs for key, devs in developers_by_file.items() if devs})
+
+    def _write_calls(self, spool: IO[str], result: PipelineResult) -> None:
+        spool.seek(0)
+        with self.metrics.stage("resolve_calls"):
+            result.calls += self.writer.write_call_rows(_spooled_call_rows(spool, self.index))
+
+    def run(
+        self,
+        paths: Iterable[Path],
+        on_file: Optional[Callable[[FileRecord], None]] = None,
+    ) -> PipelineResult:
+        result = PipelineResult()
+        discovered: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        parsed: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        attributed: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        if self.include_devs and self.authorship == "log":
+            self._authors = LogAuthorIndex(self.root).start()
+        threads = [
+            self._stage("discover", self._discover, paths, discovered),
+            self._stage("parse", self._parse, discovered, parsed),
+            self._stage("attribute", self._attribute, parsed, attributed),
+        ]
+
+        chunk: List[FileRecord] = []
+        chunk_rows = 0
+        try:
+            with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+                for record in self._drain(attributed):
+                    result.files += 1
+                    if record.module is None:
+                        result.skipped += 1
+                    chunk.append(record)
+                    chunk_rows += 1 + 2 * len(record.functions) + len(record.developers)
+                    if on_file is not None:
+                        on_file(record)
+                    if chunk_rows >= self.writer.batch_size:
+                        self._flush(chunk, spool, result)
+                        chunk, chunk_rows = [], 0
+                if self._errors:
+                    raise self._errors[0]
+                if chunk:
+                    self._flush(chunk, spool, result)
+                self._write_authors(spool)
+                self._write_calls(spool, result)
+        except PipelineCancelled:
+            # a stage failed and stopped the pipeline; its own error is raised below
+            if not self._errors:
+                raise
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join(timeout=5)
+        if self._errors:
+            raise self._errors[0]
+        return result
+
+
+def _spool_record(record: FileRecord) -> List[Any]:
+    assert record.module is not None
+    return [
+        record.key,
+        record.module.aliases,
+        [[func.id, func.qualname, sorted(func.calls)] for func in record.functions],
+    ]
+
+
+def _spooled_call_rows(spool: IO[str], index: SymbolIndex) -> Iterator[Dict[str, Any]]:
+    for line in spool:
+        key, aliases, functions = json.loads(line)
+        yield from resolved_call_rows(index, key, aliases, functions)
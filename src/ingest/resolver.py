@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+
+def module_name_for(file_path: str, root: Optional[Path] = None) -> str:
+    path = Path(file_path)
+    if root is not None:
+        try:
+            path = path.resolve().relative_to(root.resolve())
+        except ValueError:
+            pass
+    parts = list(path.with_suffix("").parts)
+    if path.anchor:
+        parts = parts[1:]
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def relative_path_for(file_path: str, root: Optional[Path] = None) -> str:
+    # "/" separated path below root (the path itself, minus its anchor, outside of root)
+    path = Path(file_path)
+    if root is not None:
+        try:
+            path = path.resolve().relative_to(root.resolve())
+        except ValueError:
+            pass
+    parts = path.parts[1:] if path.anchor else path.parts
+    return "/".join(parts)
+
+
+def absolute_target(module_name: str, target: str, is_package: bool = False) -> str:
+    # resolve the leading dots of a relative import against the importing module
+    level = len(target) - len(target.lstrip("."))
+    if level == 0:
+        return target
+    package = module_name.split(".") if module_name else []
+    if not is_package:
+        package = package[:-1]
+    if level > 1:
+        package = package[: max(0, len(package) - (level - 1))]
+    rest = target[level:]
+    return ".".join([*package, rest] if rest else package)
+
+
+def imported_modules(module_name: str, aliases: Mapping[str, str], is_package: bool = False) -> Set[str]:
+    return {absolute_target(module_name, target, is_package) for target in aliases.values()}
+
+
+def references_any(targets: Iterable[str], module_names: Iterable[str]) -> bool:
+    # conservative: a target matches a module by full name or by a dotted suffix of 2+ parts,
+    # since the ingestion root may not be the import root
+    keys: Set[str] = set()
+    for name in module_names:
+        parts = name.split(".")
+        keys.add(name)
+        keys.update(".".join(parts[i:]) for i in range(len(parts) - 1))
+    if not keys:
+        return False
+    for target in targets:
+        parts = target.split(".")
+        for i in range(len(parts)):
+            for j in range(i + 1, len(parts) + 1):
+                if ".".join(parts[i:j]) in keys:
+                    return True
+    return False
+
+
+class SymbolIndex:
+    # module dotted name -> {qualname: function id}, built from parser output (or the manifest)
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = root
+        self.modules: Dict[str, Dict[str, str]] = {}
+        self._by_suffix: Dict[str, Optional[str]] = {}
+        self._file_modules: Dict[str, str] = {}
+
+    def module_name(self, file_path: str) -> str:
+        name = self._file_modules.get(file_path)
+        if name is None:
+            name = module_name_for(file_path, self.root)
+        return name
+
+    def add(self, file_path: str, functions: Iterable[Tuple[str, str]]) -> str:
+        # functions: (qualname, id) pairs
+        name = module_name_for(file_path, self.root)
+        self._file_modules[file_path] = name
+        self.modules.setdefault(name, {}).update(functions)
+        parts = name.split(".")
+        for i in range(1, len(parts)):
+            suffix = ".".join(parts[i:])
+            if suffix in self._by_suffix and self._by_suffix[suffix] != name:
+                self._by_suffix[suffix] = None  # ambiguous
+            else:
+                self._by_suffix[suffix] = name
+        return name
+
+    def add_ids(self, file_path: str, function_ids: Iterable[str]) -> str:
+        # manifest entries only keep ids, which embed the qualname after '::'
+        return self.add(file_path, ((func_id.split("::", 1)[-1], func_id) for func_id in function_ids))
+
+    def _find_module(self, dotted: str) -> Optional[str]:
+        if dotted in self.modules:
+            return dotted
+        # the root passed to ingestion may sit above or below the import root
+        suffix_match = self._by_suffix.get(dotted)
+        if suffix_match:
+            return suffix_match
+        parts = dotted.split(".")
+        for i in range(1, len(parts)):
+            candidate = ".".join(parts[i:])
+            if candidate in self.modules:
+                return candidate
+        return None
+
+    def lookup(self, dotted: str) -> Optional[str]:
+        # split a fully qualified name into the longest known module prefix + qualname
+        parts = dotted.split(".")
+        for i in range(len(parts) - 1, 0, -1):
+            module = self._find_module(".".join(parts[:i]))
+            if module is None:
+                continue
+            func_id = self._member(module, ".".join(parts[i:]))
+            if func_id:
+                return func_id
+        return None
+
+    def _member(self, module: str, qualname: str) -> Optional[str]:
+        symbols = self.modules.get(module, {})
+        # calling a class runs its constructor
+        return symbols.get(qualname) or symbols.get(f"{qualname}.__init__")
+
+    def resolve(
+        self,
+        file_path: str,
+        aliases: Mapping[str, str],
+        caller_qualname: str,
+        call: str,
+    ) -> List[str]:
+        module = self.module_name(file_path)
+        is_package = Path(file_path).stem == "__init__"
+        head, _dot, rest = call.partition(".")
+        scopes = caller_qualname.split(".")
+
+        if head in ("self", "cls") and rest:
+            # method on the enclosing class (innermost first)
+            for i in range(len(scopes) - 1, 0, -1):
+                func_id = self._member(module, ".".join([*scopes[:i], rest]))
+                if func_id:
+                    return [func_id]
+            return []
+
+        if head != "*":
+            # nested definitions, then module globals, then imports
+            for prefix in (scopes, []):
+                func_id = self._member(module, ".".join([*prefix, call]))
+                if func_id:
+                    return [func_id]
+            target = aliases.get(head)
+            if target is not None:
+                full = absolute_target(module, target, is_package)
+                func_id = self.lookup(f"{full}.{rest}" if rest else full)
+                # imported names that do not resolve belong to outside libraries
+                return [func_id] if func_id else []
+            if not rest:
+                return []
+
+        # unknown receiver: fall back to same-module functions with that name
+        name = call.rsplit(".", 1)[-1]
+        return sorted(
+            func_id
+            for qualname, func_id in self.modules.get(module, {}).items()
+            if qualname.rsplit(".", 1)[-1].split("#", 1)[0] == name
+        )
+
+
+def resolved_call_rows(
+    index: SymbolIndex,
+    file_path: str,
+    aliases: Mapping[str, str],
+    functions: Iterable[Tuple[str, str, Iterable[str]]],
+) -> Iterator[Dict[str, str]]:
+    # functions: (id, qualname, calls) triples of one module
+    for caller_id, qualname, calls in functions:
+        seen: Set[str] = set()
+        for call in sorted(calls):
+            for callee_id in index.resolve(file_path, aliases, qualname, call):
+                if callee_id not in seen:
+                    seen.add(callee_id)
+                    yield {"caller_id": caller_id, "callee_id": callee_id}
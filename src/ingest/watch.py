@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+from src.config import settings
+from src.ingest.analytics import refresh_analytics
+from src.ingest.authorship import DEFAULT_BLAME_WORKERS
+from src.ingest.ingest import ingest, open_client, plan_incremental, run_plan
+from src.ingest.manifest import MANIFEST_FILENAME, Manifest
+from src.ingest.parser import iter_source_files
+from src.ingest.writer import BulkWriter, TransactionSession
+
+try:  # optional: inotify/FSEvents/ReadDirectoryChangesW through the notify crate
+    import watchfiles
+except ImportError:  # pragma: no cover - depends on the environment
+    watchfiles = None
+
+
+DEFAULT_DEBOUNCE_MS = 300
+DEFAULT_POLL_INTERVAL = 1.0
+# upper bound on how long a continuous burst is grouped before it is applied anyway
+MAX_BATCH_MS = 5000
+
+Batch = Tuple[Set[Path], float]
+
+
+@dataclass
+class WatchUpdate:
+    files: int
+    removed: int
+    functions: int
+    calls: int
+    apply_ms: float
+    latency_ms: float
+
+
+def _source_key(root: Path, path: Path) -> Optional[Path]:
+    # map an event path onto the same key iter_source_files() produces for it
+    if path.suffix != ".py":
+        return None
+    try:
+        rel = path.resolve().relative_to(root.resolve())
+    except (ValueError, OSError):
+        try:
+            rel = path.absolute().relative_to(root.resolve())
+        except ValueError:
+            return None
+    if any(part.startswith(".") for part in rel.parts):
+        return None
+    return root / rel
+
+
+def _snapshot(root: Path) -> Dict[Path, Tuple[int, int]]:
+    snapshot: Dict[Path, Tuple[int, int]] = {}
+    for path in iter_source_files(root):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def poll_changes(
+    root: Path,
+    interval: float = DEFAULT_POLL_INTERVAL,
+    debounce_ms: int = DEFAULT_DEBOUNCE_MS,
+    stop_event: Optional[threading.Event] = None,
+) -> Iterator[Batch]:
+    # stat-polling fallback: only (mtime, size) per file is kept between scans
+    stop_event = stop_event or threading.Event()
+    snapshot = _snapshot(root)
+    pending: Set[Path] = set()
+    first_seen = last_seen = 0.0
+    while not stop_event.wait(interval):
+        fresh = _snapshot(root)
+        changed = {path for path in fresh.keys() ^ snapshot.keys()}
+        changed.update(path for path in fresh.keys() & snapshot.keys() if fresh[path] != snapshot[path])
+        snapshot = fresh
+        now = time.monotonic()
+        if changed:
+            if not pending:
+                first_seen = now
+            pending |= changed
+            last_seen = now
+            if (now - first_seen) * 1000 < MAX_BATCH_MS:
+                continue
+        if pending and ((now - last_seen) * 1000 >= debounce_ms or (now - first_seen) * 1000 >= MAX_BATCH_MS):
+            yield pending, first_seen
+            pending = set()
+
+
+def notify_changes(
+    root: Path,
+    debounce_ms: int = DEFAULT_DEBOUNCE_MS,
+    stop_event: Optional[threading.Event] = None,
+) -> Iterator[Batch]:
+    assert watchfiles is not None
+    for changes in watchfiles.watch(
+        root,
+        watch_filter=lambda _change, path: path.endswith(".py"),
+        step=debounce_ms,
+        debounce=MAX_BATCH_MS,
+        stop_event=stop_event,
+        raise_interrupt=False,
+    ):
+        # watchfiles yields once the burst has been quiet for `step` ms
+        detected = time.monotonic() - debounce_ms / 1000
+        paths = {key for _change, raw in changes if (key := _source_key(root, Path(raw))) is not None}
+        if paths:
+            yield paths, detected
+
+
+def iter_changes(
+    root: Path,
+    debounce_ms: int = DEFAULT_DEBOUNCE_MS,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    force_polling: bool = False,
+    stop_event: Optional[threading.Event] = None,
+) -> Iterator[Batch]:
+    if watchfiles is not None and not force_polling:
+        return notify_changes(root, debounce_ms=debounce_ms, stop_event=stop_event)
+    return poll_changes(root, interval=poll_interval, debounce_ms=debounce_ms, stop_event=stop_event)
+
+
+class GraphWatcher:
+    # applies one debounced batch of file changes to Neo4j in a single write transaction
+
+    def __init__(
+        self,
+        root: Path,
+        client,
+        manifest: Manifest,
+        include_devs: bool = True,
+        authorship: str = "blame",
+        blame_workers: int = DEFAULT_BLAME_WORKERS,
+        batch_size: int = 10_000,
+    ) -> None:
+        self.root = root
+        self.client = client
+        self.manifest = manifest
+        self.include_devs = include_devs
+        self.authorship = authorship
+        self.blame_workers = blame_workers
+        self.batch_size = batch_size
+
+    def apply(self, paths: Set[Path], detected: Optional[float] = None) -> Optional[WatchUpdate]:
+        started = time.monotonic()
+        # state on disk after the burst decides: atomic-rename saves show up as delete+create
+        # of the target (plus a temp file that is gone again), which collapses to "changed"
+        existing = sorted(path for path in paths if path.is_file())
+        missing = sorted(str(path) for path in paths if not path.is_file())
+        current = self.manifest.digests(existing)
+        plan = plan_incremental(self.root, self.manifest, current, missing)
+        if not plan.to_parse and not plan.removed:
+            return None
+
+        saved = dict(self.manifest.files)
+
+        def _work(tx):
+            self.manifest.files = dict(saved)
+            writer = BulkWriter(TransactionSession(tx), batch_size=self.batch_size)
+            result = run_plan(
+                writer,
+                self.root,
+                self.manifest,
+                plan,
+                include_devs=self.include_devs,
+                workers=1,
+                authorship=self.authorship,
+                blame_workers=self.blame_workers,
+            )
+            refresh_analytics(writer, [str(path) for path in plan.to_parse])
+            writer.bump_generation()
+            return result
+
+        try:
+            with self.client._driver.session(database=settings.NEO4J_DATABASE) as session:
+                result = session.execute_write(_work)
+        except BaseException:
+            self.manifest.files = saved
+            raise
+        self.manifest.save()
+
+        finished = time.monotonic()
+        return WatchUpdate(
+            files=result.files,
+            removed=len(plan.removed),
+            functions=result.functions,
+            calls=result.calls,
+            apply_ms=(finished - started) * 1000,
+            latency_ms=(finished - (detected if detected is not None else started)) * 1000,
+        )
+
+
+def _report(update: WatchUpdate) -> None:
+    print(
+        f"[watch] {update.files} file(s) updated, {update.removed} removed, "
+        f"{update.functions} functions, {update.calls} calls | "
+        f"apply {update.apply_ms:.1f} ms, change-to-graph {update.latency_ms:.1f} ms",
+        flush=True,
+    )
+
+
+def watch(
+    root: Path,
+    include_devs: bool = True,
+    batch_size: int = 10_000,
+    authorship: str = "blame",
+    blame_workers: int = DEFAULT_BLAME_WORKERS,
+    manifest_path: Path | None = None,
+    debounce_ms: int = DEFAULT_DEBOUNCE_MS,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    force_polling: bool = False,
+    stop_event: Optional[threading.Event] = None,
+    on_update: Callable[[WatchUpdate], None] = _report,
+) -> None:
+    manifest_path = manifest_path or root / MANIFEST_FILENAME
+    # bring the graph up to date once, then follow the working tree
+    ingest(
+        root,
+        include_devs=include_devs,
+        authorship=authorship,
+        blame_workers=blame_workers,
+        incremental=True,
+        manifest_path=manifest_path,
+    )
+    client = open_client()
+    watcher = GraphWatcher(
+        root,
+        client,
+        Manifest.load(manifest_path),
+        include_devs=include_devs,
+        authorship=authorship,
+        blame_workers=blame_workers,
+        batch_size=batch_size,
+    )
+    backend = "stat polling" if watchfiles is None or force_polling else "filesystem notifications"
+    print(f"[watch] watching {root} ({backend}, debounce {debounce_ms} ms)", flush=True)
+    try:
+        for paths, detected in iter_changes(
+            root,
+            debounce_ms=debounce_ms,
+            poll_interval=poll_interval,
+            force_polling=force_polling,
+            stop_event=stop_event,
+        ):
+            try:
+                update = watcher.apply(paths, detected)
+            except Exception as e:
+                print(f"[watch] update failed: {e.__class__.__name__}: {e}", flush=True)
+                continue
+            if update is not None:
+                on_update(update)
+    finally:
+        client.close()
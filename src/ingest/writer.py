@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+from src.graph.cache import BUMP_GENERATION
+from src.ingest.analytics import MARK_MODUL_CLOSURE, REFRESH_QUERIES
+from src.ingest.concurrency import chunked
+from src.ingest.metrics import IngestMetrics
+from src.ingest.parser import DeveloperInfo, FunctionInfo, ModuleInfo
+from src.ingest.resolver import SymbolIndex, module_name_for, relative_path_for, resolved_call_rows
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+MERGE_MODUL = """
+UNWIND $rows AS row
+MERGE (m:Modul {dosya_yolu: row.dosya_yolu})
+ON CREATE SET m.dil = row.dil
+ON MATCH SET m.dil = coalesce(m.dil, row.dil)
+SET m.dosya_adi = row.dosya_adi, m.goreli_yol = row.goreli_yol, m.modul_adi = row.modul_adi
+"""
+
+# modules written before the lookup properties existed
+MODULES_WITHOUT_LOOKUP = "MATCH (m:Modul) WHERE m.goreli_yol IS NULL RETURN m.dosya_yolu"
+
+SET_MODUL_LOOKUP = """
+UNWIND $rows AS row
+MATCH (m:Modul {dosya_yolu: row.dosya_yolu})
+SET m.dosya_adi = row.dosya_adi, m.goreli_yol = row.goreli_yol, m.modul_adi = row.modul_adi
+"""
+
+MERGE_FONKSIYON = """
+UNWIND $rows AS row
+MERGE (f:Fonksiyon {id: row.id})
+SET f.isim = row.isim,
+    f.parametreler = row.parametreler,
+    f.geri_donus_tipi = row.geri_donus_tipi,
+    f.dosya_yolu = row.dosya_yolu,
+    f.satir = row.satir
+"""
+
+MERGE_KUTUPHANE = """
+UNWIND $rows AS row
+MERGE (k:Kutuphane {isim: row.isim})
+ON CREATE SET k.versiyon = row.versiyon
+ON MATCH SET k.versiyon = coalesce(k.versiyon, row.versiyon)
+"""
+
+MERGE_GELISTIRICI = """
+UNWIND $rows AS row
+MERGE (g:Gelistirici {email: row.email})
+ON CREATE SET g.isim = row.isim, g.team = row.team
+ON MATCH SET g.isim = coalesce(g.isim, row.isim), g.team = coalesce(g.team, row.team)
+"""
+
+REL_ICERIR = """
+UNWIND $rows AS row
+MATCH (m:Modul {dosya_yolu: row.dosya_yolu})
+MATCH (f:Fonksiyon {id: row.id})
+MERGE (m)-[:ICERIR]->(f)
+"""
+
+REL_KULLANIR = """
+UNWIND $rows AS row
+MATCH (m:Modul {dosya_yolu: row.dosya_yolu})
+MATCH (k:Kutuphane {isim: row.isim})
+MERGE (m)-[:KULLANIR]->(k)
+"""
+
+REL_YAZDI = """
+UNWIND $rows AS row
+MATCH (g:Gelistirici {email: row.email})
+MATCH (m:Modul {dosya_yolu: row.dosya_yolu})
+MERGE (g)-[:YAZDI]->(m)
+"""
+
+REL_CAGIRIR = """
+UNWIND $rows AS row
+MATCH (f1:Fonksiyon {id: row.caller_id})
+MATCH (f2:Fonksiyon {id: row.callee_id})
+MERGE (f1)-[:CAGIRIR]->(f2)
+"""
+
+# deletes tag the far end of removed edges :AnalizBekliyor, whose aggregates now changed
+DELETE_MODUL = """
+UNWIND $rows AS row
+MATCH (m:Modul {dosya_yolu: row.dosya_yolu})
+CALL { WITH m MATCH (m)-[:KULLANIR]->(k:Kutuphane) SET k:AnalizBekliyor }
+CALL { WITH m MATCH (g:Gelistirici)-[:YAZDI]->(m) SET g:AnalizBekliyor }
+CALL { WITH m MATCH (m)-[:ICERIR]->(:Fonksiyon)-[:CAGIRIR]-(g:Fonksiyon) SET g:AnalizBekliyor }
+OPTIONAL MATCH (m)-[:ICERIR]->(f:Fonksiyon)
+DETACH DELETE f, m
+"""
+
+DELETE_FONKSIYON = """
+UNWIND $rows AS row
+MATCH (f:Fonksiyon {id: row.id})
+CALL { WITH f MATCH (f)-[:CAGIRIR]-(g:Fonksiyon) SET g:AnalizBekliyor }
+CALL { WITH f MATCH (m:Modul)-[:ICERIR]->(f) SET m:AnalizBekliyor }
+DETACH DELETE f
+"""
+
+# ids from before '<dosya_yolu>::<qualname>' ('name:lineno'); re-ingesting writes the
+# functions under new ids, so the old nodes and their CAGIRIR edges would stay as duplicates
+LEGACY_FONKSIYON_IDS = "MATCH (f:Fonksiyon) WHERE NOT f.id CONTAINS '::' RETURN f.id"
+
+# outgoing facts of a module that are fully re-derived from its source on every write
+CLEAR_MODUL_EDGES = """
+UNWIND $rows AS row
+MATCH (m:Modul {dosya_yolu: row.dosya_yolu})
+CALL { WITH m MATCH (m)-[k:KULLANIR]->(l:Kutuphane) SET l:AnalizBekliyor DELETE k }
+CALL { WITH m MATCH (g:Gelistirici)-[y:YAZDI]->(m) SET g:AnalizBekliyor DELETE y }
+CALL { WITH m MATCH (m)-[:ICERIR]->(:Fonksiyon)-[c:CAGIRIR]->(f:Fonksiyon) SET f:AnalizBekliyor DELETE c }
+"""
+
+
+def developer_key(dev: DeveloperInfo) -> str:
+    return dev.email or dev.name or "unknown"
+
+
+def _unwind(tx, query: str, rows: List[Dict[str, Any]]) -> None:
+    tx.run(query, rows=rows).consume()
+
+
+def _column(tx, query: str, params: Dict[str, Any]) -> List[Any]:
+    return [record[0] for record in tx.run(query, params)]
+
+
+def _execute(tx, query: str, params: Dict[str, Any]) -> None:
+    tx.run(query, params).consume()
+
+
+def module_lookup(file_path: str, root: Optional[Path] = None) -> Dict[str, str]:
+    # lowercase lookup keys of a module, all indexed (Neo4jClient.ensure_constraints):
+    # file name "service.py", path below root "src/auth/service.py", module "src.auth.service"
+    relative = relative_path_for(file_path, root)
+    return {
+        "dosya_adi": relative.rsplit("/", 1)[-1].lower(),
+        "goreli_yol": relative.lower(),
+        "modul_adi": module_name_for(file_path, root).lower(),
+    }
+
+
+def module_rows(modules: Iterable[ModuleInfo], root: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    for module in modules:
+        yield {"dosya_yolu": module.file_path, "dil": module.language, **module_lookup(module.file_path, root)}
+
+
+def function_rows(functions: Iterable[FunctionInfo]) -> Iterator[Dict[str, Any]]:
+    for func in functions:
+        yield {
+            "id": func.id,
+            "isim": func.name,
+            "parametreler": func.parameters,
+            "geri_donus_tipi": func.returns,
+            "dosya_yolu": func.file_path,
+            "satir": func.line,
+        }
+
+
+def icerir_rows(functions: Iterable[FunctionInfo]) -> Iterator[Dict[str, Any]]:
+    # functions already carry their module path, so no per-module grouping is needed
+    for func in functions:
+        yield {"dosya_yolu": func.file_path, "id": func.id}
+
+
+def kullanir_rows(modules: Iterable[ModuleInfo]) -> Iterator[Dict[str, Any]]:
+    for module in modules:
+        for lib_name in sorted({name for name, _lvl in module.imported_libs}):
+            yield {"dosya_yolu": module.file_path, "isim": lib_name}
+
+
+def cagirir_rows(
+    modules: Iterable[ModuleInfo],
+    functions: Iterable[FunctionInfo],
+    root: Optional[Path] = None,
+) -> Iterator[Dict[str, Any]]:
+    # resolve calls in memory against a symbol table of every module, including imports
+    functions_by_file: Dict[str, List[FunctionInfo]] = {}
+    for func in functions:
+        functions_by_file.setdefault(func.file_path, []).append(func)
+    index = SymbolIndex(root)
+    for file_path, funcs in functions_by_file.items():
+        index.add(file_path, ((func.qualname, func.id) for func in funcs))
+    for module in modules:
+        funcs = functions_by_file.get(module.file_path, [])
+        yield from resolved_call_rows(
+            index,
+            module.file_path,
+            module.aliases,
+            ((func.id, func.qualname, func.calls) for func in funcs),
+        )
+
+
+def developer_rows(developers_by_file: Mapping[str, List[DeveloperInfo]]) -> Iterator[Dict[str, Any]]:
+    seen: Set[str] = set()
+    for devs in developers_by_file.values():
+        for dev in devs:
+            key = developer_key(dev)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield {"email": key, "isim": dev.name, "team": dev.team}
+
+
+def yazdi_rows(developers_by_file: Mapping[str, List[DeveloperInfo]]) -> Iterator[Dict[str, Any]]:
+    for file_path, devs in developers_by_file.items():
+        for key in sorted({developer_key(dev) for dev in devs}):
+            yield {"email": key, "dosya_yolu": file_path}
+
+
+class TransactionSession:
+    # lets BulkWriter run all of its batches inside one caller-managed transaction
+
+    def __init__(self, tx) -> None:
+        self._tx = tx
+
+    def execute_write(self, fn, *args, **kwargs):
+        return fn(self._tx, *args, **kwargs)
+
+    execute_read = execute_write
+
+
+# IngestMetrics counters per query: (total counter, label or relationship type)
+QUERY_METRICS = {
+    MERGE_MODUL: ("nodes_written", "Modul"),
+    SET_MODUL_LOOKUP: ("rows_written", "module_lookup"),
+    MERGE_FONKSIYON: ("nodes_written", "Fonksiyon"),
+    MERGE_KUTUPHANE: ("nodes_written", "Kutuphane"),
+    MERGE_GELISTIRICI: ("nodes_written", "Gelistirici"),
+    REL_ICERIR: ("edges_written", "ICERIR"),
+    REL_KULLANIR: ("edges_written", "KULLANIR"),
+    REL_YAZDI: ("edges_written", "YAZDI"),
+    REL_CAGIRIR: ("edges_written", "CAGIRIR"),
+    DELETE_MODUL: ("rows_deleted", "Modul"),
+    DELETE_FONKSIYON: ("rows_deleted", "Fonksiyon"),
+    CLEAR_MODUL_EDGES: ("rows_deleted", "module_edges"),
+    MARK_MODUL_CLOSURE: ("analytics_marked", "Modul"),
+    **{query: ("analytics_refreshed", label) for label, (_key, query) in REFRESH_QUERIES.items()},
+}
+
+
+class BulkWriter:
+    def __init__(
+        self,
+        session,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        metrics: Optional[IngestMetrics] = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        self._session = session
+        self.batch_size = batch_size
+        self.metrics = metrics
+
+    def write(self, query: str, rows: Iterable[Dict[str, Any]]) -> int:
+        written = 0
+        for batch in chunked(rows, self.batch_size):
+            started = time.perf_counter()
+            self._session.execute_write(_unwind, query, batch)
+            written += len(batch)
+            if self.metrics is not None:
+                self.metrics.observe_transaction(time.perf_counter() - started)
+                total, name = QUERY_METRICS.get(query, ("rows_written", "other"))
+                self.metrics.count(total, len(batch))
+                self.metrics.count(f"{total}.{name}", len(batch))
+        return written
+
+    def write_modules(self, modules: Iterable[ModuleInfo], root: Optional[Path] = None) -> int:
+        return self.write(MERGE_MODUL, module_rows(modules, root))
+
+    def write_functions(self, functions: Iterable[FunctionInfo]) -> int:
+        return self.write(MERGE_FONKSIYON, function_rows(functions))
+
+    def write_libraries(self, libraries: Iterable[str]) -> int:
+        return self.write(MERGE_KUTUPHANE, ({"isim": name, "versiyon": None} for name in sorted(libraries)))
+
+    def write_developers(self, developers_by_file: Mapping[str, List[DeveloperInfo]]) -> int:
+        return self.write(MERGE_GELISTIRICI, developer_rows(developers_by_file))
+
+    def write_icerir(self, functions: Iterable[FunctionInfo]) -> int:
+        return self.write(REL_ICERIR, icerir_rows(functions))
+
+    def write_kullanir(self, modules: Iterable[ModuleInfo]) -> int:
+        return self.write(REL_KULLANIR, kullanir_rows(modules))
+
+    def write_yazdi(self, developers_by_file: Mapping[str, List[DeveloperInfo]]) -> int:
+        return self.write(REL_YAZDI, yazdi_rows(developers_by_file))
+
+    def write_cagirir(
+        self,
+        modules: Iterable[ModuleInfo],
+        functions: Iterable[FunctionInfo],
+        root: Optional[Path] = None,
+    ) -> int:
+        return self.write(REL_CAGIRIR, cagirir_rows(modules, functions, root))
+
+    def write_call_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        return self.write(REL_CAGIRIR, rows)
+
+    def read_column(self, query: str, **params: Any) -> List[Any]:
+        return self._session.execute_read(_column, query, params)
+
+    def execute(self, query: str, **params: Any) -> None:
+        self._session.execute_write(_execute, query, params)
+
+    def backfill_lookup(self, root: Optional[Path] = None) -> int:
+        # lookup properties for modules from older ingests that this run did not rewrite
+        paths = self.read_column(MODULES_WITHOUT_LOOKUP)
+        return self.write(SET_MODUL_LOOKUP, ({"dosya_yolu": path, **module_lookup(path, root)} for path in paths))
+
+    def bump_generation(self) -> Optional[int]:
+        # tells query caches that the graph changed
+        record = self._session.execute_write(lambda tx: tx.run(BUMP_GENERATION).single())
+        return record["nesil"] if record else None
+
+    def delete_modules(self, file_paths: Iterable[str]) -> int:
+        return self.write(DELETE_MODUL, ({"dosya_yolu": path} for path in file_paths))
+
+    def delete_functions(self, function_ids: Iterable[str]) -> int:
+        return self.write(DELETE_FONKSIYON, ({"id": func_id} for func_id in function_ids))
+
+    def delete_legacy_functions(self) -> int:
+        return self.delete_functions(self.read_column(LEGACY_FONKSIYON_IDS))
+
+    def clear_module_edges(self, file_paths: Iterable[str]) -> int:
+        return self.write(CLEAR_MODUL_EDGES, ({"dosya_yolu": path} for path in file_paths))
+
+    def write_graph(
+        self,
+        modules: Mapping[str, ModuleInfo],
+        functions: List[FunctionInfo],
+        libraries: Set[str],
+        developers_by_file: Mapping[str, List[DeveloperInfo]],
+        root: Optional[Path] = None,
+    ) -> None:
+        # nodes
+        self.write_modules(modules.values(), root)
+        self.write_functions(functions)
+        self.write_libraries(libraries)
+        self.write_developers(developers_by_file)
+
+        # relationships
+        self.write_icerir(functions)
+        self.write_cagirir(modules.values(), functions, root)
+        self.write_kullanir(modules.values())
+        self.write_yazdi(developers_by_file)
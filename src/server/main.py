@@ -1,54 +1,578 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Literal
+
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import HTMLResponse, StreamingResponse
+from neo4j.exceptions import Neo4jError
 from pydantic import BaseModel
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from src.config import settings
-from src.graph.neo4j_client import Neo4jClient
-from src.gemini.service import ask as gemini_ask
+from src.graph.admission import QueryAdmission, QueryRejected
+from src.graph.cache import QueryCache
+from src.graph.neo4j_client import AsyncNeo4jClient, BatchOutcome, query_error
+from src.graph.paging import decode_cursor, encode_cursor
+from src.graph.schema import SchemaCache
+from src.server.metrics import CONTENT_TYPE, BridgeMetrics, MetricsMiddleware
+from src.gemini.limiter import AskLimiter, AskOverloaded
+from src.gemini.plan_cache import PlanCache
+from src.gemini.service import HttpToolExecutor, LocalToolExecutor, ToolExecutor, ask_events, prompt_version
+from src.gemini.service import ask_async as gemini_ask
 from src.config import settings
 import google.generativeai as genai
 
 
-app = FastAPI(title="MCP-like Bridge: Neo4j Cypher Executor")
+# share of the pool in use above which /health reports "degraded"
+POOL_SATURATION_WARN = 0.9
+# how often a pending request checks whether its client is still connected
+DISCONNECT_POLL_INTERVAL = 0.5
+# request header that skips the result cache (any value but "0"/"false")
+CACHE_BYPASS_HEADER = "X-Cache-Bypass"
+
+
+def create_admission() -> QueryAdmission | None:
+    if not settings.ADMISSION_ENABLED:
+        return None
+    return QueryAdmission(
+        settings.ADMISSION_MAX_ESTIMATED_ROWS,
+        settings.ADMISSION_SOFT_ESTIMATED_ROWS,
+        settings.ADMISSION_SOFT_TIMEOUT,
+        forbidden_operators=[op.strip() for op in settings.ADMISSION_FORBIDDEN_OPERATORS.split(",") if op.strip()],
+        plan_cache_size=settings.ADMISSION_PLAN_CACHE_SIZE,
+        plan_ttl=settings.ADMISSION_PLAN_TTL,
+    )
+
+
+def create_client() -> AsyncNeo4jClient:
+    if settings.GRAPH_BACKEND == "memory":
+        # synthetic graph for offline benchmarks (src/bench/fake_graph.py)
+        from src.bench.fake_graph import create_memory_client
+
+        return create_memory_client(
+            settings.FAKE_GRAPH_MODULES, settings.FAKE_GRAPH_LATENCY, max_pool_size=settings.NEO4J_MAX_POOL_SIZE
+        )
+    return AsyncNeo4jClient(
+        settings.NEO4J_URI or "bolt://localhost:7687",
+        settings.NEO4J_USERNAME or "neo4j",
+        settings.NEO4J_PASSWORD or "",
+        database=settings.NEO4J_DATABASE,
+        max_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+        acquisition_timeout=settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        max_connection_lifetime=settings.NEO4J_MAX_CONNECTION_LIFETIME,
+        admission=create_admission(),
+    )
+
+
+def bridge_urls() -> list[str]:
+    return [url.strip().rstrip("/") for url in (settings.ASK_BRIDGE_URL or "").split(",") if url.strip()]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one driver (and connection pool) per process instead of one per request
+    app.state.neo4j = create_client()
+    app.state.metrics = BridgeMetrics(routes=[route.path for route in app.routes])
+    app.state.query_cache = (
+        QueryCache(
+            settings.QUERY_CACHE_MAX_BYTES,
+            settings.QUERY_CACHE_TTL,
+            generation_check_interval=settings.QUERY_CACHE_GENERATION_CHECK,
+        )
+        if settings.QUERY_CACHE_ENABLED
+        else None
+    )
+    app.state.schema_cache = SchemaCache(settings.SCHEMA_REFRESH_INTERVAL, timeout=settings.NEO4J_QUERY_TIMEOUT)
+    app.state.ask_limiter = AskLimiter(
+        settings.ASK_MAX_CONCURRENCY, settings.ASK_MAX_QUEUE, wait_timeout=settings.ASK_QUEUE_TIMEOUT
+    )
+    # allowed remote bridge URL -> pooled HTTP tool executor, built once from ASK_BRIDGE_URL so a
+    # request can pick a bridge but never open a pool to a host of its choosing
+    app.state.tool_executors = {
+        url: HttpToolExecutor(url, max_connections=settings.ASK_BRIDGE_MAX_CONNECTIONS) for url in bridge_urls()
+    }
+    app.state.plan_cache = (
+        PlanCache(
+            Path(settings.PLAN_CACHE_PATH),
+            prompt_version(),
+            max_entries=settings.PLAN_CACHE_MAX_ENTRIES,
+            ttl=settings.PLAN_CACHE_TTL,
+        )
+        if settings.PLAN_CACHE_ENABLED
+        else None
+    )
+    try:
+        yield
+    finally:
+        for executor in app.state.tool_executors.values():
+            await executor.aclose()
+        if app.state.plan_cache is not None:
+            app.state.plan_cache.close()
+        await app.state.neo4j.close()
+
+
+app = FastAPI(title="MCP-like Bridge: Neo4j Cypher Executor", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(StarletteHTTPException)
+async def count_http_errors(request: Request, exc: StarletteHTTPException):
+    # endpoints map exceptions to HTTPException inside `except`; count the original type
+    cause = exc.__cause__ or exc.__context__ or exc
+    metrics: BridgeMetrics = request.app.state.metrics
+    metrics.observe_error(metrics.route_label(request.url.path), cause.__class__.__name__)
+    return await http_exception_handler(request, exc)
 
 
 class CypherRequest(BaseModel):
     query: str
     params: dict | None = None
+    # pagination: set page_size and/or pass back next_cursor from the previous page
+    page_size: int | None = None
+    cursor: str | None = None
 
 
 class CypherResponse(BaseModel):
     results: list[dict]
+    # true when rows beyond QUERY_MAX_ROWS were dropped (non-paginated requests)
+    truncated: bool = False
+    next_cursor: str | None = None
 
 
-def get_client() -> Neo4jClient:
-    return Neo4jClient(
-        settings.NEO4J_URI or "bolt://localhost:7687",
-        settings.NEO4J_USERNAME or "neo4j",
-        settings.NEO4J_PASSWORD or "",
-        database=settings.NEO4J_DATABASE,
+def get_client(request: Request) -> AsyncNeo4jClient:
+    return request.app.state.neo4j
+
+
+def get_cache(request: Request) -> QueryCache | None:
+    return request.app.state.query_cache
+
+
+def get_metrics(request: Request) -> BridgeMetrics:
+    return request.app.state.metrics
+
+
+def _bypass_requested(request: Request) -> bool:
+    value = request.headers.get(CACHE_BYPASS_HEADER)
+    if value is not None:
+        return value.strip().lower() not in ("0", "false", "no", "off")
+    return "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+
+async def run_cypher(
+    request: Request,
+    client: AsyncNeo4jClient,
+    cache: QueryCache | None,
+    query: str,
+    params: dict | None,
+    skip: int = 0,
+    limit: int | None = None,
+) -> tuple[list[dict], str]:
+    # read-only queries go through the result cache; returns (rows, X-Cache status)
+    readonly = settings.MCP_READ_ONLY
+    metrics: BridgeMetrics = request.app.state.metrics
+
+    async def _run():
+        started = time.perf_counter()
+        rows = await client.run_query(
+            query,
+            params,
+            readonly=readonly,
+            timeout=settings.NEO4J_QUERY_TIMEOUT,
+            skip=skip,
+            limit=limit,
+        )
+        metrics.observe_query("query", time.perf_counter() - started, len(rows))
+        return rows
+
+    if cache is None or not readonly:
+        return await _run(), "OFF"
+    if _bypass_requested(request):
+        cache.record_bypass()
+        return await _run(), "BYPASS"
+    return await cache.fetch(
+        query,
+        params,
+        _run,
+        lambda: client.graph_generation(timeout=settings.NEO4J_QUERY_TIMEOUT),
+        variant=f"{skip}:{limit}",
     )
 
 
+async def fetch_response(
+    request: Request,
+    client: AsyncNeo4jClient,
+    cache: QueryCache | None,
+    body: CypherRequest,
+) -> tuple[CypherResponse, str]:
+    # one row past the cap/page is fetched to tell whether more exist
+    if body.page_size is None and body.cursor is None:
+        cap = settings.QUERY_MAX_ROWS
+        rows, status = await run_cypher(request, client, cache, body.query, body.params, limit=cap + 1)
+        return CypherResponse(results=rows[:cap], truncated=len(rows) > cap), status
+
+    size = min(max(1, body.page_size or settings.QUERY_PAGE_SIZE), settings.QUERY_MAX_ROWS)
+    offset = decode_cursor(body.cursor, body.query, body.params)
+    rows, status = await run_cypher(request, client, cache, body.query, body.params, skip=offset, limit=size + 1)
+    next_cursor = encode_cursor(body.query, body.params, offset + size) if len(rows) > size else None
+    return CypherResponse(results=rows[:size], next_cursor=next_cursor), status
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+async def run_cancellable(request: Request, work: Awaitable[Any]) -> Any:
+    # the work is cancelled as soon as the caller hangs up, releasing its connection early
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if task in done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
 @app.post("/execute_cypher_query", response_model=CypherResponse)
-def execute_cypher_query(body: CypherRequest):
-    client = get_client()
+async def execute_cypher_query(
+    body: CypherRequest,
+    request: Request,
+    response: Response,
+    client: AsyncNeo4jClient = Depends(get_client),
+    cache: QueryCache | None = Depends(get_cache),
+):
     try:
-        results = client.run_query(body.query, body.params, readonly=settings.MCP_READ_ONLY)
-        return CypherResponse(results=results)
+        result, cache_status = await run_cancellable(request, fetch_response(request, client, cache, body))
+        response.headers["X-Cache"] = cache_status
+        return result
+    except QueryRejected as qr:
+        # structured so the caller (the Gemini tool loop) can rewrite the query
+        raise HTTPException(status_code=400, detail=qr.as_dict())
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Query timed out")
+    except Neo4jError as e:
+        # the server-side transaction timeout can fire before the client-side deadline
+        if "TransactionTimedOut" in (e.code or ""):
+            raise HTTPException(status_code=504, detail="Query timed out")
+        raise HTTPException(status_code=500, detail="Execution error") from e
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client closed request")
     except Exception as e:
         raise HTTPException(status_code=500, detail="Execution error") from e
-    finally:
-        client.close()
+
+
+def _ndjson(value: dict) -> bytes:
+    return (json.dumps(value, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+@app.post("/execute_cypher_query/stream")
+async def execute_cypher_query_stream(
+    body: CypherRequest,
+    client: AsyncNeo4jClient = Depends(get_client),
+    metrics: BridgeMetrics = Depends(get_metrics),
+):
+    # one JSON row per line as the driver yields them, closed by a {"_meta": ...} line;
+    # errors after the first row can only be reported in-band as {"_error": ...}
+    cap = settings.STREAM_MAX_ROWS
+    started = time.perf_counter()
+    rows = client.stream_query(
+        body.query,
+        body.params,
+        readonly=settings.MCP_READ_ONLY,
+        timeout=settings.NEO4J_QUERY_TIMEOUT,
+        limit=cap + 1,
+    )
+    try:
+        # surface read-only violations and connection errors before the 200 goes out
+        first = await rows.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except QueryRejected as qr:
+        raise HTTPException(status_code=400, detail=qr.as_dict())
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Neo4jError as e:
+        if "TransactionTimedOut" in (e.code or ""):
+            raise HTTPException(status_code=504, detail="Query timed out")
+        raise HTTPException(status_code=500, detail="Execution error") from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Execution error") from e
+
+    async def _lines() -> AsyncIterator[bytes]:
+        sent = 0
+        truncated = False
+        try:
+            if first is not None:
+                yield _ndjson(first)
+                sent = 1
+                async for row in rows:
+                    if sent >= cap:
+                        truncated = True
+                        break
+                    yield _ndjson(row)
+                    sent += 1
+        except Exception as e:
+            metrics.observe_error("/execute_cypher_query/stream", e.__class__.__name__)
+            yield _ndjson({"_error": {"type": e.__class__.__name__, "message": "Execution error"}})
+            return
+        finally:
+            await rows.aclose()
+        metrics.observe_query("stream", time.perf_counter() - started, sent)
+        yield _ndjson({"_meta": {"rows": sent, "truncated": truncated}})
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+class CypherBatchItem(BaseModel):
+    query: str
+    params: dict | None = None
+
+
+class CypherBatchRequest(BaseModel):
+    items: list[CypherBatchItem]
+    # false: one session, one transaction, items in order; true: one session per item, concurrently
+    parallel: bool = False
+
+
+class CypherBatchItemResult(BaseModel):
+    results: list[dict] = []
+    truncated: bool = False
+    error: dict | None = None
+    # write batches only: the item ran but a later failure rolled the transaction back
+    rolled_back: bool = False
+
+
+class CypherBatchResponse(BaseModel):
+    mode: str
+    results: list[CypherBatchItemResult]
+
+
+def _batch_item(rows: list[dict] | None, cap: int, error: BaseException | None = None, rolled_back: bool = False):
+    if error is not None:
+        return CypherBatchItemResult(error=query_error(error))
+    rows = rows or []
+    return CypherBatchItemResult(results=rows[:cap], truncated=len(rows) > cap, rolled_back=rolled_back)
+
+
+async def run_batch_transaction(
+    client: AsyncNeo4jClient,
+    metrics: BridgeMetrics,
+    items: list[CypherBatchItem],
+) -> list[CypherBatchItemResult]:
+    cap = settings.QUERY_MAX_ROWS
+    started = time.perf_counter()
+    outcomes: list[BatchOutcome] = await asyncio.wait_for(
+        client.run_batch(
+            [(item.query, item.params) for item in items],
+            readonly=settings.MCP_READ_ONLY,
+            timeout=settings.NEO4J_QUERY_TIMEOUT,
+            limit=cap + 1,
+        ),
+        settings.NEO4J_QUERY_TIMEOUT,
+    )
+    metrics.observe_query("batch", time.perf_counter() - started, sum(len(o.rows or ()) for o in outcomes))
+    return [_batch_item(o.rows, cap, o.error, o.rolled_back) for o in outcomes]
+
+
+async def run_batch_parallel(
+    request: Request,
+    client: AsyncNeo4jClient,
+    cache: QueryCache | None,
+    items: list[CypherBatchItem],
+) -> list[CypherBatchItemResult]:
+    # each item is an ordinary cached query; the semaphore keeps one batch from draining the pool
+    cap = settings.QUERY_MAX_ROWS
+    slots = asyncio.Semaphore(max(1, settings.BATCH_MAX_PARALLEL))
+
+    async def _one(item: CypherBatchItem) -> CypherBatchItemResult:
+        async with slots:
+            try:
+                rows, _ = await run_cypher(request, client, cache, item.query, item.params, limit=cap + 1)
+            except Exception as e:
+                return _batch_item(None, cap, e)
+        return _batch_item(rows, cap)
+
+    return list(await asyncio.gather(*(_one(item) for item in items)))
+
+
+@app.post("/execute_cypher_batch", response_model=CypherBatchResponse)
+async def execute_cypher_batch(
+    body: CypherBatchRequest,
+    request: Request,
+    client: AsyncNeo4jClient = Depends(get_client),
+    cache: QueryCache | None = Depends(get_cache),
+    metrics: BridgeMetrics = Depends(get_metrics),
+):
+    # per-item failures are reported in results[i].error; the status code covers the batch
+    if not body.items:
+        raise HTTPException(status_code=400, detail="Batch has no items.")
+    if len(body.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch has more than {settings.BATCH_MAX_ITEMS} items.")
+    if body.parallel:
+        work = run_batch_parallel(request, client, cache, body.items)
+    else:
+        work = run_batch_transaction(client, metrics, body.items)
+    try:
+        results = await run_cancellable(request, work)
+        for item in results:
+            if item.error is not None:
+                metrics.observe_error("/execute_cypher_batch", item.error["type"])
+        return CypherBatchResponse(mode="parallel" if body.parallel else "transaction", results=results)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Batch timed out")
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Execution error") from e
+
+
+# reads of the aggregates materialized at ingest time (src/ingest/analytics.py)
+ANALYTICS_SUMMARY_QUERY = """
+MATCH (o:GrafOzet {ad: 'graf'})
+RETURN o.modul_sayisi AS modul_sayisi, o.fonksiyon_sayisi AS fonksiyon_sayisi,
+       o.kutuphane_sayisi AS kutuphane_sayisi, o.gelistirici_sayisi AS gelistirici_sayisi,
+       o.cagri_sayisi AS cagri_sayisi, toString(o.guncelleme) AS guncelleme
+"""
+ANALYTICS_FUNCTIONS_QUERIES = {
+    order: f"""
+MATCH (f:Fonksiyon) WHERE f.{order} IS NOT NULL
+RETURN f.id AS id, f.isim AS isim, f.dosya_yolu AS dosya_yolu, f.fan_in AS fan_in, f.fan_out AS fan_out
+ORDER BY f.{order} DESC LIMIT $limit
+"""
+    for order in ("fan_in", "fan_out")
+}
+ANALYTICS_MODULES_QUERY = """
+MATCH (m:Modul) WHERE m.fonksiyon_sayisi IS NOT NULL
+RETURN m.dosya_yolu AS dosya_yolu, m.fonksiyon_sayisi AS fonksiyon_sayisi,
+       m.kutuphane_sayisi AS kutuphane_sayisi, m.gelistirici_sayisi AS gelistirici_sayisi
+ORDER BY m.fonksiyon_sayisi DESC LIMIT $limit
+"""
+ANALYTICS_LIBRARIES_QUERY = """
+MATCH (k:Kutuphane) WHERE k.kullanan_modul_sayisi IS NOT NULL
+RETURN k.isim AS isim, k.versiyon AS versiyon, k.kullanan_modul_sayisi AS kullanan_modul_sayisi
+ORDER BY k.kullanan_modul_sayisi DESC LIMIT $limit
+"""
+ANALYTICS_DEVELOPERS_QUERY = """
+MATCH (g:Gelistirici) WHERE g.modul_sayisi IS NOT NULL
+RETURN g.isim AS isim, g.email AS email, g.modul_sayisi AS modul_sayisi
+ORDER BY g.modul_sayisi DESC LIMIT $limit
+"""
+
+
+async def read_analytics(
+    request: Request,
+    response: Response,
+    client: AsyncNeo4jClient,
+    cache: QueryCache | None,
+    query: str,
+    params: dict | None = None,
+) -> CypherResponse:
+    try:
+        rows, cache_status = await run_cancellable(request, run_cypher(request, client, cache, query, params))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Query timed out")
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Execution error") from e
+    response.headers["X-Cache"] = cache_status
+    return CypherResponse(results=rows)
+
+
+def _top_n(limit: int) -> dict:
+    return {"limit": min(max(1, limit), settings.QUERY_MAX_ROWS)}
+
+
+@app.get("/analytics/summary", response_model=CypherResponse)
+async def analytics_summary(
+    request: Request,
+    response: Response,
+    client: AsyncNeo4jClient = Depends(get_client),
+    cache: QueryCache | None = Depends(get_cache),
+):
+    return await read_analytics(request, response, client, cache, ANALYTICS_SUMMARY_QUERY)
+
+
+@app.get("/analytics/functions", response_model=CypherResponse)
+async def analytics_functions(
+    request: Request,
+    response: Response,
+    order: Literal["fan_in", "fan_out"] = "fan_in",
+    limit: int = 20,
+    client: AsyncNeo4jClient = Depends(get_client),
+    cache: QueryCache | None = Depends(get_cache),
+):
+    query = ANALYTICS_FUNCTIONS_QUERIES[order]
+    return await read_analytics(request, response, client, cache, query, _top_n(limit))
+
+
+@app.get("/analytics/modules", response_model=CypherResponse)
+async def analytics_modules(
+    request: Request,
+    response: Response,
+    limit: int = 20,
+    client: AsyncNeo4jClient = Depends(get_client),
+    cache: QueryCache | None = Depends(get_cache),
+):
+    return await read_analytics(request, response, client, cache, ANALYTICS_MODULES_QUERY, _top_n(limit))
+
+
+@app.get("/analytics/libraries", response_model=CypherResponse)
+async def analytics_libraries(
+    request: Request,
+    response: Response,
+    limit: int = 20,
+    client: AsyncNeo4jClient = Depends(get_client),
+    cache: QueryCache | None = Depends(get_cache),
+):
+    return await read_analytics(request, response, client, cache, ANALYTICS_LIBRARIES_QUERY, _top_n(limit))
+
+
+@app.get("/analytics/developers", response_model=CypherResponse)
+async def analytics_developers(
+    request: Request,
+    response: Response,
+    limit: int = 20,
+    client: AsyncNeo4jClient = Depends(get_client),
+    cache: QueryCache | None = Depends(get_cache),
+):
+    return await read_analytics(request, response, client, cache, ANALYTICS_DEVELOPERS_QUERY, _top_n(limit))
 
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+def health(request: Request, client: AsyncNeo4jClient = Depends(get_client)):
+    pool = client.pool_stats()
+    status = "degraded" if pool["saturation"] >= POOL_SATURATION_WARN else "ok"
+    body = {"status": status, "neo4j_pool": pool, "ask": request.app.state.ask_limiter.stats()}
+    if client.admission is not None:
+        body["admission"] = client.admission.stats()
+    return body
+
+
+@app.get("/cache/stats")
+def cache_stats(cache: QueryCache | None = Depends(get_cache)):
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/metrics")
+def metrics_endpoint(request: Request, metrics: BridgeMetrics = Depends(get_metrics)):
+    slots = request.app.state.ask_limiter.stats()
+    metrics.observe_ask_slots(slots["active"], slots["waiting"])
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
 
 
 @app.get("/")
@@ -58,20 +582,155 @@ def root():
 
 class AskRequest(BaseModel):
     question: str
+    # bridge that runs the tool calls, one of ASK_BRIDGE_URL; default: its first entry, or this process
     server: str | None = None
 
 
+async def run_tool_query(
+    request: Request,
+    client: AsyncNeo4jClient,
+    cache: QueryCache | None,
+    query: str,
+    params: dict | None = None,
+) -> dict:
+    # the execute_cypher_query tool, served by this process's own query path
+    result, _ = await fetch_response(request, client, cache, CypherRequest(query=query, params=params))
+    return {"results": result.results, "truncated": result.truncated}
+
+
+async def prompt_schema(request: Request, client: AsyncNeo4jClient) -> str | None:
+    schema = await request.app.state.schema_cache.get(client)
+    return schema.describe() if schema is not None else None
+
+
+def tool_executor(
+    request: Request,
+    client: AsyncNeo4jClient,
+    cache: QueryCache | None,
+    server_url: str | None,
+) -> ToolExecutor:
+    executors = request.app.state.tool_executors
+    if server_url:
+        executor = executors.get(server_url.rstrip("/"))
+        if executor is None:
+            raise HTTPException(status_code=400, detail="server must be one of the bridges in ASK_BRIDGE_URL")
+        return executor
+    if executors:
+        return next(iter(executors.values()))
+    return LocalToolExecutor(lambda query, params: run_tool_query(request, client, cache, query, params))
+
+
 @app.post("/ask")
-def ask(body: AskRequest):
+async def ask(
+    body: AskRequest,
+    request: Request,
+    client: AsyncNeo4jClient = Depends(get_client),
+    cache: QueryCache | None = Depends(get_cache),
+    metrics: BridgeMetrics = Depends(get_metrics),
+):
+    executor = tool_executor(request, client, cache, body.server)
     try:
-        server_url = body.server or "http://localhost:8000"
-        answer = gemini_ask(body.question, server_url)
+        schema = await prompt_schema(request, client)
+        answer = await run_cancellable(
+            request,
+            asyncio.wait_for(
+                gemini_ask(
+                    body.question,
+                    executor,
+                    metrics=metrics,
+                    plan_cache=request.app.state.plan_cache,
+                    intent_router=settings.INTENT_ROUTER_ENABLED,
+                    limiter=request.app.state.ask_limiter,
+                    schema=schema,
+                ),
+                settings.ASK_TIMEOUT,
+            ),
+        )
         return {"answer": answer}
+    except AskOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(max(1, round(e.retry_after)))})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Answer timed out")
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client closed request")
     except Exception as e:
         # Return more explicit error detail to help diagnose API key or network issues
         raise HTTPException(status_code=500, detail={"error": str(e), "type": e.__class__.__name__})
 
 
+def _sse(event: str, data: dict) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+@app.get("/ask/stream")
+async def ask_stream(
+    question: str,
+    request: Request,
+    server: str | None = None,
+    client: AsyncNeo4jClient = Depends(get_client),
+    cache: QueryCache | None = Depends(get_cache),
+    metrics: BridgeMetrics = Depends(get_metrics),
+):
+    # Server-Sent Events (GET, for EventSource): tool_call / tool_result per tool round,
+    # token per streamed answer chunk, then answer; failures end the stream with an error
+    # event. The ASK_TIMEOUT deadline covers the whole stream.
+    executor = tool_executor(request, client, cache, server)
+    schema = await prompt_schema(request, client)
+    events = ask_events(
+        question,
+        executor,
+        metrics=metrics,
+        plan_cache=request.app.state.plan_cache,
+        intent_router=settings.INTENT_ROUTER_ENABLED,
+        limiter=request.app.state.ask_limiter,
+        stream=True,
+        schema=schema,
+    )
+
+    async def _body():
+        deadline = time.monotonic() + settings.ASK_TIMEOUT
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(events.__anext__(), max(0.0, deadline - time.monotonic()))
+                except StopAsyncIteration:
+                    return
+                yield _sse(event, data)
+        except asyncio.TimeoutError:
+            metrics.observe_error("/ask/stream", "TimeoutError")
+            yield _sse("error", {"type": "TimeoutError", "error": "Answer timed out"})
+        except AskOverloaded as e:
+            metrics.observe_error("/ask/stream", e.__class__.__name__)
+            yield _sse("error", {"type": e.__class__.__name__, "error": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            metrics.observe_error("/ask/stream", e.__class__.__name__)
+            yield _sse("error", {"type": e.__class__.__name__, "error": str(e)})
+        finally:
+            await events.aclose()
+
+    # no proxy buffering, or the tokens arrive all at once
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_body(), media_type="text/event-stream", headers=headers)
+
+
+@app.get("/schema")
+async def graph_schema(request: Request, client: AsyncNeo4jClient = Depends(get_client)):
+    # the live schema the assistant's prompt is built from (cached, SCHEMA_REFRESH_INTERVAL)
+    schema = await request.app.state.schema_cache.get(client)
+    if schema is None:
+        raise HTTPException(status_code=503, detail="Graph schema is not available")
+    return {**schema.as_dict(), "prompt": schema.describe()}
+
+
+@app.get("/ask/plan-cache/stats")
+def plan_cache_stats(request: Request):
+    plan_cache: PlanCache | None = request.app.state.plan_cache
+    if plan_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **plan_cache.stats()}
+
+
 @app.get("/diag/gemini")
 def diag_gemini():
     try:
@@ -97,16 +756,40 @@ def ui():
   <style>
     body { font-family: Segoe UI, sans-serif; margin: 24px; }
     #answer { white-space: pre-wrap; margin-top: 16px; padding: 12px; background: #f5f5f5; border-radius: 8px; }
+    #progress { margin-top: 12px; color: #666; font-size: 13px; white-space: pre-wrap; }
     input, button { font-size: 16px; }
     input { width: 70%; padding: 8px; }
     button { padding: 8px 12px; }
   </style>
   <script>
-    async function ask() {
+    let source = null;
+    function ask() {
       const q = document.getElementById('q').value;
-      const res = await fetch('/ask', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({question:q})});
-      const data = await res.json();
-      document.getElementById('answer').textContent = data.answer || JSON.stringify(data);
+      const answer = document.getElementById('answer');
+      const progress = document.getElementById('progress');
+      if (source) source.close();
+      answer.textContent = '';
+      progress.textContent = 'Düşünüyor...';
+      source = new EventSource('/ask/stream?question=' + encodeURIComponent(q));
+      source.addEventListener('tool_call', (e) => {
+        const d = JSON.parse(e.data);
+        // text streamed before a tool call is not the answer
+        answer.textContent = '';
+        progress.textContent += '\\nSorgu: ' + d.query;
+      });
+      source.addEventListener('tool_result', (e) => {
+        const d = JSON.parse(e.data);
+        progress.textContent += d.error ? '\\n  hata: ' + JSON.stringify(d.error) : '\\n  ' + d.rows + ' satır';
+      });
+      source.addEventListener('token', (e) => { answer.textContent += JSON.parse(e.data).text; });
+      source.addEventListener('answer', (e) => {
+        answer.textContent = JSON.parse(e.data).answer;
+        source.close();
+      });
+      source.addEventListener('error', (e) => {
+        if (e.data) answer.textContent = 'Hata: ' + JSON.parse(e.data).error;
+        source.close();
+      });
     }
   </script>
   </head>
@@ -115,6 +798,7 @@ def ui():
   <p>Örnek: auth.py modülünü kim yazdı?</p>
   <input id=\"q\" placeholder=\"Sorunuzu yazın...\" />
   <button onclick=\"ask()\">Sor</button>
+  <div id=\"progress\"></div>
   <div id=\"answer\"></div>
 </body>
 </html>
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Minimal Prometheus text-format (0.0.4) registry. Label children are created once per
+# label combination and kept, so observing is a dict lookup plus a few additions under a lock.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+ROUND_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class _Family(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_child(self):
+        ...
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(tuple(str(v) for v in values), self._new_child())
+        return child
+
+    @abstractmethod
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        ...
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self._samples())
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Family):
+    # name includes the _total suffix
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name, _labels(self.labelnames, values), child.value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]) -> None:
+        self.upper_bounds = upper_bounds
+        # one slot per bucket plus +Inf; cumulated only when rendering
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _labels(self.labelnames + ("le",), values + (_format_value(bound),))
+                yield f"{self.name}_bucket", labels, cumulative
+            plain = _labels(self.labelnames, values)
+            yield f"{self.name}_sum", plain, total
+            yield f"{self.name}_count", plain, cumulative
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._families: Dict[str, _Family] = {}
+
+    def register(self, family: _Family) -> _Family:
+        if family.name in self._families:
+            raise ValueError(f"metric {family.name} already registered")
+        self._families[family.name] = family
+        return family
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+class BridgeMetrics:
+    # the bridge server's metric families; one instance per app (app.state.metrics)
+
+    def __init__(self, routes: Sequence[str] = (), registry: Optional[Registry] = None) -> None:
+        # unknown paths (404s, scanners) share one label instead of one series each
+        self.routes = frozenset(routes)
+        self.registry = registry or Registry()
+        r = self.registry
+        self.requests = r.register(
+            Counter("bridge_http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status"))
+        )
+        self.request_seconds = r.register(
+            Histogram("bridge_http_request_duration_seconds", "Time until the response is sent, by route", ("route", "method"))
+        )
+        self.in_flight = r.register(Gauge("bridge_http_requests_in_flight", "Requests being served by route", ("route",)))
+        self.errors = r.register(Counter("bridge_errors_total", "Errors by route and exception type", ("route", "type")))
+        self.neo4j_seconds = r.register(
+            Histogram("bridge_neo4j_query_duration_seconds", "Neo4j execution time of successful queries (cache hits excluded)", ("kind",))
+        )
+        self.neo4j_rows = r.register(
+            Histogram("bridge_neo4j_rows_returned", "Rows returned per Neo4j execution", ("kind",), buckets=ROW_BUCKETS)
+        )
+        self.gemini_seconds = r.register(Histogram("bridge_gemini_call_duration_seconds", "Latency of one Gemini call"))
+        self.ask_rounds = r.register(
+            Histogram("bridge_ask_tool_rounds", "Tool-call rounds per /ask", buckets=ROUND_BUCKETS)
+        )
+        self.plan_cache = r.register(
+            Counter("bridge_ask_plan_cache_total", "Plan cache lookups (hit/miss) and stores of /ask", ("result",))
+        )
+        self.ask_slots = r.register(
+            Gauge("bridge_ask_slots", "Questions holding (active) or waiting for (waiting) a Gemini slot", ("state",))
+        )
+        self.intents = r.register(
+            Counter("bridge_ask_intents_total", "Questions answered by the intent router, by intent (none = sent to Gemini)", ("intent",))
+        )
+
+    def route_label(self, path: str) -> str:
+        return path if path in self.routes else "other"
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float) -> None:
+        self.requests.labels(route, method, str(status)).inc()
+        self.request_seconds.labels(route, method).observe(seconds)
+
+    def observe_error(self, route: str, exc_type: str) -> None:
+        self.errors.labels(route, exc_type).inc()
+
+    def observe_query(self, kind: str, seconds: float, rows: int) -> None:
+        self.neo4j_seconds.labels(kind).observe(seconds)
+        self.neo4j_rows.labels(kind).observe(rows)
+
+    def observe_gemini(self, seconds: float) -> None:
+        self.gemini_seconds.labels().observe(seconds)
+
+    def observe_tool_rounds(self, rounds: int) -> None:
+        self.ask_rounds.labels().observe(rounds)
+
+    def observe_plan_cache(self, result: str) -> None:
+        self.plan_cache.labels(result).inc()
+
+    def observe_intent(self, intent: str) -> None:
+        self.intents.labels(intent).inc()
+
+    def observe_ask_slots(self, active: int, waiting: int) -> None:
+        self.ask_slots.labels("active").set(active)
+        self.ask_slots.labels("waiting").set(waiting)
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+class MetricsMiddleware:
+    # plain ASGI middleware: no request/response wrapping, works for streaming responses
+    # and leaves request.is_disconnected() alone
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics: BridgeMetrics = scope["app"].state.metrics
+        route = metrics.route_label(scope["path"])
+        in_flight = metrics.in_flight.labels(route)
+        status = 500
+
+        async def _send(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        except Exception as e:
+            metrics.observe_error(route, e.__class__.__name__)
+            raise
+        finally:
+            in_flight.dec()
+            metrics.observe_request(route, scope["method"], status, time.perf_counter() - started)
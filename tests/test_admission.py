@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+from neo4j.exceptions import ClientError
+
+from src.graph.admission import PlanSummary, QueryAdmission, QueryRejected, summarize_plan
+from src.graph.neo4j_client import check_readonly
+
+
+def _op(name: str, rows: float, *children: Dict[str, Any], details: str = "") -> Dict[str, Any]:
+    arguments: Dict[str, Any] = {"EstimatedRows": rows}
+    if details:
+        arguments["Details"] = details
+    return {"operatorType": f"{name}@neo4j", "arguments": arguments, "children": list(children)}
+
+
+def _summary(rows: float = 10, operators=("ProduceResults",), query_type: str = "r", unbounded: bool = False) -> PlanSummary:
+    return PlanSummary(query_type=query_type, estimated_rows=rows, operators=tuple(operators), unbounded_var_length=unbounded)
+
+
+def _admission(**kwargs: Any) -> QueryAdmission:
+    options = dict(max_estimated_rows=1000, soft_estimated_rows=100, soft_timeout=5.0)
+    options.update(kwargs)
+    return QueryAdmission(**options)
+
+
+def test_summarize_plan_takes_the_widest_operator() -> None:
+    plan = _op(
+        "ProduceResults",
+        20,
+        _op("Expand(All)", 500, _op("NodeIndexSeek", 3), _op("NodeIndexSeek", 3)),
+    )
+
+    summary = summarize_plan(plan, "r", "MATCH ...")
+
+    assert summary == PlanSummary("r", 500.0, ("ProduceResults", "Expand", "NodeIndexSeek"), False)
+    assert summarize_plan(None, None, "RETURN 1") == PlanSummary("r", 0.0, (), False)
+
+
+@pytest.mark.parametrize(
+    "details, query, unbounded",
+    [
+        ("(a)-[:CAGIRIR*]->(b)", "", True),
+        ("(a)-[:CAGIRIR*2..]->(b)", "", True),
+        ("(a)-[:CAGIRIR*..]->(b)", "", True),
+        ("(a)-[:CAGIRIR*1..3]->(b)", "", False),
+        ("(a)-[:CAGIRIR*3]->(b)", "", False),
+        # older servers: no pattern in Details, the query text decides
+        ("", "MATCH (a)-[:CAGIRIR*]->(b) RETURN b", True),
+        ("", "MATCH (a)-[:CAGIRIR*1..2]->(b) RETURN b", False),
+    ],
+)
+def test_unbounded_var_length(details: str, query: str, unbounded: bool) -> None:
+    plan = _op("ProduceResults", 1, _op("VarLengthExpand(All)", 10, details=details))
+    assert summarize_plan(plan, "r", query).unbounded_var_length is unbounded
+
+
+@pytest.mark.parametrize(
+    "summary, readonly, reason",
+    [
+        (_summary(query_type="w"), True, "write_not_allowed"),
+        (_summary(query_type="s"), True, "write_not_allowed"),
+        (_summary(operators=("CartesianProduct", "AllNodesScan")), False, "cartesian_product"),
+        (_summary(operators=("AllNodesScan",)), False, "operator_not_allowed"),
+        (_summary(unbounded=True), True, "unbounded_path"),
+        (_summary(rows=1001), True, "too_expensive"),
+    ],
+)
+def test_check_rejects(summary: PlanSummary, readonly: bool, reason: str) -> None:
+    admission = _admission(forbidden_operators=("CartesianProduct", "AllNodesScan"))
+    with pytest.raises(QueryRejected) as info:
+        admission.check(summary, readonly=readonly, timeout=30.0)
+    assert info.value.reason == reason
+    assert info.value.as_dict()["rejected"] == reason
+    assert admission.stats()["rejected"] == 1
+
+
+def test_too_expensive_hint_points_at_indexed_lookups() -> None:
+    with pytest.raises(QueryRejected) as info:
+        _admission().check(_summary(rows=10**6), readonly=True, timeout=None)
+    assert "dosya_adi" in info.value.hint and "goreli_yol" in info.value.hint
+    assert "dosya_yolu" not in info.value.hint
+
+
+@pytest.mark.parametrize(
+    "rows, timeout, expected",
+    [
+        (50, 30.0, 30.0),  # under the soft budget: as is
+        (500, 30.0, 5.0),  # over it: the shorter soft timeout
+        (500, 2.0, 2.0),  # a shorter deadline of the caller wins
+        (500, None, 5.0),
+        (1000, 30.0, 5.0),  # the hard budget itself is still admitted
+    ],
+)
+def test_check_soft_timeout(rows: float, timeout: Optional[float], expected: Optional[float]) -> None:
+    assert _admission().check(_summary(rows=rows), readonly=True, timeout=timeout) == expected
+
+
+def test_writes_pass_when_not_readonly_and_soft_timeout_can_be_off() -> None:
+    admission = _admission(soft_timeout=None)
+    assert admission.check(_summary(rows=500, query_type="rw"), readonly=False, timeout=30.0) == 30.0
+    assert admission.stats()["admitted"] == 1
+
+
+def test_admit_explains_each_normalized_query_once() -> None:
+    calls: List[str] = []
+
+    async def explain(query: str, params: Optional[Dict[str, Any]]):
+        calls.append(query)
+        return _op("ProduceResults", 5, _op("NodeIndexSeek", 5)), "r"
+
+    admission = _admission()
+
+    async def _run() -> None:
+        for query in ("MATCH (m:Modul) RETURN m", "MATCH  (m:Modul)\nRETURN m", "MATCH (f:Fonksiyon) RETURN f"):
+            assert await admission.admit(query, None, explain, readonly=True, timeout=30.0) == 30.0
+
+    asyncio.run(_run())
+    assert len(calls) == 2
+    assert admission.stats()["plan_hits"] == 1
+    assert admission.stats()["plans"] == 2
+
+
+class _SyntaxError(ClientError):
+    @property
+    def code(self) -> str:
+        return "Neo.ClientError.Statement.SyntaxError"
+
+    @property
+    def message(self) -> str:
+        return "Invalid input 'RETRUN'"
+
+
+def test_statement_errors_become_invalid_query() -> None:
+    async def explain(query: str, params: Optional[Dict[str, Any]]):
+        raise _SyntaxError()
+
+    with pytest.raises(QueryRejected) as info:
+        asyncio.run(_admission().admit("MATCH (m) RETRUN m", None, explain, readonly=True, timeout=None))
+    assert info.value.reason == "invalid_query"
+    assert "RETRUN" in info.value.message
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "MATCH (m:Modul {dosya_adi: 'create.py'}) RETURN m",
+        'MATCH (m:Modul) WHERE m.goreli_yol ENDS WITH "/delete.py" RETURN m',
+        "MATCH (f:Fonksiyon) WHERE f.isim = 'set_value' RETURN f.offset",
+        "CALL db.index.fulltext.queryNodes('modul_arama', 'auth') YIELD node RETURN node",
+    ],
+)
+def test_readonly_gate_allows_reads(query: str) -> None:
+    check_readonly(query, readonly=True)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "CREATE (m:Modul {dosya_yolu: 'x.py'})",
+        "MATCH (m:Modul) SET m.dil = 'go'",
+        "MATCH (m) DETACH DELETE m",
+        "MATCH (m:Modul) REMOVE m:Modul",
+        "CALL db.labels()",
+        "call dbms.components()",
+        "LOAD CSV FROM 'file:///x.csv' AS row RETURN row",
+        "MATCH (m {dosya_adi: 'a.py'}) MERGE (k:Kutuphane {isim: 'x'})",
+    ],
+)
+def test_readonly_gate_rejects_writes_and_procedures(query: str) -> None:
+    with pytest.raises(ValueError):
+        check_readonly(query, readonly=True)
+    check_readonly(query, readonly=False)
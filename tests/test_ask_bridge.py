@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import settings
+
+
+def test_ask_server_must_be_a_configured_bridge(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "GRAPH_BACKEND", "memory")
+    monkeypatch.setattr(settings, "FAKE_GRAPH_MODULES", 20)
+    monkeypatch.setattr(settings, "PLAN_CACHE_PATH", str(tmp_path / "plan_cache.sqlite3"))
+    monkeypatch.setattr(settings, "ASK_BRIDGE_URL", "http://bridge-a:8000/, http://bridge-b:8000")
+    from src.server.main import app
+
+    with TestClient(app) as client:
+        executors = dict(app.state.tool_executors)
+        assert list(executors) == ["http://bridge-a:8000", "http://bridge-b:8000"]
+
+        response = client.post("/ask", json={"question": "x.py kimin?", "server": "http://169.254.169.254"})
+        assert response.status_code == 400
+        response = client.get("/ask/stream", params={"question": "x.py kimin?", "server": "http://other:8000"})
+        assert response.status_code == 400
+        # no pool was opened for the rejected hosts
+        assert list(app.state.tool_executors) == list(executors)
+
+    assert all(executor._client.is_closed for executor in executors.values())
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import csv
+import os
+import subprocess
+from pathlib import Path
+from typing import List
+
+from src.ingest.export import ARRAY_DELIMITER, NODE_FILES, RELATIONSHIP_FILES
+from src.ingest.ingest import ingest
+
+
+A = """
+import json
+import os
+
+
+def load(path):
+    return json.loads(os.fspath(path))
+
+
+def main():
+    load("x")
+"""
+
+B = """
+import json
+
+
+def dump(value):
+    return json.dumps(value)
+"""
+
+
+def _commit(root: Path, name: str, email: str, message: str) -> None:
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": name,
+        "GIT_AUTHOR_EMAIL": email,
+        "GIT_COMMITTER_NAME": name,
+        "GIT_COMMITTER_EMAIL": email,
+    }
+    subprocess.run(["git", "add", "-A"], cwd=root, check=True, env=env)
+    subprocess.run(["git", "commit", "-q", "-m", message], cwd=root, check=True, env=env)
+
+
+def _tiny_repo(root: Path) -> Path:
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    (root / "a.py").write_text(A, encoding="utf-8")
+    (root / "b.py").write_text(B, encoding="utf-8")
+    _commit(root, "Alice", "alice@example.com", "add modules")
+    (root / "a.py").write_text(A + "\n\ndef extra():\n    main()\n", encoding="utf-8")
+    _commit(root, "Bob", "bob@example.com", "extend a")
+    return root
+
+
+def _read(path: Path) -> List[List[str]]:
+    with open(path, newline="", encoding="utf-8") as fh:
+        return list(csv.reader(fh))
+
+
+def test_export_writes_import_set(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    root = _tiny_repo(repo)
+    export_dir = tmp_path / "export"
+
+    ingest(root, export_dir=export_dir, manifest_path=tmp_path / "manifest.json")
+    a, b = str(root / "a.py"), str(root / "b.py")
+
+    for stem, (header, _keys) in {**NODE_FILES, **RELATIONSHIP_FILES}.items():
+        assert _read(export_dir / f"{stem}_header.csv") == [header]
+
+    assert sorted(_read(export_dir / "modul.csv")) == [
+        [a, "python", "a.py", "a.py", "a", "Modul"],
+        [b, "python", "b.py", "b.py", "b", "Modul"],
+    ]
+    assert sorted(_read(export_dir / "fonksiyon.csv")) == [
+        [f"{a}::extra", "extra", "", "", "14", a, "Fonksiyon"],
+        [f"{a}::load", "load", "path", "", "6", a, "Fonksiyon"],
+        [f"{a}::main", "main", "", "", "10", a, "Fonksiyon"],
+        [f"{b}::dump", "dump", "value", "", "5", b, "Fonksiyon"],
+    ]
+    assert sorted(_read(export_dir / "icerir.csv")) == [
+        [a, f"{a}::extra", "ICERIR"],
+        [a, f"{a}::load", "ICERIR"],
+        [a, f"{a}::main", "ICERIR"],
+        [b, f"{b}::dump", "ICERIR"],
+    ]
+    assert sorted(_read(export_dir / "cagirir.csv")) == [
+        [f"{a}::extra", f"{a}::main", "CAGIRIR"],
+        [f"{a}::main", f"{a}::load", "CAGIRIR"],
+    ]
+
+    # json is imported by both modules and Alice wrote both, each is exported once
+    assert sorted(_read(export_dir / "kutuphane.csv")) == [["json", "", "Kutuphane"], ["os", "", "Kutuphane"]]
+    assert sorted(_read(export_dir / "kullanir.csv")) == [
+        [a, "json", "KULLANIR"],
+        [a, "os", "KULLANIR"],
+        [b, "json", "KULLANIR"],
+    ]
+    assert sorted(_read(export_dir / "gelistirici.csv")) == [
+        ["alice@example.com", "Alice", "", "Gelistirici"],
+        ["bob@example.com", "Bob", "", "Gelistirici"],
+    ]
+    assert sorted(_read(export_dir / "yazdi.csv")) == [
+        ["alice@example.com", a, "YAZDI"],
+        ["alice@example.com", b, "YAZDI"],
+        ["bob@example.com", a, "YAZDI"],
+    ]
+
+    base = export_dir.resolve()
+    args = (export_dir / "import.args").read_text(encoding="utf-8").splitlines()
+    assert args[0] == f"--array-delimiter={ARRAY_DELIMITER}"
+    assert f"--nodes=Modul={base / 'modul_header.csv'},{base / 'modul.csv'}" in args
+    assert f"--nodes=Gelistirici={base / 'gelistirici_header.csv'},{base / 'gelistirici.csv'}" in args
+    assert f"--relationships=CAGIRIR={base / 'cagirir_header.csv'},{base / 'cagirir.csv'}" in args
+    assert len(args) == 1 + len(NODE_FILES) + len(RELATIONSHIP_FILES)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import pytest
+
+from src.gemini import intents
+from src.gemini.intents import file_params, match_intent, render_answer
+
+
+@pytest.mark.parametrize(
+    "question, intent, lang, params",
+    [
+        # who wrote
+        ("auth.py modülünü kim yazdı?", "who_wrote", "tr", file_params("auth.py")),
+        ("src/Server/Main.py'yi kimler yazdı", "who_wrote", "tr", file_params("src/Server/Main.py")),
+        ("`db.py` dosyasının geliştiricileri kimler", "who_wrote", "tr", file_params("db.py")),
+        ("Kim yazdı auth.py", "who_wrote", "tr", file_params("auth.py")),
+        ("Who wrote the file ./src/auth.py?", "who_wrote", "en", file_params("./src/auth.py")),
+        ("authors of api.py", "who_wrote", "en", file_params("api.py")),
+        # libraries of
+        ("auth.py hangi kütüphaneleri kullanıyor?", "libraries_of", "tr", file_params("auth.py")),
+        ("Which libraries does main.py use", "libraries_of", "en", file_params("main.py")),
+        ("imports of the module util.py", "libraries_of", "en", file_params("util.py")),
+        # callers of
+        ("parse_file fonksiyonunu kim çağırıyor?", "callers_of", "tr", {"fonksiyon": "parse_file"}),
+        ("ParseFile'ı kimler çağırır", "callers_of", "tr", {"fonksiyon": "ParseFile"}),
+        ("who calls the function `run()`", "callers_of", "en", {"fonksiyon": "run"}),
+        ("where is load_config called from?", "callers_of", "en", {"fonksiyon": "load_config"}),
+        # top lists
+        ("En çok çağrılan fonksiyonlar hangileri?", "top_functions", "tr", {"limit": intents.DEFAULT_LIMIT}),
+        ("en çok çağrılan 5 fonksiyon", "top_functions", "tr", {"limit": 5}),
+        ("top 500 functions", "top_functions", "en", {"limit": intents.MAX_LIMIT}),
+        ("What are the 3 most used libraries?", "top_libraries", "en", {"limit": 3}),
+        ("En çok kullanılan kütüphaneler neler", "top_libraries", "tr", {"limit": intents.DEFAULT_LIMIT}),
+        # counts
+        ("Grafta kaç modül var?", "count", "tr", {"kind": "modul"}),
+        ("toplam geliştirici sayısı nedir", "count", "tr", {"kind": "gelistirici"}),
+        ("How many functions are in the graph?", "count", "en", {"kind": "fonksiyon"}),
+        ("number of authors", "count", "en", {"kind": "gelistirici"}),
+        ("how many libraries", "count", "en", {"kind": "kutuphane"}),
+    ],
+)
+def test_match_intent(question: str, intent: str, lang: str, params: Dict[str, Any]) -> None:
+    match = match_intent(question)
+    assert match is not None
+    assert (match.intent, match.lang, match.params) == (intent, lang, params)
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "",
+        "auth.py neden bu kadar yavaş?",
+        "parse_file ne işe yarıyor",
+        "Which modules import both requests and httpx?",
+        "who wrote this?",
+        "kaç tane test var",
+        "en çok değişen dosyalar hangileri",
+    ],
+)
+def test_questions_outside_the_templates_go_to_the_model(question: str) -> None:
+    assert match_intent(question) is None
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("auth.py", {"dosya": "auth.py", "dosya_adi": "auth.py", "yol": "auth.py", "sonek": "/auth.py"}),
+        (
+            "./Src/Server/Main.py",
+            {"dosya": "./Src/Server/Main.py", "dosya_adi": "main.py", "yol": "src/server/main.py", "sonek": "/src/server/main.py"},
+        ),
+        ("pkg\\db.py", {"dosya": "pkg\\db.py", "dosya_adi": "db.py", "yol": "pkg/db.py", "sonek": "/pkg/db.py"}),
+    ],
+)
+def test_file_params(name: str, expected: Dict[str, str]) -> None:
+    assert file_params(name) == expected
+
+
+@pytest.mark.parametrize(
+    "question, result, answer",
+    [
+        (
+            "auth.py kim yazdı",
+            {"results": [{"isim": "Ayşe", "email": "ayse@example.com"}, {"isim": "Can", "email": None}]},
+            "auth.py dosyasını yazanlar: Ayşe (ayse@example.com), Can.",
+        ),
+        ("who wrote auth.py", {"results": []}, "No developers are recorded for auth.py."),
+        ("Grafta kaç modül var", {"results": [{"sayi": 42}]}, "Grafta 42 modül var."),
+        (
+            "top 2 libraries",
+            {"results": [{"isim": "httpx", "sayi": 7}, {"isim": "neo4j", "sayi": 3}], "truncated": True},
+            "Most used libraries (number of modules):\n1. httpx: 7\n2. neo4j: 3 (list truncated)",
+        ),
+    ],
+)
+def test_render_answer(question: str, result: Dict[str, Any], answer: str) -> None:
+    match = match_intent(question)
+    assert match is not None
+    assert render_answer(match, result) == answer
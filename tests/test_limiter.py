@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import pytest
+
+from src.gemini.limiter import AskLimiter, AskOverloaded
+
+
+async def _hold(limiter: AskLimiter, gate: asyncio.Event, peaks: List[int]) -> None:
+    async with limiter.slot():
+        peaks.append(limiter.stats()["active"])
+        await gate.wait()
+
+
+def test_concurrency_and_queue_limits() -> None:
+    async def _main() -> None:
+        limiter = AskLimiter(max_concurrent=2, max_waiting=1)
+        gate = asyncio.Event()
+        peaks: List[int] = []
+        holders = [asyncio.create_task(_hold(limiter, gate, peaks)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert limiter.stats()["active"] == 2
+        assert limiter.stats()["waiting"] == 1
+
+        with pytest.raises(AskOverloaded):
+            async with limiter.slot():
+                pass
+
+        gate.set()
+        await asyncio.gather(*holders)
+        assert max(peaks) == 2
+        stats = limiter.stats()
+        assert (stats["active"], stats["waiting"]) == (0, 0)
+        assert (stats["admitted"], stats["queued"], stats["rejected"]) == (3, 1, 1)
+
+    asyncio.run(_main())
+
+
+def test_wait_timeout() -> None:
+    async def _main() -> None:
+        limiter = AskLimiter(max_concurrent=1, max_waiting=5, wait_timeout=0.05)
+        gate = asyncio.Event()
+        holder = asyncio.create_task(_hold(limiter, gate, []))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AskOverloaded) as excinfo:
+            async with limiter.slot():
+                pass
+        assert excinfo.value.retry_after == 0.05
+        assert limiter.stats()["timed_out"] == 1
+        assert limiter.stats()["waiting"] == 0
+
+        gate.set()
+        await holder
+
+    asyncio.run(_main())
+
+
+def test_slot_is_released_when_the_call_raises() -> None:
+    async def _main() -> None:
+        limiter = AskLimiter(max_concurrent=1, max_waiting=0)
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                async with limiter.slot():
+                    raise ValueError("model call failed")
+        assert limiter.stats()["active"] == 0
+
+        # the slot is free again: no AskOverloaded with an empty queue
+        async with limiter.slot():
+            assert limiter.stats()["active"] == 1
+        assert limiter.stats()["admitted"] == 4
+        assert limiter.stats()["rejected"] == 0
+
+    asyncio.run(_main())
+
+
+def test_slot_is_released_when_the_holder_is_cancelled() -> None:
+    async def _main() -> None:
+        limiter = AskLimiter(max_concurrent=1, max_waiting=0)
+        holder = asyncio.create_task(_hold(limiter, asyncio.Event(), []))
+        await asyncio.sleep(0)
+        assert limiter.stats()["active"] == 1
+
+        holder.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await holder
+        assert limiter.stats()["active"] == 0
+        async with limiter.slot():
+            pass
+
+    asyncio.run(_main())
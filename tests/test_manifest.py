@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.ingest import manifest as manifest_module
+from src.ingest.ingest import plan_incremental
+from src.ingest.manifest import Manifest
+
+
+def _write(root: Path, name: str, text: str) -> Path:
+    path = root / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_incremental_plan(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    paths = [_write(tmp_path, f"{name}.py", f"{name} = 1\n") for name in ("kept", "changed", "deleted", "touched")]
+    manifest = Manifest(tmp_path / "manifest.json")
+    manifest.files = manifest.digests(paths)
+
+    added = _write(tmp_path, "added.py", "added = 1\n")
+    changed = _write(tmp_path, "changed.py", "changed = 2\n")
+    (tmp_path / "deleted.py").unlink()
+    touched = tmp_path / "touched.py"
+    stat = touched.stat()
+    os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    existing = sorted(tmp_path.glob("*.py"))
+    current = manifest.digests(existing)
+    diff = manifest.diff(current)
+    assert diff.added == [str(added)]
+    assert diff.changed == [str(changed)]
+    assert diff.removed == [str(tmp_path / "deleted.py")]
+    assert diff.unchanged == [str(tmp_path / "kept.py"), str(touched)]
+
+    plan = plan_incremental(tmp_path, manifest, current, diff.removed)
+    assert plan.to_parse == [added, changed]
+    assert plan.removed == [str(tmp_path / "deleted.py")]
+    assert sorted(plan.known) == [str(tmp_path / "kept.py"), str(touched)]
+    assert manifest.files[str(touched)].mtime_ns == touched.stat().st_mtime_ns
+
+    # the next run trusts the refreshed stat and hashes nothing
+    hashed: List[Path] = []
+    real_digest = manifest_module.file_digest
+
+    def _counting_digest(path: Path) -> str:
+        hashed.append(path)
+        return real_digest(path)
+
+    monkeypatch.setattr(manifest_module, "file_digest", _counting_digest)
+    for key in (str(added), str(changed)):
+        manifest.files[key] = current[key]
+    manifest.digests(existing)
+    assert hashed == []
+
+
+def test_manifest_round_trip(tmp_path: Path) -> None:
+    path = _write(tmp_path, "mod.py", "x = 1\n")
+    manifest = Manifest(tmp_path / "manifest.json")
+    manifest.files = manifest.digests([path])
+    manifest.files[str(path)].functions = ["mod.f"]
+    manifest.files[str(path)].imports = ["json"]
+    manifest.save()
+
+    loaded = Manifest.load(tmp_path / "manifest.json")
+    assert loaded.files == manifest.files
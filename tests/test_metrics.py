@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import settings
+from src.graph.cache import GENERATION_QUERY
+from src.server.metrics import CONTENT_TYPE, BridgeMetrics, Counter, Gauge, Histogram, Registry, _Family
+
+
+def test_family_needs_child_and_samples() -> None:
+    with pytest.raises(TypeError):
+        _Family("demo", "abstract")
+
+    class _NoSamples(_Family):
+        def _new_child(self) -> object:
+            return object()
+
+    with pytest.raises(TypeError):
+        _NoSamples("demo", "missing _samples")
+
+
+def test_counter_and_gauge_text_format() -> None:
+    registry = Registry()
+    requests = registry.register(Counter("demo_requests_total", "Requests by path", ("path",)))
+    in_flight = registry.register(Gauge("demo_in_flight", "Requests being served"))
+    requests.labels('/a"b\\c\nd').inc()
+    requests.labels('/a"b\\c\nd').inc(2)
+    in_flight.labels().inc()
+    in_flight.labels().dec(0.5)
+
+    assert registry.render() == (
+        "# HELP demo_requests_total Requests by path\n"
+        "# TYPE demo_requests_total counter\n"
+        'demo_requests_total{path="/a\\"b\\\\c\\nd"} 3\n'
+        "# HELP demo_in_flight Requests being served\n"
+        "# TYPE demo_in_flight gauge\n"
+        "demo_in_flight 0.5\n"
+    )
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = Registry()
+    latency = registry.register(Histogram("demo_seconds", "Latency", ("kind",), buckets=(5, 1)))
+    for value in (0.5, 1, 3, 10):
+        latency.labels("read").observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP demo_seconds Latency",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{kind="read",le="1"} 2',
+        'demo_seconds_bucket{kind="read",le="5"} 3',
+        'demo_seconds_bucket{kind="read",le="+Inf"} 4',
+        'demo_seconds_sum{kind="read"} 14.5',
+        'demo_seconds_count{kind="read"} 4',
+    ]
+
+
+def test_registry_rejects_duplicates_and_wrong_labels() -> None:
+    registry = Registry()
+    counter = registry.register(Counter("demo_total", "Demo", ("a", "b")))
+    with pytest.raises(ValueError):
+        registry.register(Counter("demo_total", "Demo again"))
+    with pytest.raises(ValueError):
+        counter.labels("only-one")
+
+
+def test_unknown_routes_share_one_label() -> None:
+    metrics = BridgeMetrics(routes=["/metrics"])
+    assert metrics.route_label("/metrics") == "/metrics"
+    assert metrics.route_label("/wp-admin.php") == "other"
+
+
+def test_metrics_endpoint_through_middleware(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "GRAPH_BACKEND", "memory")
+    monkeypatch.setattr(settings, "FAKE_GRAPH_MODULES", 20)
+    monkeypatch.setattr(settings, "QUERY_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "PLAN_CACHE_PATH", str(tmp_path / "plan_cache.sqlite3"))
+    from src.server.main import app
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        assert client.get("/no-such-page").status_code == 404
+        assert client.post("/execute_cypher_query", json={"query": GENERATION_QUERY}).status_code == 200
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    lines = response.text.splitlines()
+    assert "# TYPE bridge_http_requests_total counter" in lines
+    assert 'bridge_http_requests_total{route="/health",method="GET",status="200"} 1' in lines
+    assert 'bridge_http_requests_total{route="other",method="GET",status="404"} 1' in lines
+    assert 'bridge_http_request_duration_seconds_count{route="/health",method="GET"} 1' in lines
+    assert 'bridge_http_request_duration_seconds_bucket{route="/health",method="GET",le="+Inf"} 1' in lines
+    # the scrape itself is in flight while it renders
+    assert 'bridge_http_requests_in_flight{route="/metrics"} 1' in lines
+    assert 'bridge_neo4j_query_duration_seconds_count{kind="query"} 1' in lines
+    assert 'bridge_neo4j_rows_returned_count{kind="query"} 1' in lines
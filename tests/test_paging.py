@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+import pytest
+
+from src.graph.neo4j_client import PAGE_LIMIT_PARAM, PAGE_SKIP_PARAM, AsyncNeo4jClient, paged_query
+from src.graph.paging import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "MATCH (m:Modul) RETURN m.dosya_yolu, count(*) ORDER BY m.dosya_yolu",
+        "MATCH (m:Modul) RETURN m.dosya_yolu AS yol ORDER BY yol;",
+        "MATCH (m:Modul) WHERE m.dosya_adi = 'limit.py' RETURN m.goreli_yol",
+        "CALL { MATCH (f:Fonksiyon) RETURN f LIMIT 10 } RETURN f.isim ORDER BY f.isim",
+        "MATCH (m:Modul) RETURN m.dosya_yolu // no LIMIT here",
+    ],
+)
+def test_final_return_gets_server_side_paging(query: str) -> None:
+    body = query.rstrip(";")
+    assert paged_query(query) == f"{body}\nSKIP ${PAGE_SKIP_PARAM} LIMIT ${PAGE_LIMIT_PARAM}"
+    assert paged_query(query, limited=False) == f"{body}\nSKIP ${PAGE_SKIP_PARAM}"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "MATCH (m:Modul) RETURN m.dosya_yolu LIMIT 5",
+        "MATCH (m:Modul) RETURN m.dosya_yolu ORDER BY m.dosya_yolu SKIP 10",
+        "MATCH (m:Modul) RETURN m.dosya_adi AS ad UNION MATCH (f:Fonksiyon) RETURN f.isim AS ad",
+        "CALL { MATCH (m:Modul) RETURN m }",
+        "MATCH (m:Modul) SET m.x = 1",
+        "CALL db.labels()",
+    ],
+)
+def test_queries_without_a_pageable_return_are_left_alone(query: str) -> None:
+    assert paged_query(query) is None
+
+
+class _Record:
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data = data
+
+    def data(self) -> Dict[str, Any]:
+        return dict(self._data)
+
+
+class _Result:
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows = rows
+
+    async def data(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.rows]
+
+    async def __aiter__(self):
+        for row in self.rows:
+            yield _Record(row)
+
+
+class _Session:
+    # answers every query with ten rows, honouring the appended SKIP/LIMIT parameters
+    def __init__(self, log: List[Any]) -> None:
+        self.log = log
+
+    async def execute_read(self, work):
+        return await work(self)
+
+    execute_write = execute_read
+
+    async def run(self, query: str, params: Dict[str, Any]) -> _Result:
+        self.log.append((query, params))
+        rows = [{"m.dosya_yolu": f"mod_{i}.py", "count(*)": i} for i in range(10)]
+        skip = params.get(PAGE_SKIP_PARAM, 0)
+        limit = params.get(PAGE_LIMIT_PARAM)
+        return _Result(rows[skip : None if limit is None else skip + limit])
+
+
+def _client(log: List[Any]) -> AsyncNeo4jClient:
+    client = AsyncNeo4jClient.__new__(AsyncNeo4jClient)
+    client.admission = None
+
+    @asynccontextmanager
+    async def session(**config: Any):
+        yield _Session(log)
+
+    client.session = session
+    return client
+
+
+def test_later_page_runs_once_with_skip_in_the_query() -> None:
+    log: List[Any] = []
+    query = "MATCH (m:Modul) RETURN m.dosya_yolu, count(*) ORDER BY m.dosya_yolu"
+
+    rows = asyncio.run(_client(log).run_query(query, readonly=True, skip=4, limit=3))
+
+    assert rows == [{"m.dosya_yolu": f"mod_{i}.py", "count(*)": i} for i in (4, 5, 6)]
+    assert log == [(paged_query(query), {PAGE_SKIP_PARAM: 4, PAGE_LIMIT_PARAM: 3})]
+
+
+def test_unpageable_query_is_trimmed_while_streaming() -> None:
+    log: List[Any] = []
+    query = "MATCH (m:Modul) RETURN m.dosya_yolu, count(*) LIMIT 10"
+
+    rows = asyncio.run(_client(log).run_query(query, {"x": 1}, readonly=True, skip=8, limit=3))
+
+    assert [row["count(*)"] for row in rows] == [8, 9]
+    assert log == [(query, {"x": 1})]
+
+
+def test_cursor_is_bound_to_its_query() -> None:
+    cursor = encode_cursor("MATCH (n) RETURN n", {"a": 1}, 200)
+    assert decode_cursor(cursor, "MATCH (n) RETURN n", {"a": 1}) == 200
+    assert decode_cursor(None, "MATCH (n) RETURN n", None) == 0
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "MATCH (n) RETURN n", {"a": 2})
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "MATCH (n) RETURN n", None)
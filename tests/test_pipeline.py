@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pytest
+
+from src.ingest.pipeline import IngestPipeline, PipelineResult
+
+
+class _Writer:
+    # records what the pipeline writes; `fail_on` makes one method raise
+    batch_size = 2
+
+    def __init__(self, fail_on: Optional[str] = None) -> None:
+        self.fail_on = fail_on
+        self.modules: List[str] = []
+        self.call_rows: List[Dict[str, Any]] = []
+
+    def _call(self, name: str) -> None:
+        if name == self.fail_on:
+            raise RuntimeError(f"{name} failed")
+
+    def write_modules(self, modules: Iterable[Any], root: Path) -> None:
+        self._call("write_modules")
+        self.modules.extend(module.file_path for module in modules)
+
+    def write_call_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        self._call("write_call_rows")
+        self.call_rows.extend(rows)
+        return len(self.call_rows)
+
+    def __getattr__(self, name: str) -> Any:
+        if not name.startswith("write_") and not name.startswith("delete_") and name != "clear_module_edges":
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._call(name)
+
+
+def _tree(root: Path, count: int) -> List[Path]:
+    paths = []
+    for i in range(count):
+        path = root / f"mod{i}.py"
+        path.write_text(f"def f{i}():\n    pass\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _run(pipeline: IngestPipeline, paths: Iterable[Path]) -> PipelineResult:
+    # runs in a thread so a deadlock fails the test instead of hanging it
+    outcome: Dict[str, Any] = {}
+
+    def _target() -> None:
+        try:
+            outcome["result"] = pipeline.run(paths)
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=_target, daemon=True)
+    thread.start()
+    thread.join(timeout=20)
+    assert not thread.is_alive(), "pipeline did not stop"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def _pipeline(root: Path, writer: _Writer) -> IngestPipeline:
+    return IngestPipeline(root, writer, include_devs=False, queue_size=1)
+
+
+def test_writes_files_and_resolves_spooled_calls(tmp_path: Path) -> None:
+    (tmp_path / "util.py").write_text("def helper():\n    pass\n", encoding="utf-8")
+    (tmp_path / "app.py").write_text("from util import helper\n\n\ndef main():\n    helper()\n", encoding="utf-8")
+    (tmp_path / "broken.py").write_text("def (:\n", encoding="utf-8")
+    writer = _Writer()
+
+    result = _run(_pipeline(tmp_path, writer), sorted(tmp_path.glob("*.py")))
+
+    assert (result.files, result.modules, result.skipped, result.functions) == (3, 2, 1, 2)
+    assert sorted(writer.modules) == [str(tmp_path / "app.py"), str(tmp_path / "util.py")]
+    assert result.calls == 1
+    assert len(writer.call_rows) == 1
+
+
+def test_failing_writer_raises_and_stops_the_stages(tmp_path: Path) -> None:
+    writer = _Writer(fail_on="write_modules")
+    with pytest.raises(RuntimeError, match="write_modules failed"):
+        _run(_pipeline(tmp_path, writer), _tree(tmp_path, 50))
+
+
+def test_failing_call_pass_raises(tmp_path: Path) -> None:
+    writer = _Writer(fail_on="write_call_rows")
+    with pytest.raises(RuntimeError, match="write_call_rows failed"):
+        _run(_pipeline(tmp_path, writer), _tree(tmp_path, 5))
+    assert len(writer.modules) == 5
+
+
+def test_failing_discovery_raises(tmp_path: Path) -> None:
+    paths = _tree(tmp_path, 50)
+
+    def _paths() -> Iterator[Path]:
+        yield from paths[:10]
+        raise OSError("listing failed")
+
+    writer = _Writer()
+    with pytest.raises(OSError, match="listing failed"):
+        _run(_pipeline(tmp_path, writer), _paths())
+    assert len(writer.modules) <= 10
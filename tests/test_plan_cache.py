@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pytest
+
+from src.gemini.plan_cache import PlanCache, normalize_question, parameterize
+
+
+@pytest.mark.parametrize(
+    "question, key, slots",
+    [
+        ("auth.py modülünü kim yazdı?", "{0} modülünü kim yazdı", ["auth.py"]),
+        ("Auth.py modülünü KİM yazdı?", "{0} modülünü kim yazdı", ["Auth.py"]),
+        ("src/Api/Main.py   hangi kütüphaneleri kullanıyor", "{0} hangi kütüphaneleri kullanıyor", ["src/Api/Main.py"]),
+        ("`parseConfig` fonksiyonunu kim çağırıyor?", "{0} fonksiyonunu kim çağırıyor", ["parseConfig"]),
+        ("'Foo' ve \"Bar\" arasında çağrı var mı", "{0} ve {1} arasında çağrı var mı", ["Foo", "Bar"]),
+        ("Grafta kaç modül var?", "grafta kaç modül var", []),
+    ],
+)
+def test_normalize_question_lifts_slots_in_their_original_case(question: str, key: str, slots: List[str]) -> None:
+    assert normalize_question(question) == (key, slots)
+
+
+@pytest.mark.parametrize(
+    "cypher, slots, question, expected",
+    [
+        (
+            "MATCH (m:Modul {dosya_adi: 'auth.py'}) RETURN m",
+            ["auth.py"],
+            "auth.py kim yazdı",
+            "MATCH (m:Modul {dosya_adi: $slot0}) RETURN m",
+        ),
+        # the model lowercased the file name for the lowercase lookup property
+        (
+            "MATCH (m:Modul {dosya_adi: 'auth.py'}) RETURN m",
+            ["Auth.py"],
+            "Auth.py kim yazdı",
+            "MATCH (m:Modul {dosya_adi: toLower($slot0)}) RETURN m",
+        ),
+        (
+            'MATCH (f:Fonksiyon {isim: "parseConfig"}) RETURN f',
+            ["parseConfig"],
+            "`parseConfig` nerede",
+            "MATCH (f:Fonksiyon {isim: $slot0}) RETURN f",
+        ),
+        # literals that do not come from the question stay
+        (
+            "MATCH (o:GrafOzet {ad: 'graf'}) RETURN o.modul_sayisi",
+            [],
+            "grafta kaç modül var",
+            "MATCH (o:GrafOzet {ad: 'graf'}) RETURN o.modul_sayisi",
+        ),
+        # slot value missing from the query
+        ("MATCH (m:Modul) RETURN count(m)", ["auth.py"], "auth.py kim yazdı", None),
+        # "Foo" is not a slot, a cached plan would answer "foo ..." with Foo's callers
+        (
+            "MATCH (f:Fonksiyon {isim: 'Foo'})<-[:CAGIRIR]-(g) RETURN g.isim",
+            [],
+            "Foo fonksiyonunu kim çağırıyor",
+            None,
+        ),
+    ],
+)
+def test_parameterize(cypher: str, slots: List[str], question: str, expected: Optional[str]) -> None:
+    assert parameterize(cypher, slots, question) == expected
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[PlanCache]:
+    plans = PlanCache(tmp_path / "plans.sqlite3", "v1", max_entries=2)
+    yield plans
+    plans.close()
+
+
+def test_lookup_hits_for_another_file_and_misses_otherwise(cache: PlanCache) -> None:
+    assert cache.store("auth.py modülünü kim yazdı?", "MATCH (m:Modul {dosya_adi: 'auth.py'}) RETURN m")
+
+    plan = cache.lookup("db.py modülünü kim yazdı")
+    assert plan is not None
+    assert plan.cypher == "MATCH (m:Modul {dosya_adi: $slot0}) RETURN m"
+    assert plan.params == {"slot0": "db.py"}
+    assert cache.lookup("db.py modülünü kim sildi") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["entries"]) == (1, 1, 1, 1)
+
+
+def test_case_of_slot_values_survives_a_hit(cache: PlanCache) -> None:
+    assert cache.store("Auth.py modülünü kim yazdı?", "MATCH (m:Modul {dosya_adi: 'auth.py'}) RETURN m")
+    assert cache.store("`parseConfig` fonksiyonunu kim çağırıyor", "MATCH (f {isim: 'parseConfig'}) RETURN f")
+
+    upper = cache.lookup("DB.PY modülünü kim yazdı")
+    assert upper is not None
+    assert upper.cypher == "MATCH (m:Modul {dosya_adi: toLower($slot0)}) RETURN m"
+    assert upper.params == {"slot0": "DB.PY"}
+    symbol = cache.lookup("`ParseConfig` fonksiyonunu kim çağırıyor")
+    assert symbol is not None
+    assert symbol.params == {"slot0": "ParseConfig"}
+
+
+def test_questions_differing_only_in_an_unslotted_name_are_not_cached(cache: PlanCache) -> None:
+    assert not cache.store("Foo fonksiyonunu kim çağırıyor", "MATCH (f {isim: 'Foo'})<-[:CAGIRIR]-(g) RETURN g")
+    assert cache.lookup("foo fonksiyonunu kim çağırıyor") is None
+
+
+def test_eviction_forget_and_prompt_version(tmp_path: Path, cache: PlanCache) -> None:
+    for verb in ("yazdı", "sildi", "taşıdı"):
+        assert cache.store(f"a.py kim {verb}", "MATCH (m {dosya_adi: 'a.py'}) RETURN m")
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    # least recently used goes first
+    assert cache.lookup("x.py kim yazdı") is None
+
+    plan = cache.lookup("x.py kim taşıdı")
+    assert plan is not None
+    cache.forget(plan.key)
+    assert cache.lookup("x.py kim taşıdı") is None
+    cache.close()
+
+    reopened = PlanCache(tmp_path / "plans.sqlite3", "v2")
+    assert reopened.stats()["entries"] == 0
+    reopened.close()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.graph.cache import QueryCache, cache_key, normalize_query
+
+
+class _Graph:
+    # counts executions; generation is what the cache reads back after an ingestion run
+    def __init__(self) -> None:
+        self.generation: Optional[int] = 1
+        self.runs = 0
+
+    async def run(self) -> List[Dict[str, Any]]:
+        self.runs += 1
+        await asyncio.sleep(0)
+        return [{"n": self.runs}]
+
+    async def read_generation(self) -> Optional[int]:
+        return self.generation
+
+
+def _fetch(cache: QueryCache, graph: _Graph, query: str, params: Optional[Dict[str, Any]] = None):
+    return cache.fetch(query, params, graph.run, graph.read_generation)
+
+
+def test_key_normalization() -> None:
+    assert normalize_query("  MATCH (n)\n\tRETURN n ; ") == "MATCH (n) RETURN n"
+    assert cache_key("MATCH (n) RETURN n", {"b": 1, "a": 2}) == cache_key("MATCH  (n) RETURN n;", {"a": 2, "b": 1})
+    assert cache_key("MATCH (n) RETURN n", {"a": 1}) != cache_key("MATCH (n) RETURN n", {"a": 2})
+    # literals keep their case
+    assert cache_key("RETURN 'A'") != cache_key("RETURN 'a'")
+
+
+def test_hit_after_miss() -> None:
+    cache = QueryCache(max_bytes=10_000, ttl=60, generation_check_interval=60)
+    graph = _Graph()
+
+    async def _run():
+        return [await _fetch(cache, graph, q) for q in ("MATCH (n) RETURN n", "MATCH (n)  RETURN n;")]
+
+    assert asyncio.run(_run()) == [([{"n": 1}], "MISS"), ([{"n": 1}], "HIT")]
+    assert graph.runs == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_generation_bump_invalidates() -> None:
+    # generation_check_interval=0: every fetch reads the generation back
+    cache = QueryCache(max_bytes=10_000, ttl=60, generation_check_interval=0)
+    graph = _Graph()
+
+    async def _run():
+        first = await _fetch(cache, graph, "MATCH (n) RETURN n")
+        cached = await _fetch(cache, graph, "MATCH (n) RETURN n")
+        graph.generation = 2
+        fresh = await _fetch(cache, graph, "MATCH (n) RETURN n")
+        return first, cached, fresh
+
+    assert asyncio.run(_run()) == (([{"n": 1}], "MISS"), ([{"n": 1}], "HIT"), ([{"n": 2}], "MISS"))
+    assert cache.stats()["invalidations"] == 1
+    assert cache.generation == 2
+
+
+def test_result_of_an_older_generation_is_not_stored() -> None:
+    cache = QueryCache(max_bytes=10_000, ttl=60)
+    cache.observe_generation(2)
+    assert not cache.put("k", [{"n": 1}], generation=1)
+    assert cache.get("k") is None
+
+
+def test_size_bound_evicts_least_recently_used() -> None:
+    rows = [{"value": "x" * 20}]
+    size = len(json.dumps(rows)) + len("a")
+    cache = QueryCache(max_bytes=2 * size, ttl=60)
+    cache.observe_generation(1)
+
+    assert cache.put("a", rows, 1) and cache.put("b", rows, 1)
+    assert cache.get("a") == rows  # "b" is now the oldest
+    assert cache.put("c", rows, 1)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == rows and cache.get("c") == rows
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 2 * size, 1)
+    # a single result larger than the whole cache is not stored at all
+    assert not cache.put("big", [{"value": "x" * 1000}], 1)
+
+
+def test_expired_entries_miss(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = QueryCache(max_bytes=10_000, ttl=10)
+    cache.observe_generation(1)
+    now = [1000.0]
+    monkeypatch.setattr("src.graph.cache.time.monotonic", lambda: now[0])
+    cache.put("k", [{"n": 1}], 1)
+    now[0] += 11
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_identical_misses_share_one_execution() -> None:
+    cache = QueryCache(max_bytes=10_000, ttl=60)
+    graph = _Graph()
+
+    async def _run():
+        return await asyncio.gather(*(_fetch(cache, graph, "MATCH (n) RETURN n") for _ in range(3)))
+
+    results = asyncio.run(_run())
+    assert graph.runs == 1
+    assert sorted(status for _rows, status in results) == ["MISS", "SHARED", "SHARED"]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List
+
+from src.ingest.parser import parse_python_file
+from src.ingest.resolver import SymbolIndex, module_name_for
+from src.ingest.writer import cagirir_rows
+
+
+UTIL = """
+def helper():
+    pass
+
+
+class Store:
+    def __init__(self):
+        pass
+
+    def save(self):
+        self.flush()
+
+    def flush(self):
+        pass
+
+    @classmethod
+    def build(cls):
+        return cls.make()
+
+    @classmethod
+    def make(cls):
+        return cls()
+"""
+
+APP = """
+import os.path
+from pkg.util import helper as h
+from . import util
+from .util import Store
+
+
+def run(obj):
+    h()
+    Store()
+    local()
+    obj.process()
+
+
+def via_module():
+    util.helper()
+    os.path.join("a", "b")
+
+
+def local():
+    pass
+
+
+class Worker:
+    def process(self):
+        pass
+"""
+
+
+def _write_package(root: Path) -> Dict[str, Path]:
+    package = root / "pkg"
+    package.mkdir()
+    files = {"init": package / "__init__.py", "util": package / "util.py", "app": package / "app.py"}
+    files["init"].write_text("", encoding="utf-8")
+    files["util"].write_text(UTIL, encoding="utf-8")
+    files["app"].write_text(APP, encoding="utf-8")
+    return files
+
+
+def _rows(root: Path, files: List[Path]) -> List[Dict[str, str]]:
+    parsed = [parse_python_file(path) for path in files]
+    modules = [module for module, _functions in parsed]
+    functions = [func for _module, funcs in parsed for func in funcs]
+    return list(cagirir_rows(modules, functions, root))
+
+
+def test_module_name_for_strips_root_and_init(tmp_path: Path) -> None:
+    files = _write_package(tmp_path)
+    assert module_name_for(str(files["app"]), tmp_path) == "pkg.app"
+    assert module_name_for(str(files["init"]), tmp_path) == "pkg"
+
+
+def test_cagirir_rows_resolve_imports_methods_and_fallback(tmp_path: Path) -> None:
+    files = _write_package(tmp_path)
+    app, util = str(files["app"]), str(files["util"])
+
+    rows = _rows(tmp_path, [files["util"], files["app"]])
+
+    assert rows == [
+        # self./cls. calls resolve against the enclosing class
+        {"caller_id": f"{util}::Store.save", "callee_id": f"{util}::Store.flush"},
+        {"caller_id": f"{util}::Store.build", "callee_id": f"{util}::Store.make"},
+        # calling an imported class runs its constructor; `h` is `from pkg.util import helper as h`
+        {"caller_id": f"{app}::run", "callee_id": f"{util}::Store.__init__"},
+        {"caller_id": f"{app}::run", "callee_id": f"{util}::helper"},
+        {"caller_id": f"{app}::run", "callee_id": f"{app}::local"},
+        # unknown receiver: same-module functions with that name
+        {"caller_id": f"{app}::run", "callee_id": f"{app}::Worker.process"},
+        # module.attr through a relative `from . import util`; os.path.join stays external
+        {"caller_id": f"{app}::via_module", "callee_id": f"{util}::helper"},
+    ]
+
+
+def test_cagirir_rows_skip_unknown_modules(tmp_path: Path) -> None:
+    files = _write_package(tmp_path)
+    app = str(files["app"])
+
+    rows = _rows(tmp_path, [files["app"]])
+
+    assert rows == [
+        {"caller_id": f"{app}::run", "callee_id": f"{app}::local"},
+        {"caller_id": f"{app}::run", "callee_id": f"{app}::Worker.process"},
+    ]
+
+
+def test_symbol_index_resolves_manifest_ids_below_the_import_root(tmp_path: Path) -> None:
+    files = _write_package(tmp_path)
+    app, util = str(files["app"]), str(files["util"])
+    # ingestion rooted at the package itself: modules are "util" / "app", imports say "pkg.util"
+    index = SymbolIndex(tmp_path / "pkg")
+    index.add_ids(util, [f"{util}::helper", f"{util}::Store.__init__"])
+    index.add_ids(app, [f"{app}::run"])
+
+    assert index.resolve(app, {"h": "pkg.util.helper"}, "run", "h") == [f"{util}::helper"]
+    assert index.resolve(app, {"Store": ".util.Store"}, "run", "Store") == [f"{util}::Store.__init__"]
+    assert index.resolve(app, {"os": "os"}, "run", "os.getcwd") == []
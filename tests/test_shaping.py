@@ -0,0 +1,77 @@
+from typing import Any, Dict, List
+
+import pytest
+
+from src.gemini.shaping import MAX_STRING_CHARS, _size, project, shape_result, summarize_column
+
+
+def _rows(n: int) -> List[Dict[str, Any]]:
+    return [{"name": f"m{i}", "lines": i} for i in range(n)]
+
+
+def test_small_result_passes_through() -> None:
+    shaped = shape_result({"results": _rows(3)}, max_rows=10, max_bytes=10_000)
+    assert shaped == {"results": _rows(3), "truncated": False}
+
+
+def test_upstream_truncation_flag_is_kept() -> None:
+    shaped = shape_result({"results": _rows(3), "truncated": True}, max_rows=10, max_bytes=10_000)
+    assert shaped["truncated"] is True
+    assert "note" not in shaped
+
+
+def test_error_is_returned_unchanged() -> None:
+    result = {"error": {"code": "X", "message": "boom"}}
+    assert shape_result(result, max_rows=1, max_bytes=10) is result
+
+
+def test_row_cap() -> None:
+    shaped = shape_result({"results": _rows(50)}, max_rows=10, max_bytes=100_000)
+    assert shaped["results"] == _rows(10)
+    assert shaped["truncated"] is True
+    assert shaped["summary"]["row_count"] == 50
+    assert shaped["summary"]["row_count_is_lower_bound"] is False
+    assert shaped["summary"]["columns"]["lines"] == {"distinct": 50, "nulls": 0, "min": 0, "max": 49, "sum": 1225}
+
+
+def test_byte_cap() -> None:
+    rows = [{"name": "x" * 100} for _ in range(20)]
+    shaped = shape_result({"results": rows}, max_rows=100, max_bytes=1_000)
+    assert 0 < len(shaped["results"]) < 20
+    assert shaped["results"] == rows[: len(shaped["results"])]
+    assert _size({k: shaped[k] for k in ("results", "summary")}) <= 1_000
+
+
+def test_summary_alone_over_budget_keeps_no_rows() -> None:
+    shaped = shape_result({"results": _rows(5)}, max_rows=100, max_bytes=10)
+    assert shaped["results"] == []
+    assert shaped["summary"]["row_count"] == 5
+
+
+def test_long_strings_are_clipped() -> None:
+    shaped = shape_result({"results": [{"doc": "a" * 500, "nested": {"s": "b" * 500}}]}, max_rows=10, max_bytes=10_000)
+    row = shaped["results"][0]
+    assert row["doc"] == "a" * MAX_STRING_CHARS + "…"
+    assert row["nested"]["s"] == "b" * MAX_STRING_CHARS + "…"
+
+
+@pytest.mark.parametrize("upstream, shown", [(False, "Only the first 2 of 6 rows"), (True, "Only the first 2 of 6+ rows")])
+def test_truncation_note(upstream: bool, shown: str) -> None:
+    shaped = shape_result({"results": _rows(6), "truncated": upstream}, max_rows=2, max_bytes=100_000)
+    assert shaped["note"].startswith(shown)
+    assert "refine the query" in shaped["note"]
+    assert shaped["summary"]["row_count_is_lower_bound"] is upstream
+
+
+def test_projection() -> None:
+    rows = [{"a": 1, "b": 2}]
+    assert project(rows, ["b", "unknown"]) == [{"b": 2}]
+    assert project(rows, ["unknown"]) == rows
+    assert project(rows, None) == rows
+    shaped = shape_result({"results": rows}, max_rows=10, max_bytes=1_000, columns=["a"])
+    assert shaped["results"] == [{"a": 1}]
+
+
+def test_text_column_summary() -> None:
+    summary = summarize_column(["x", "y", "x", None, "x"], top_k=1)
+    assert summary == {"distinct": 2, "nulls": 1, "top": [["x", 3]]}
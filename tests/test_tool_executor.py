@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+from neo4j.exceptions import ClientError
+
+from src.config import settings
+from src.gemini.service import LocalToolExecutor
+from src.graph.admission import QueryRejected
+
+
+def _executor(error: BaseException) -> LocalToolExecutor:
+    async def run(query: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        raise error
+
+    return LocalToolExecutor(run)
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (
+            ClientError("Unknown label Foo"),
+            {"type": "Neo4jError", "code": "Neo.DatabaseError.General.UnknownError", "message": "Execution error"},
+        ),
+        (asyncio.TimeoutError(), {"type": "Timeout", "message": "Query timed out"}),
+        (ValueError("Write operations are not allowed in read-only mode."), "Write operations are not allowed in read-only mode."),
+        (
+            QueryRejected("too_expensive", "too many rows", "add a LIMIT"),
+            QueryRejected("too_expensive", "too many rows", "add a LIMIT").as_dict(),
+        ),
+    ],
+)
+def test_local_tool_errors_become_tool_results(error: BaseException, expected: Any) -> None:
+    assert asyncio.run(_executor(error).execute_cypher("MATCH (f:Foo) RETURN f")) == {"error": expected}
+
+
+def test_ask_survives_a_neo4j_error_in_a_tool_call(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "GRAPH_BACKEND", "memory")
+    monkeypatch.setattr(settings, "LLM_BACKEND", "fake")
+    monkeypatch.setattr(settings, "FAKE_GRAPH_MODULES", 20)
+    monkeypatch.setattr(settings, "ASK_BRIDGE_URL", None)
+    monkeypatch.setattr(settings, "INTENT_ROUTER_ENABLED", False)
+    monkeypatch.setattr(settings, "QUERY_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "PLAN_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "PLAN_CACHE_PATH", str(tmp_path / "plan_cache.sqlite3"))
+    from src.server.main import app
+
+    with TestClient(app) as client:
+        async def failing_query(query: str, *args: Any, **kwargs: Any):
+            raise ClientError("Unknown label Kutuphane")
+
+        monkeypatch.setattr(app.state.neo4j, "run_query", failing_query)
+        response = client.post("/ask", json={"question": "En çok kullanılan kütüphaneler?"})
+        stream = client.get("/ask/stream", params={"question": "En çok kullanılan kütüphaneler?"})
+
+    assert response.status_code == 200
+    assert response.json()["answer"].startswith("En çok kullanılan 0 kütüphane")
+    assert stream.status_code == 200
+    assert "event: tool_result" in stream.text
+    assert "Neo4jError" in stream.text
+    assert "event: answer" in stream.text